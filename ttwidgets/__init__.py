@@ -54,24 +54,44 @@ This package includes the following:
         TTToolTip   (does not inherit, but uses a TTLabel)
     METHODS:    
         alias
+        batch
+        clear_font_cache
+        clear_parse_cache
+        compile_bundle
+        compile_template
         convert_font_dict_to_ttoptions_dict
         convert_ttoptions_dict_to_font_dict
         dump
+        font_info
+        font_metrics
         gen_tag_attrs
         get_font_dict
         get_named_font
+        get_style_table
         is_tagged_text
+        load_bundle
+        measure_many
         pare_dict
+        parse_cache_info
+        parse_many
         parse_tag_attrs
+        parse_tagged_text
         quote
+        scale_fonts
+        set_font_grace
+        set_parse_cache_size
+        set_widget_pool_size
         split_attrs
         split_chunk
         split_dict_into_options_fontattrs_and_case
         split_tagged_text_into_chunks
         strip_tags
+        tokenize_tagged_text
         unalias
+        unload_bundle
         unmap
         update_named_font
+        widget_pool_info
         wrap_tagged_text
 
 
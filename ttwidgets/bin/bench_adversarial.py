@@ -0,0 +1,85 @@
+"""
+   Copyright 2020 Gary Michael Bloom
+                  mailto:bloominator@hotmail.com
+                  mailto:GaryBloomLaw@gmail.com
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+
+bench_adversarial.py
+====================
+
+Time the tagged-text parser on pathological inputs of growing size, and
+check that the cost per byte stays flat, as documented for
+tokenize_tagged_text().  No display is needed.
+
+Usage:
+
+    python bench_adversarial.py [MAX_GROWTH]
+
+Exits with status 1 if the cost per byte of any input grows by more than
+MAX_GROWTH (default 3.0) from the smallest to the largest size.
+"""
+
+import sys
+import timeit
+import ttwidgets
+
+SIZES = (1000, 4000, 16000)
+
+INPUTS = {
+    "unclosed openers": lambda n: "<t " * n,
+    "openers, one closer": lambda n: "<t" * n + "x</t>",
+    "openers, no '>'": lambda n: "<t" + " <t a=1" * n + "/t>",
+    "self-closing run": lambda n: "<t" * n + "/>",
+    "nested quotes": lambda n: '<t a="' + "x ' y \" '''" * n + ">z</t>",
+    "unclosed quotes": lambda n: "<t " + "a='b " * n + ">z</t>",
+    "huge attributes": lambda n: "<t " + "bg=red fg=blue " * n + ">z</t>",
+    "many chunks": lambda n: "<t b>x</t> y " * n,
+    "'>' in text": lambda n: "<t>" + "x>" * n + "</t>",
+    "'</' run": lambda n: "<t " + "</" * n,
+}
+
+
+def parse(text):
+    """Parse TEXT uncached, with each of the tagged-text routines."""
+    ttwidgets.clear_parse_cache()
+    ttwidgets.parse_tagged_text(text)
+    ttwidgets.split_chunk(text)
+    ttwidgets.strip_tags(text)
+
+
+def ns_per_byte(text):
+    """Return the best time to parse TEXT in nanoseconds per byte."""
+    best = min(timeit.repeat(lambda: parse(text), number=1, repeat=3))
+    return best / len(text) * 1e9
+
+
+def main(argv):
+    max_growth = float(argv[1]) if len(argv) > 1 else 3.0
+    print("%-20s" % "ns/byte" + "".join("%10d" % n for n in SIZES))
+    failed = []
+    for name, make in INPUTS.items():
+        costs = [ns_per_byte(make(n)) for n in SIZES]
+        print("%-20s" % name + "".join("%10.0f" % c for c in costs))
+        if costs[-1] > max_growth * costs[0]:
+            failed.append(name)
+    if failed:
+        print("Cost per byte grew more than %gx for: %s" % (
+            max_growth, ", ".join(failed)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
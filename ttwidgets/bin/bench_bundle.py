@@ -0,0 +1,83 @@
+"""
+   Copyright 2020 Gary Michael Bloom
+                  mailto:bloominator@hotmail.com
+                  mailto:GaryBloomLaw@gmail.com
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+
+bench_bundle.py
+===============
+
+Compare the cold-start cost of getting the parse results of a catalog of
+tagged strings by parsing them with that of loading them from a bundle from
+compile_bundle().  No display is needed.
+
+Usage:
+
+    python bench_bundle.py [COUNT]
+
+COUNT is the number of strings in the catalog (default 3000).
+"""
+
+import sys
+import timeit
+import ttwidgets
+
+CAPTIONS = (
+    "<t bold fg=navy>{0}:</t> <t fg=gray italic>help for item {1}</t>",
+    "Press <t relief=raised bd=1 bg=white padx=2 title>button {1}</t> to "
+    "<t fg=red bold>{0}</t>",
+    "<t family=Courier size=10>{0}</t>\n<t size=8 fg=gray>line two {1}</t>",
+    "{0} <t funderline fg=blue>link {1}</t> <t upper>end</t>",
+)
+
+
+def make_catalog(count):
+    """Return a dict of COUNT distinct tagged strings."""
+    return {
+        i: CAPTIONS[i % len(CAPTIONS)].format("caption", i)
+        for i in range(count)
+    }
+
+
+def parse_all(texts):
+    ttwidgets.clear_parse_cache()
+    for text in texts:
+        ttwidgets.parse_tagged_text(text)
+
+
+def load_all(data, texts):
+    bundle = ttwidgets.load_bundle(data)
+    for text in texts:
+        ttwidgets.parse_tagged_text(text)
+    ttwidgets.unload_bundle(bundle)
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 3000
+    texts = list(make_catalog(count).values())
+    data = ttwidgets.compile_bundle(texts)
+    parse_s = min(timeit.repeat(lambda: parse_all(texts), number=1, repeat=5))
+    load_s = min(
+        timeit.repeat(lambda: load_all(data, texts), number=1, repeat=5)
+    )
+    print("%d strings, bundle of %d bytes" % (count, len(data)))
+    print("parse:  %8.2f ms" % (parse_s * 1e3))
+    print(
+        "bundle: %8.2f ms  (%.1fx faster)" % (load_s * 1e3, parse_s / load_s)
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
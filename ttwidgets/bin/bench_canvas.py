@@ -0,0 +1,116 @@
+"""
+   Copyright 2020 Gary Michael Bloom
+                  mailto:bloominator@hotmail.com
+                  mailto:GaryBloomLaw@gmail.com
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+bench_canvas.py
+===============
+
+Compare the backends of TTWidget, which draw the chunks of tagged text
+either as child Labels inside a Frame per line ('labels'), as child Labels
+in a single grid ('grid'), or as items on a single Canvas ('canvas'), for
+a screen of tagged TTButtons: the time to create, map, relayout after the
+fonts are resized, and destroy them, the Python memory allocated while
+creating them, and the number of Tk widgets.  A display is needed.
+
+Usage:
+
+    python bench_canvas.py [COUNT]
+
+COUNT is the number of buttons (default 300).
+"""
+
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+import ttwidgets
+
+CAPTIONS = (
+    "<t bold fg=navy>Item {0}:</t> <t fg=gray italic>open the item</t>",
+    "Press <t relief=raised bd=1 bg=white>button {0}</t> to <t fg=red bold>"
+    "run</t>",
+    "<t family=Courier size=10>line one {0}</t>\n<t size=8 fg=gray>line two"
+    "</t>\n<t upper>line three</t>",
+)
+
+
+def count_widgets(widget):
+    """Return the number of Tk widgets in the tree under WIDGET."""
+    return 1 + sum(count_widgets(w) for w in widget.winfo_children())
+
+
+def bench(root, backend, count):
+    """Return (create_s, relayout_s, destroy_s, memory_kb, widgets) for
+    COUNT buttons with BACKEND."""
+    frame = tk.Frame(root)
+    frame.pack()
+    root.update()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(count):
+        button = ttwidgets.TTButton(
+            frame, text=CAPTIONS[i % len(CAPTIONS)].format(i), backend=backend
+        )
+        button.grid(row=i // 10, column=i % 10)
+    root.update()
+    create_s = time.perf_counter() - start
+    memory_kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    widgets = count_widgets(frame) - 1
+    start = time.perf_counter()
+    ttwidgets.scale_fonts(1.25)
+    root.update()
+    ttwidgets.scale_fonts(0.8)
+    root.update()
+    relayout_s = (time.perf_counter() - start) / 2
+    start = time.perf_counter()
+    frame.destroy()
+    root.update()
+    destroy_s = time.perf_counter() - start
+    return create_s, relayout_s, destroy_s, memory_kb, widgets
+
+
+def main(argv):
+    count = int(argv[1]) if len(argv) > 1 else 300
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:
+        sys.exit("bench_canvas.py needs a display: %s" % exc)
+    print("%d tagged TTButtons" % count)
+    print(
+        "%-8s %12s %12s %12s %12s %10s"
+        % ("backend", "create", "relayout", "destroy", "memory", "widgets")
+    )
+    for backend in ("labels", "grid", "canvas"):
+        create_s, relayout_s, destroy_s, memory_kb, widgets = bench(
+            root, backend, count
+        )
+        print(
+            "%-8s %9.1f ms %9.1f ms %9.1f ms %9.0f KB %10d"
+            % (
+                backend,
+                create_s * 1e3,
+                relayout_s * 1e3,
+                destroy_s * 1e3,
+                memory_kb,
+                widgets,
+            )
+        )
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
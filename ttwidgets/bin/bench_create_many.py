@@ -0,0 +1,90 @@
+"""
+   Copyright 2020 Gary Michael Bloom
+                  mailto:bloominator@hotmail.com
+                  mailto:GaryBloomLaw@gmail.com
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+
+bench_create_many.py
+====================
+
+Compare creating a grid of tagged TTLabels one by one with creating them
+together by TTLabel.create_many(), and by clone() of a first label, at
+100, 1000, and 10000 labels.  A display is needed.
+
+Usage:
+
+    python bench_create_many.py [COUNT ...]
+"""
+
+import sys
+import time
+import tkinter as tk
+import ttwidgets
+
+CAPTION = "<t bold fg=navy>Row {0}:</t> <t fg=gray italic>value</t>"
+
+
+def one_by_one(frame, count):
+    """Create COUNT labels in FRAME, one TTLabel() at a time."""
+    return [
+        ttwidgets.TTLabel(frame, text=CAPTION.format(i), bg="white")
+        for i in range(count)
+    ]
+
+
+def many(frame, count):
+    """Create COUNT labels in FRAME with a single create_many()."""
+    return ttwidgets.TTLabel.create_many(
+        frame, [CAPTION.format(i) for i in range(count)], bg="white"
+    )
+
+
+def cloned(frame, count):
+    """Create COUNT labels in FRAME as clones of a first label."""
+    first = ttwidgets.TTLabel(frame, text=CAPTION.format(0), bg="white")
+    return [first] + first.clone(count - 1)
+
+
+def bench(root, func, count):
+    """Return the seconds that FUNC takes to create and map COUNT labels."""
+    frame = tk.Frame(root)
+    frame.pack()
+    root.update()
+    start = time.perf_counter()
+    for i, label in enumerate(func(frame, count)):
+        label.grid(row=i // 20, column=i % 20)
+    root.update()
+    seconds = time.perf_counter() - start
+    frame.destroy()
+    root.update()
+    return seconds
+
+
+def main(argv):
+    counts = [int(arg) for arg in argv[1:]] or [100, 1000, 10000]
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:
+        sys.exit("bench_create_many.py needs a display: %s" % exc)
+    funcs = (one_by_one, many, cloned)
+    print("%8s" % "labels" + "".join("%14s" % f.__name__ for f in funcs))
+    for count in counts:
+        times = [bench(root, func, count) for func in funcs]
+        print("%8d" % count + "".join("%11.1f ms" % (t * 1e3) for t in times))
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,110 @@
+"""
+   Copyright 2020 Gary Michael Bloom
+                  mailto:bloominator@hotmail.com
+                  mailto:GaryBloomLaw@gmail.com
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+
+bench_tag_attrs.py
+==================
+
+Microbenchmarks of the per-attribute cost of parse_tag_attrs() and
+gen_tag_attrs() on attribute-heavy tag strings.  No display is needed.
+
+Usage:
+
+    python bench_tag_attrs.py [BASELINE_TTWIDGETS_PY]
+
+Pass the path of another copy of ttwidgets.py (e.g. one checked out from an
+earlier release) to time it side by side with the installed ttwidgets.
+"""
+
+import importlib.util
+import sys
+import timeit
+import ttwidgets
+
+ATTR_STRINGS = (
+    "bg=yellow fg=red bold italic funderline size=14 family=Courier upper",
+    "abg=white afg=blue bd=2 relief=raised padx=4 pady=2 cursor=hand2 "
+    "anchor=w justify=left wraplength=200 case=title",
+    "background=black foreground=white borderwidth=3 compound=left "
+    "image=img1 height=2 width=10 underline=0 weight=bold slant=roman "
+    'family="Times New Roman" size=9 lower',
+)
+
+OPTIONS_D = dict(
+    bg="yellow",
+    fg="red",
+    relief="raised",
+    bd=2,
+    padx=4,
+    pady=2,
+    cursor="hand2",
+    anchor="w",
+    justify="left",
+    wraplength=200,
+    family="Courier",
+    size=14,
+    weight="bold",
+    slant="italic",
+    funderline=1,
+    case="title",
+)
+
+
+def load_module(path):
+    """Load the ttwidgets.py at PATH as a separate module."""
+    spec = importlib.util.spec_from_file_location("baseline_ttwidgets", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def per_token_us(func, tokens, number):
+    """Return the best per-token time of FUNC in microseconds."""
+    best = min(timeit.repeat(func, number=number, repeat=5))
+    return best / number / tokens * 1e6
+
+
+def bench(module, number=2000):
+    """Return (parse, gen) per-token times of MODULE in microseconds."""
+    tokens = sum(len(ttwidgets.split_attrs(s)) for s in ATTR_STRINGS)
+
+    def parse():
+        for s in ATTR_STRINGS:
+            module.parse_tag_attrs(s, {}, {}, auto=True)
+
+    def gen():
+        for kmode in ("", "a", "o"):
+            module.gen_tag_attrs(options=OPTIONS_D, kmode=kmode, auto=True)
+
+    return (
+        per_token_us(parse, tokens, number),
+        per_token_us(gen, 3 * len(OPTIONS_D), number),
+    )
+
+
+def main(argv):
+    modules = [("ttwidgets", ttwidgets)]
+    if len(argv) > 1:
+        modules.insert(0, ("baseline", load_module(argv[1])))
+    print("%-12s %18s %18s" % ("", "parse_tag_attrs", "gen_tag_attrs"))
+    for name, module in modules:
+        parse_us, gen_us = bench(module)
+        print("%-12s %12.2f us/tok %12.2f us/tok" % (name, parse_us, gen_us))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
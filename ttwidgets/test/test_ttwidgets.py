@@ -25,11 +25,26 @@ Copyright 2020 Gary Michael Bloom
    limitations under the License.
 """
 
+import random
+import re
 import tkinter as tk
+import tkinter.font as tk_font
 import unittest
 import ttwidgets
 
 
+def _display_root():
+    """Return the Tk root shared by the tests that need a display, or skip
+    the test if there is no display.
+    """
+    if tk._default_root is None:
+        try:
+            tk.Tk()
+        except tk.TclError as e:
+            raise unittest.SkipTest('No display: %s' % e)
+    return tk._default_root
+
+
 class Test_PyVers(unittest.TestCase):
 
     def test_pyvers(self):
@@ -193,5 +208,886 @@ class Test_fromWidget(unittest.TestCase):
         self.assertEqual(gen_text, expected_text)
 
 
+class Test_tokenize(unittest.TestCase):
+    """Test the single-pass tagged-text tokenizer."""
+
+    def test_tokenize_tagged_text1(self):
+        text = 'one <t fg=red fam="Courier New">two</t> three'
+        chunks = ttwidgets.tokenize_tagged_text(text)
+        self.assertEqual([(c.start, c.end) for c in chunks],
+                         [(0, 4), (4, 39), (39, 45)])
+        self.assertEqual([c.tagged for c in chunks], [False, True, False])
+        self.assertEqual(chunks[1].tokens, ['fg=red', 'fam="Courier New"'])
+        self.assertEqual(ttwidgets.split_tagged_text_into_chunks(text),
+                         [text[c.start:c.end] for c in chunks])
+        self.assertEqual(ttwidgets.strip_tags(text), 'one two three')
+        self.assertTrue(ttwidgets.is_tagged_text(text))
+        self.assertFalse(ttwidgets.is_tagged_text('one <t two'))
+
+    def test_tokenize_tagged_text2(self):
+        text = 'a<tag bitmap=info text=hi /><t b>b</t>'
+        chunks = ttwidgets.tokenize_tagged_text(text)
+        self.assertEqual([c[:3] for c in chunks],
+                         [('', '', 'a'), ('tag', 'bitmap=info', 'hi'),
+                          ('t', 'b', 'b')])
+        self.assertEqual(ttwidgets.split_chunk(text[1:28]),
+                         ttwidgets.Chunk('tag', 'bitmap=info', 'hi'))
+
+    def test_self_closing_attrs_not_parsed(self):
+        # the tokenizer only finds the chunks, so neither a bad font size
+        # nor a font, which needs a Tk root, is looked at here
+        text = '<t size=12u/>'
+        self.assertEqual(ttwidgets.split_tagged_text_into_chunks(text),
+                         [text])
+        self.assertTrue(ttwidgets.is_tagged_text(text))
+        self.assertEqual(ttwidgets.strip_tags(text), '')
+        text = 'a <t font=Courier text=x/> b'
+        self.assertEqual(ttwidgets.split_tagged_text_into_chunks(text),
+                         ['a ', '<t font=Courier text=x/>', ' b'])
+        self.assertEqual(ttwidgets.strip_tags(text), 'a x b')
+        self.assertEqual(ttwidgets.tokenize_tagged_text(text)[1][:3],
+                         ('t', 'font=Courier', 'x'))
+
+    def test_split_attrs(self):
+        self.assertEqual(
+            ttwidgets.split_attrs('fam = "Courier  New" size=16 b x="y"'),
+            ['fam="Courier  New"', 'size=16', 'b', 'x="y"'])
+
+
+class Test_parse_cache(unittest.TestCase):
+    """Test the process-wide cache of parsed tagged text."""
+
+    def setUp(self):
+        ttwidgets.clear_parse_cache()
+        self.addCleanup(ttwidgets.set_parse_cache_size, 1024)
+
+    def test_parse_tagged_text(self):
+        text = 'one <t fg=red size=16 upper>two</t>'
+        parsed = ttwidgets.parse_tagged_text(text)
+        self.assertTrue(parsed.tagged)
+        self.assertEqual([c.text for c in parsed.chunks], ['one ', 'two'])
+        self.assertEqual(dict(parsed.styles[1].options), {'foreground': 'red'})
+        self.assertEqual(dict(parsed.styles[1].font), {'size': 16})
+        self.assertEqual(parsed.styles[1].case, 'upper')
+        self.assertIs(ttwidgets.parse_tagged_text(text), parsed)
+        self.assertEqual(ttwidgets.parse_cache_info()[:2], (1, 1))
+
+    def test_parse_cache_eviction(self):
+        ttwidgets.set_parse_cache_size(2)
+        for text in ('<t b>a</t>', '<t i>b</t>', '<t u>c</t>', '<t b>a</t>'):
+            ttwidgets.parse_tagged_text(text)
+        info = ttwidgets.parse_cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions),
+                         (0, 4, 2))
+        self.assertEqual((info.maxsize, info.currsize), (2, 2))
+        ttwidgets.clear_parse_cache()
+        self.assertEqual(ttwidgets.parse_cache_info(),
+                         ttwidgets.CacheInfo(0, 0, 0, 2, 0))
+
+
+class Test_tag_attrs_dispatch(unittest.TestCase):
+    """Test the prefix-indexed tag attribute handlers."""
+
+    def test_parse_tag_attrs_prefixes(self):
+        options, font, case = ttwidgets.parse_tag_attrs(
+            'backgr=red r=groove repeatd=5 sbg=blue fun b=0 capit', auto=True)
+        self.assertEqual(options, {'backgr': 'red', 'relief': 'groove',
+                                   'borderwidth': '1', 'repeatd': 5,
+                                   'selectbackground': 'blue'})
+        self.assertEqual(font, {'underline': 1, 'weight': 'normal'})
+        self.assertEqual(case, 'upper')
+
+    def test_gen_tag_attrs_auto(self):
+        self.assertEqual(
+            ttwidgets.gen_tag_attrs(options=dict(bitmap='info', cpd='left',
+                                                 sbd=1, relief='raised'),
+                                    kmode='a', auto=True),
+            'bit=info cpd=left sbd=1 rel=raised bd=1')
+
+
+class Test_template(unittest.TestCase):
+    """Test compiled tagged-text templates."""
+
+    def test_compile_template(self):
+        template = ttwidgets.compile_template(
+            '<t b>CPU</t> <t fg=red>{cpu:.0f}%</t> {{x}} <t i>{mem}</t>')
+        self.assertEqual(template.slots, ('cpu', 'mem'))
+        self.assertEqual(template.chunks_using(['cpu']), [2])
+        parsed = template.substitute(cpu=12.4)
+        self.assertEqual([c.text for c in parsed.chunks],
+                         ['CPU', ' ', '12%', ' {x} ', ''])
+        self.assertIs(parsed.styles, template.parsed.styles)
+        self.assertRaises(ValueError,
+                          ttwidgets.compile_template, '<t b>{}</t>')
+
+    def test_missing_slots_are_blank(self):
+        template = ttwidgets.compile_template(
+            '<t fg=red>{cpu:.0f}%</t> {cpu.x} {mem[0]!r:>5}')
+        self.assertEqual(template.substitute().text, '%  ')
+        self.assertEqual(template.substitute(mem=[1]).text, '%      1')
+
+    def test_template_values_cannot_inject_tags(self):
+        template = ttwidgets.compile_template('<t fg=red>{v}</t> end')
+        parsed = template.substitute(v='<t fg=blue>x</t>')
+        self.assertEqual(len(parsed.chunks), 2)
+        self.assertEqual(parsed.chunks[0].text, '<t fg=blue>x</t>')
+        self.assertEqual(dict(parsed.styles[0].options),
+                         {'foreground': 'red'})
+
+
+class Test_stream(unittest.TestCase):
+    """Test the incremental tagged-text parser."""
+
+    def test_tagged_text_parser(self):
+        parser = ttwidgets.TaggedTextParser()
+        chunks = parser.feed('one <t b>tw')
+        self.assertEqual([c.text for c in chunks], ['one '])
+        self.assertEqual(parser.pending, '<t b>tw')
+        self.assertEqual(parser.feed('o</'), [])
+        chunks = parser.feed('t> three <')
+        self.assertEqual([(c.text, c.start, c.end, c.tagged) for c in chunks],
+                         [('two', 4, 16, True), (' three ', 16, 23, False)])
+        self.assertEqual(parser.pending, '<')
+        chunks = parser.feed('t i>four') + parser.close()
+        self.assertEqual([(c.text, c.start, c.end) for c in chunks],
+                         [('<t i>four', 23, 32)])
+        self.assertEqual(parser.pending, '')
+
+
+class Test_parse_many(unittest.TestCase):
+    """Test the batched, columnar parser."""
+
+    def test_parse_many(self):
+        parsed = ttwidgets.parse_many([
+            'plain', '<t fg=red>a</t>', '<t foreground=red>b</t>',
+            '<t upper fg=red>c</t>', '<t fg=red>d</t>'])
+        self.assertEqual(parsed.texts, ['plain', 'a', 'b', 'c', 'd'])
+        self.assertEqual(list(parsed.style_ids), [0, 1, 1, 2, 1])
+        self.assertEqual(len(parsed.styles), 3)
+        self.assertEqual(dict(parsed.styles[0].options), {})
+        self.assertEqual(dict(parsed.styles[1].options),
+                         {'foreground': 'red'})
+        self.assertEqual(parsed.styles[2].case, 'upper')
+
+    def test_parse_many_parses_attrs_once(self):
+        module = ttwidgets.ttwidgets
+        parse_chunk_style = module._parse_chunk_style
+        calls = []
+
+        def counting(attrs, **kw):
+            calls.append(attrs)
+            return parse_chunk_style(attrs, **kw)
+
+        ttwidgets.clear_parse_cache()
+        module._parse_chunk_style = counting
+        try:
+            parsed = ttwidgets.parse_many(
+                ['<t fg=red>item%d</t>' % i for i in range(1000)])
+        finally:
+            module._parse_chunk_style = parse_chunk_style
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(set(parsed.style_ids), {1})
+        self.assertEqual(parsed.texts[999], 'item999')
+        self.assertEqual(ttwidgets.parse_cache_info().currsize, 1)
+
+
+class Test_style_table(unittest.TestCase):
+    """Test the interning of styles."""
+
+    def test_intern(self):
+        table = ttwidgets.StyleTable()
+        style = table.intern({'bg': 'red', 'padx': 2}, {'size': 9}, 'upper')
+        self.assertIs(
+            table.intern({'padx': 2, 'bg': 'red'}, {'size': 9}, 'upper'),
+            style)
+        self.assertIsNot(
+            table.intern({'bg': 'red', 'padx': 2}, {'size': 9}), style)
+        self.assertIs(table[style.id], style)
+        self.assertEqual(len(table), 2)
+        with self.assertRaises(TypeError):
+            style.options['bg'] = 'blue'
+
+    def test_font_grace(self):
+        grace = ttwidgets.font_info().grace
+        try:
+            ttwidgets.set_font_grace(5)
+            info = ttwidgets.font_info()
+            self.assertEqual(info.grace, 5.0)
+            self.assertEqual(ttwidgets.get_style_table().collect(), 0)
+        finally:
+            ttwidgets.set_font_grace(grace)
+
+    def test_font_grace_0(self):
+        root = _display_root()
+        table = ttwidgets.StyleTable(grace=0)
+        fonts = [table.font({'size': size}, root) for size in (9, 11)]
+        for font in fonts:
+            table.acquire_font(font)
+        names = root.tk.splitlist(root.tk.call('font', 'names'))
+        for font in fonts:
+            self.assertTrue(table.is_shared_font(font))
+            self.assertIn(str(font), names)
+        for font in fonts:
+            table.release_font(font)
+        names = root.tk.splitlist(root.tk.call('font', 'names'))
+        for font in fonts:
+            self.assertFalse(table.is_shared_font(font))
+            self.assertNotIn(str(font), names)
+        self.assertEqual(table.font_info()[:3], (0, 0, 2))
+
+    def test_scaled_size(self):
+        scaled_size = ttwidgets.ttwidgets._scaled_size
+        self.assertEqual(scaled_size(10, 1.5), 15)
+        self.assertEqual(scaled_size(15 / 1.5, 1.0), 10)
+        self.assertEqual(scaled_size(-12, 0.5), -6)
+        self.assertEqual(scaled_size(1, 0.1), 1)
+        self.assertEqual(scaled_size(-1, 0.1), -1)
+        with self.assertRaises(ValueError):
+            ttwidgets.scale_fonts(0)
+
+
+class Test_bundle(unittest.TestCase):
+    """Test the precompiled tagged-text bundles."""
+
+    def test_bundle_round_trip(self):
+        texts = ['plain', '<t fg=red bold>a</t> <t fg=red bold>b</t>',
+                 'x <t size=9 upper>y\nz</t> <t/>']
+        data = ttwidgets.compile_bundle(dict(enumerate(texts)))
+        ttwidgets.clear_parse_cache()
+        bundle = ttwidgets.load_bundle(data)
+        try:
+            self.assertEqual(len(bundle), 3)
+            self.assertEqual(len(bundle.styles), 3)
+            for text in texts:
+                parsed = ttwidgets.parse_tagged_text(text)
+                self.assertIs(parsed, bundle.get(text))
+                self.assertEqual(
+                    parsed.chunks, tuple(ttwidgets.tokenize_tagged_text(text)))
+            self.assertEqual(ttwidgets.parse_cache_info().misses, 0)
+        finally:
+            ttwidgets.unload_bundle(bundle)
+        self.assertIsNot(ttwidgets.parse_tagged_text(texts[1]),
+                         bundle.get(texts[1]))
+
+
+class Test_adversarial(unittest.TestCase):
+    """Test the parser on pathological input."""
+
+    pieces = ['<t', '<T', '<tag', '>', '</t>', '</TAG>', '/>', '/', '<',
+              ' ', '\n', 'a', '=', "'", '"', 't', 'g']
+
+    def test_find_tag_chunks(self):
+        patt = re.compile(r'<(t(?:ag)?)\s*([^>]*)>([^>]*)</t(?:ag)?>',
+                          flags=re.IGNORECASE)
+        rnd = random.Random(0)
+        for _ in range(5000):
+            text = ''.join(rnd.choice(self.pieces)
+                           for _ in range(rnd.randint(0, 20)))
+            self.assertEqual(ttwidgets.ttwidgets._find_tag_chunks(text),
+                             patt.findall(text), text)
+            ttwidgets.clear_parse_cache()
+            ttwidgets.parse_tagged_text(text)
+            ttwidgets.split_chunk(text)
+
+    class Counting(object):
+        """A compiled pattern that counts the characters its searches scan.
+        """
+
+        def __init__(self, pattern):
+            self.pattern = pattern
+            self.steps = 0
+
+        def finditer(self, text, pos=0):
+            self.steps += len(text) - pos + 1
+            return self.pattern.finditer(text, pos)
+
+        def search(self, text, pos=0):
+            m = self.pattern.search(text, pos)
+            self.steps += (m.end() if m else len(text)) - pos + 1
+            return m
+
+    def test_linear_scan(self):
+        # the timings are in bin/bench_adversarial.py; this counts the
+        # characters scanned by the tag patterns, which must stay linear
+        # in the length of the text
+        sentinel_d = ttwidgets.ttwidgets.sentinel_d
+        opener, closer = ttwidgets.ttwidgets._tag_patterns()
+
+        def steps(text):
+            sentinel_d.update(repatt4=self.Counting(opener),
+                              repatt5=self.Counting(closer))
+            try:
+                ttwidgets.clear_parse_cache()
+                ttwidgets.parse_tagged_text(text)
+                ttwidgets.split_chunk(text)
+                return (sentinel_d['repatt4'].steps
+                        + sentinel_d['repatt5'].steps)
+            finally:
+                sentinel_d.update(repatt4=opener, repatt5=closer)
+
+        for make in (lambda n: '<t' * n + 'x</t>',
+                     lambda n: '<t' + ' <t a=1' * n + '/t>',
+                     lambda n: '<t' * n + '/>',
+                     lambda n: '<t ' + "a='b " * n + '>z</t>'):
+            for n in (500, 4000):
+                text = make(n)
+                self.assertLessEqual(steps(text), 5 * len(text), make(2))
+
+
+class Test_canvas_backend(unittest.TestCase):
+    """Test the geometry helpers of the canvas backend."""
+
+    def test_anchor_fractions(self):
+        anchor_fractions = ttwidgets.ttwidgets._anchor_fractions
+        self.assertEqual(anchor_fractions('center'), (0.5, 0.5))
+        self.assertEqual(anchor_fractions('nw'), (0.0, 0.0))
+        self.assertEqual(anchor_fractions('e'), (1.0, 0.5))
+        self.assertEqual(anchor_fractions('s'), (0.5, 1.0))
+
+    def test_bevel_coords(self):
+        top, bottom = ttwidgets.ttwidgets._bevel_coords(0, 0, 10, 6, 2)
+        self.assertEqual(top, (0, 0, 10, 0, 8, 2, 2, 2, 2, 4, 0, 6))
+        self.assertEqual(bottom, (10, 6, 0, 6, 2, 4, 8, 4, 8, 2, 10, 0))
+
+
+class Test_canvas_widget(unittest.TestCase):
+    """Test the texts, fonts, colors and bindings of widgets drawn by the
+    canvas backend."""
+
+    text = '<t fg=red>red</t> and <t b>bold</t>'
+
+    def setUp(self):
+        self.root = _display_root()
+        self.label = ttwidgets.TTLabel(self.root, text=self.text,
+                                       backend='canvas', bg='wheat')
+        self.label.update_now()
+
+    def tearDown(self):
+        self.label.destroy()
+
+    def items(self, option, item='item'):
+        canvas = self.label._compoundframe
+        return [str(canvas.itemcget(getattr(vals['label'], item), option))
+                for vals in self.label._kids.values()]
+
+    def test_texts(self):
+        self.assertIsInstance(self.label._compoundframe, tk.Canvas)
+        self.assertEqual(self.items('text'), ['red', ' and ', 'bold'])
+        self.label.config(text='<t fg=blue>blue</t> only')
+        self.label.update_now()
+        self.assertEqual(self.items('text'), ['blue', ' only'])
+
+    def test_fonts(self):
+        weights = [self.root.tk.call('font', 'actual', font, '-weight')
+                   for font in self.items('font')]
+        self.assertEqual(weights, ['normal', 'normal', 'bold'])
+
+    def test_colors(self):
+        self.assertEqual(self.items('fill')[0], 'red')
+        self.assertEqual(self.items('fill', 'bg_item'), ['wheat'] * 3)
+        self.label.config(bg='white')
+        self.label.update_now()
+        self.assertEqual(self.items('fill', 'bg_item'), ['white'] * 3)
+
+    def test_bindings(self):
+        self.label.bind('<Button-1>', lambda event: None)
+        self.assertTrue(self.label._compoundframe.bind('<Button-1>'))
+        self.label.config(text='<t fg=blue>blue</t> only')
+        self.label.update_now()
+        self.assertTrue(self.label._compoundframe.bind('<Button-1>'))
+
+
+class Test_grid_backend(unittest.TestCase):
+    """Test that the grid backend lays out the lines of a text as the
+    labels backend does, also after the text changes from 3 lines to 1."""
+
+    text3 = 'one <t fg=red>two</t>\nthree <t b>x</t>\nfour'
+    text1 = '<t fg=red>one</t> line'
+
+    def setUp(self):
+        self.root = _display_root()
+
+    def make(self, backend, **options):
+        widget = ttwidgets.TTLabel(self.root, text=self.text3,
+                                   backend=backend, **options)
+        self.addCleanup(widget.destroy)
+        widget.pack()
+        self.retext(widget, self.text3)
+        return widget
+
+    def retext(self, widget, text):
+        widget.config(text=text)
+        widget.update_now()
+        self.root.update_idletasks()
+
+    def lines(self, widget):
+        # the managed child labels with a text, by line
+        lines_d = {}
+        for vals in widget._kids.values():
+            label = vals['label']
+            if not label.cget('text'):
+                continue
+            if widget.backend == 'grid':
+                row = int(label.grid_info()['row'])
+            else:
+                row = widget._subframes.index(label.pack_info()['in'])
+            lines_d.setdefault(row, []).append(label)
+        return [lines_d[row] for row in sorted(lines_d)]
+
+    def texts(self, widget):
+        return [[label.cget('text') for label in line]
+                for line in self.lines(widget)]
+
+    def test_lines(self):
+        labels, grid = self.make('labels'), self.make('grid')
+        expected = [['one ', 'two'], ['three ', 'x'], ['four']]
+        self.assertEqual(self.texts(labels), expected)
+        self.assertEqual(self.texts(grid), expected)
+        for widget in (labels, grid):
+            self.retext(widget, self.text1)
+            self.assertEqual(self.texts(widget), [['one', ' line']])
+        self.assertEqual(
+            len([f for f in labels._subframes if f.winfo_manager()]), 1)
+        self.assertEqual(
+            set(map(str, grid._compoundframe.grid_slaves())),
+            {str(vals['label']) for vals in grid._kids.values()})
+
+    def test_justify(self):
+        for justify in ('left', 'right'):
+            grid = self.make('grid', justify=justify)
+            for text in (self.text3, self.text1):
+                self.retext(grid, text)
+                starts, ends = set(), set()
+                for line in self.lines(grid):
+                    first, last = line[0].grid_info(), line[-1].grid_info()
+                    starts.add(int(first['column']))
+                    ends.add(int(last['column']) + int(last['columnspan']))
+                self.assertEqual(len(starts if justify == 'left' else ends),
+                                 1, (justify, text))
+
+    def test_grid_columns_cleanup(self):
+        grid = self.make('grid')
+        frame, columns = grid._compoundframe, grid._grid_columns
+        self.retext(grid, self.text1)
+        self.assertLess(grid._grid_columns, columns)
+        for i in range(grid._grid_columns):
+            self.assertGreater(int(frame.grid_columnconfigure(i, 'minsize')),
+                               0)
+        for i in range(grid._grid_columns, columns):
+            self.assertEqual(int(frame.grid_columnconfigure(i, 'minsize')),
+                             0)
+
+
+class Test_update_kids(unittest.TestCase):
+    """Test that a change of text updates the child labels in place."""
+
+    def setUp(self):
+        self.root = _display_root()
+        self.label = ttwidgets.TTLabel(self.root)
+        self.addCleanup(self.label.destroy)
+
+    def retext(self, text):
+        self.label.config(text=text)
+        self.label.update_now()
+        return [vals['label'] for vals in self.label._kids.values()]
+
+    def test_unchanged_text(self):
+        text = 'a <t fg=red>b</t> c'
+        kids = self.retext(text)
+        self.assertEqual(self.retext(text), kids)
+
+    def test_changed_chunk(self):
+        kids = self.retext('a <t fg=red>b</t> c')
+        self.assertEqual(self.retext('a <t fg=red>B</t> c'), kids)
+        self.assertEqual([kid.cget('text') for kid in kids],
+                         ['a ', 'B', ' c'])
+        self.assertEqual(str(kids[1].cget('fg')), 'red')
+
+    def test_lines_added_and_removed(self):
+        kids = self.retext('<t fg=red>a</t>\nb')
+        more = self.retext('<t fg=red>a</t>\nb\nc')
+        self.assertEqual(more[:len(kids) - 1], kids[:-1])
+        self.assertEqual(len(self.label._subframes), 3)
+        self.assertEqual([kid.cget('text') for kid in more if
+                          kid.cget('text')], ['a', 'b', 'c'])
+        fewer = self.retext('<t fg=red>a</t> only')
+        self.assertEqual(fewer[0], kids[0])
+        self.assertEqual(len(self.label._subframes), 1)
+        self.assertEqual([kid.cget('text') for kid in fewer],
+                         ['a', ' only'])
+
+    def test_shared_font_swap(self):
+        refs_d = ttwidgets.get_style_table()._refs_d
+        kids = self.retext('<t b>a</t> c')
+        bold = str(kids[0].cget('font'))
+        bold_refs = refs_d.get(bold, 0)
+        self.assertEqual(self.retext('<t i>a</t> c'), kids)
+        italic = str(kids[0].cget('font'))
+        self.assertNotEqual(italic, bold)
+        self.assertEqual(refs_d.get(bold, 0), bold_refs - 1)
+        self.assertGreater(refs_d.get(italic, 0), 0)
+        self.assertEqual(
+            self.root.tk.call('font', 'actual', italic, '-slant'), 'italic')
+
+
+class Test_lazy(unittest.TestCase):
+    """Test that a lazy widget creates its child labels only when mapped,
+    idle, or updated."""
+
+    text = 'a <t fg=red>b</t>'
+
+    def setUp(self):
+        self.root = _display_root()
+
+    def make(self):
+        label = ttwidgets.TTLabel(self.root, text=self.text, lazy=True)
+        self.addCleanup(label.destroy)
+        return label
+
+    def texts(self, label):
+        return [vals['label'].cget('text') for vals in label._kids.values()]
+
+    def test_update_now(self):
+        label = self.make()
+        self.assertEqual(self.texts(label), [])
+        label.config(text='c <t b>d</t>')
+        self.assertEqual(self.texts(label), [])
+        self.assertIsNone(label._procreate_after_id)
+        label.update_now()
+        self.assertIsNone(label._lazy_ids)
+        self.assertEqual(self.texts(label), ['c ', 'd'])
+
+    def test_map(self):
+        label = self.make()
+        self.assertEqual(self.texts(label), [])
+        label.pack()
+        self.root.update()
+        self.assertIsNone(label._lazy_ids)
+        self.assertEqual(self.texts(label), ['a ', 'b'])
+
+    def test_destroy_before_map(self):
+        label = ttwidgets.TTLabel(self.root, text=self.text, lazy='idle')
+        after_id = label._lazy_ids[1]
+        self.assertIn(after_id,
+                      self.root.tk.splitlist(self.root.tk.call('after',
+                                                               'info')))
+        label.destroy()
+        self.assertNotIn(after_id,
+                         self.root.tk.splitlist(self.root.tk.call('after',
+                                                                  'info')))
+
+
+class Test_procreate_when_idle(unittest.TestCase):
+    """Test that changes of the text procreate the child labels once, when
+    idle, or at once with update_now()."""
+
+    texts = ['a <t fg=red>b</t>', 'c <t b>d</t>', 'e <t i>f</t> g']
+
+    def setUp(self):
+        self.root = _display_root()
+        self.label = ttwidgets.TTLabel(self.root, text='x')
+        self.addCleanup(self.label.destroy)
+        self.label.update_now()
+        self.calls = []
+        procreate = self.label._procreate
+
+        def counting(*args, **kwargs):
+            self.calls.append(args)
+            return procreate(*args, **kwargs)
+
+        self.label._procreate = counting
+
+    def kid_texts(self):
+        return [vals['label'].cget('text')
+                for vals in self.label._kids.values()]
+
+    def test_coalesce(self):
+        for text in self.texts:
+            self.label.config(text=text)
+        self.assertEqual(len(self.calls), 0)
+        self.root.update_idletasks()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.kid_texts(), ['e ', 'f', ' g'])
+
+    def test_update_now(self):
+        for text in self.texts:
+            self.label.config(text=text)
+        self.label.update_now()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.kid_texts(), ['e ', 'f', ' g'])
+        self.root.update_idletasks()
+        self.assertEqual(len(self.calls), 1)
+
+
+class Test_widget_pool(unittest.TestCase):
+    """Test the pool of unused child widgets, without a display."""
+
+    class Widget:
+        def __init__(self, master, name):
+            self.master, self.name, self.destroyed = master, name, False
+
+        def __str__(self):
+            return self.name
+
+        def destroy(self):
+            self.destroyed = True
+
+    def test_acquire_release(self):
+        pool = ttwidgets.WidgetPool(maxsize=2)
+        top = self.Widget(None, '.')
+        master = self.Widget(top, '.w')
+        kids = [self.Widget(master, '.w.k%d' % i) for i in range(3)]
+        self.assertIsNone(pool.acquire(master, self.Widget))
+        for kid in kids:
+            pool.release(master, kid)
+        self.assertTrue(kids[2].destroyed)
+        self.assertEqual(pool.info(), (0, 1, 2, 2))
+        self.assertIs(pool.acquire(master, self.Widget), kids[1])
+        self.assertIsNone(pool.acquire(top, self.Widget))
+        self.assertEqual(pool.info(), (1, 2, 1, 2))
+        pool.resize(0)
+        self.assertTrue(kids[0].destroyed)
+        self.assertEqual(pool.info().size, 0)
+
+    def test_recycled_bindings(self):
+        root = _display_root()
+        button = ttwidgets.TTButton(root, text='a <t fg=red>b</t> c')
+        self.addCleanup(button.destroy)
+
+        def commands():
+            root.update_idletasks()
+            return len(root.tk.splitlist(root.tk.call('info', 'commands')))
+
+        button._kids = button._procreate(bind=True)
+        count = commands()
+        for _ in range(3):
+            button._kids = button._procreate(bind=True)
+        self.assertEqual(commands(), count)
+        self.assertEqual(len(button._kid_funcids_d), 3)
+
+
+class Test_font_metrics(unittest.TestCase):
+    """Test the font metrics cache and batched measurement."""
+
+    def setUp(self):
+        self.root = _display_root()
+
+    def test_measure_many(self):
+        font = tk_font.Font(root=self.root, family='Courier', size=12)
+        strings = ['', 'a', 'abc', 'Hello, world!', 'a', 'M' * 40]
+        self.assertEqual(ttwidgets.measure_many(font, strings, self.root),
+                         [font.measure(s) for s in strings])
+
+    def test_update_named_font(self):
+        font = tk_font.Font(root=self.root, name='TTTestMetricsFont',
+                            family='Courier', size=8, exists=False)
+        metrics = ttwidgets.font_metrics(font, self.root)
+        widths = ttwidgets.measure_many(font, ['m', 'mm'], self.root)
+        ttwidgets.update_named_font(str(font), size=24)
+        self.assertGreater(ttwidgets.font_metrics(font, self.root).linespace,
+                           metrics.linespace)
+        self.assertEqual(ttwidgets.font_metrics(font, self.root).linespace,
+                         font.metrics('linespace'))
+        self.assertEqual(ttwidgets.measure_many(font, ['m', 'mm'], self.root),
+                         [font.measure('m'), font.measure('mm')])
+        self.assertNotEqual(widths, [font.measure('m'), font.measure('mm')])
+
+
+class Test_font_dict_cache(unittest.TestCase):
+    """Test the memo of get_font_dict()."""
+
+    def setUp(self):
+        self.root = _display_root()
+
+    def actual_size(self, name):
+        return tk_font.Font(root=self.root, name=name, exists=True).actual(
+            'size')
+
+    def test_update_named_font(self):
+        font = tk_font.Font(root=self.root, name='TTTestDictFont',
+                            family='Courier', size=9, exists=False)
+        self.assertEqual(ttwidgets.get_font_dict(str(font))['size'],
+                         self.actual_size(str(font)))
+        ttwidgets.update_named_font(str(font), size=19, weight='bold')
+        font_d = ttwidgets.get_font_dict(str(font))
+        self.assertEqual(font_d['size'], self.actual_size(str(font)))
+        self.assertEqual(font_d['weight'], 'bold')
+
+    def test_scale_fonts(self):
+        name = str(ttwidgets.get_named_font(('Courier', 11)))
+        size = ttwidgets.get_font_dict(name)['size']
+        try:
+            ttwidgets.scale_fonts(2)
+            self.assertNotEqual(self.actual_size(name), size)
+            self.assertEqual(ttwidgets.get_font_dict(name)['size'],
+                             self.actual_size(name))
+        finally:
+            ttwidgets.scale_fonts(0.5)
+        self.assertEqual(ttwidgets.get_font_dict(name)['size'], size)
+
+
+class Test_named_fonts(unittest.TestCase):
+    """Test the index of the registry of named fonts."""
+
+    def test_font_key(self):
+        font_key = ttwidgets.ttwidgets._font_key
+        key = ('Courier', 12, 'bold', 'roman', 1, 0)
+        self.assertEqual(font_key(dict(family='Courier', size=12,
+                                       weight='bold', slant='roman',
+                                       underline=1, overstrike=0)), key)
+        self.assertEqual(font_key(dict(family='Courier', size='12',
+                                       weight='BOLD', underline=True,
+                                       overstrike='False')), key)
+        self.assertEqual(font_key(dict(family='Courier', size='12.5',
+                                       weight='bold', underline=1)), key)
+
+
+class Test_create_many(unittest.TestCase):
+    """Test bulk creation and cloning of widgets."""
+
+    def setUp(self):
+        self.root = _display_root()
+
+    def test_create_many(self):
+        labels = ttwidgets.TTLabel.create_many(
+            self.root,
+            ['plain', '<t fg=red>red</t> and <t b>bold</t>',
+             dict(text='x', bg='white')],
+            relief='sunken')
+        try:
+            for label in labels:
+                label.update_now()
+            self.assertEqual([type(label) for label in labels],
+                             [ttwidgets.TTLabel] * 3)
+            self.assertEqual([str(label.cget('relief')) for label in labels],
+                             ['sunken'] * 3)
+            self.assertEqual(str(labels[2].cget('bg')), 'white')
+            self.assertEqual([label.emulation_b for label in labels],
+                             [False, True, False])
+            self.assertEqual(len(labels[1]._kids), 3)
+        finally:
+            for label in labels:
+                label.destroy()
+
+    def test_clone_then_destroy_original(self):
+        style_table = ttwidgets.get_style_table()
+        label = ttwidgets.TTLabel(self.root, text='<t size=13 fg=red>x</t>',
+                                  bg='white')
+        label.update_now()
+        font = str(label.widget.cget('font'))
+        self.assertTrue(style_table.is_shared_font(font))
+        copies = label.clone(2)
+        label.destroy()
+        style_table.collect(0)
+        try:
+            names = self.root.tk.splitlist(self.root.tk.call('font', 'names'))
+            self.assertIn(font, names)
+            for copy in copies:
+                copy.update_now()
+                self.assertEqual(str(copy.cget('bg')), 'white')
+                self.assertEqual(str(copy.widget.cget('foreground')), 'red')
+                self.assertEqual(str(copy.widget.cget('font')), font)
+                self.assertEqual(copy.widget.cget('text'), 'x')
+        finally:
+            for copy in copies:
+                copy.destroy()
+
+
+class Test_option_mirror(unittest.TestCase):
+    """Test that state widget options are read from the Python mirror."""
+
+    class Widget(object):
+        def configure(self, option):
+            return ('text', 'text', 'Text', '', 'from var')
+
+        def cget(self, option):
+            raise AssertionError('cget should not reach Tcl')
+
+    def test_mirror_reads(self):
+        ttwidget = object.__new__(ttwidgets.TTWidget)
+        ttwidget.widget = self.Widget()
+        ttwidget._callbacks_d = {}
+        ttwidget._config_d = {
+            'background': ('background', 'background', 'Background',
+                           '#d9d9d9', 'red'),
+            'bg': ('bg', '-background'),
+            'text': ('text', 'text', 'Text', '', 'stored'),
+        }
+        cget = ttwidget._widget_cget
+        self.assertEqual(cget('bg', cook=False), 'red')
+        self.assertEqual(cget('bg', default=True), '#d9d9d9')
+        self.assertEqual(cget('text', cook=False), 'stored')
+        self.assertIsNone(cget('nosuchoption', cook=False))
+        ttwidget._callbacks_d['textvariable'] = 'var'
+        self.assertEqual(cget('text', cook=False), 'from var')
+
+    def test_callback_registry(self):
+        ttwidget = object.__new__(ttwidgets.TTWidget)
+        ttwidget.widget = self.Widget()
+        command = lambda: None  # noqa: E731
+        ttwidget._callbacks_d = {'command': command}
+        ttwidget._config_d = {
+            'command': ('command', 'command', 'Command', '',
+                        '140213<lambda>'),
+        }
+        self.assertIs(ttwidget._widget_cget('command'), command)
+        self.assertIs(ttwidget.command, command)
+        self.assertEqual(ttwidget._widget_cget('command', cook=False),
+                         '140213<lambda>')
+
+
+class Test_config_kids(unittest.TestCase):
+    """Test the propagation of options to the child labels in one call."""
+
+    class Tk(object):
+        def __init__(self):
+            self.calls = []
+
+        def call(self, *args):
+            self.calls.append(args)
+
+    def test_one_call(self):
+        ttwidget = object.__new__(ttwidgets.TTWidget)
+        ttwidget.tk = self.Tk()
+        ttwidget.backend = 'labels'
+        ttwidget._kid_fonts_d = {}
+        ttwidget._kids = {}
+        for i, attrs in enumerate(('fg=red', '', None)):
+            label = object.__new__(tk.Label)
+            label._w = '.l%d' % i
+            ttwidget._kids[label._w] = dict(label=label, attrs=attrs)
+        ttwidget._config_kids({'background': 'white'},
+                              each={'.l1': {'text': 'X'}})
+        self.assertEqual(len(ttwidget.tk.calls), 1)
+        self.assertEqual(ttwidget.tk.calls[0][2], ('.l0', '.l1', '.l2'))
+        self.assertEqual(ttwidget.tk.calls[0][3], (
+            ('-background', 'white', '-foreground', 'red'),
+            ('-background', 'white', '-text', 'X'),
+            ('-background', 'white'),
+        ))
+        self.assertEqual(ttwidget._kids['.l0']['options'],
+                         {'background': 'white', 'foreground': 'red'})
+
+
+class Test_batch(unittest.TestCase):
+    """Test the queueing of config() options by batch()."""
+
+    def test_queue(self):
+        ttwidget = object.__new__(ttwidgets.TTWidget)
+        ttwidget.widget_option_aliases_d = {'bg': 'background',
+                                            'fg': 'foreground'}
+        with self.assertRaises(ValueError):
+            with ttwidgets.batch(ttwidget):
+                ttwidget.config(bg='red', text='a')
+                with ttwidget.batch():
+                    ttwidget.config(background='blue', fg='white')
+                self.assertEqual(
+                    list(ttwidget._batch_options.items()),
+                    [('background', 'blue'), ('text', 'a'),
+                     ('foreground', 'white')])
+                raise ValueError
+        self.assertIsNone(ttwidget._batch_options)
+
+
 if __name__ == '__main__':
     unittest.main()
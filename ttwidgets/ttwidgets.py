@@ -33,28 +33,52 @@ This package includes the following:
         TTButton
         TTLabel
         TTListbox
+        TTTemplate
         TTToolTip
+        TaggedTextBundle
+        StyleTable
+        WidgetPool
 
     METHODS:
 
         alias
+        batch
+        clear_font_cache
+        clear_parse_cache
+        compile_bundle
+        compile_template
         convert_font_dict_to_ttoptions_dict
         convert_ttoptions_dict_to_font_dict
         dump
+        font_info
+        font_metrics
         gen_tag_attrs
         get_font_dict
         get_named_font
+        get_style_table
         is_tagged_text
+        load_bundle
+        measure_many
         pare_dict
+        parse_cache_info
+        parse_many
         parse_tag_attrs
+        parse_tagged_text
         quote
+        scale_fonts
+        set_font_grace
+        set_parse_cache_size
+        set_widget_pool_size
         split_attrs
         split_chunk
         split_dict_into_options_fontattrs_and_case
         split_tagged_text_into_chunks
         strip_tags
+        tokenize_tagged_text
         unalias
+        unload_bundle
         update_named_font
+        widget_pool_info
         wrap_tagged_text
 
 Copyright 2020 Gary Michael Bloom
@@ -86,12 +110,18 @@ elif PyMajorVers_i == 2:
     import Tkinter as tk
     import tkFont as tk_font
     import ScrolledText as tk_scrolledtext
+import array
 import collections
+import contextlib
 import io
+import json
 import pprint
 import re
 import string
 import textwrap
+import time
+import types
+import zlib
 
 PyVers_f = float("{0}.{1}{2}".format(*sys.version_info[:3]))
 PyVers_s = "{0}.{1}.{2}".format(*sys.version_info[:3])
@@ -112,6 +142,21 @@ ButtonRelease_x_s = "<ButtonRelease-%d>" % RMB
 
 Chunk = collections.namedtuple("Chunk", "tag attrs text")
 TAG, ATTRS, TEXT = range(3)
+ParsedChunk = collections.namedtuple(
+    "ParsedChunk", "tag attrs text start end tokens tagged"
+)
+ChunkStyle = collections.namedtuple("ChunkStyle", "options font case")
+ParsedText = collections.namedtuple("ParsedText", "text chunks styles tagged")
+ParsedMany = collections.namedtuple("ParsedMany", "texts style_ids styles")
+Style = collections.namedtuple("Style", "id options font case")
+CacheInfo = collections.namedtuple(
+    "CacheInfo", "hits misses evictions maxsize currsize"
+)
+FontInfo = collections.namedtuple("FontInfo", "live idle evicted grace")
+FontMetrics = collections.namedtuple(
+    "FontMetrics", "ascent descent linespace fixed widths"
+)
+PoolInfo = collections.namedtuple("PoolInfo", "hits misses size maxsize")
 
 debug_mode_b = False
 
@@ -133,6 +178,23 @@ ALT_KEY = 0x20000  # 131072 #
 
 tk_default_fonts_t = ("TkDefaultFont", "TkTextFont", "TkFixedFont")
 _named_fonts_d = {k: None for k in tk_default_fonts_t}
+_named_font_keys_d = {}  # name: the normalized attribute keys of the font
+_named_font_index_d = {}  # normalized attribute key: name of first match
+_font_dicts_d = collections.OrderedDict()  # (root, font): actual() dict
+_font_metrics_d = collections.OrderedDict()  # (root, font): FontMetrics
+_font_cache_maxsize = 1024
+_font_scale = 1.0  # the overall factor of scale_fonts()
+_named_font_sizes_d = {}  # name: size of the font at a scale of 1
+# Tcl lambdas, so that a font is measured in a single evaluation
+_tcl_configure_many = (
+    "{ws cfgs} {foreach w $ws cfg $cfgs"
+    " {if {[winfo exists $w]} {$w configure {*}$cfg}}}"
+)
+_tcl_font_metrics = "{f} {list [font metrics $f] [font measure $f 0]}"
+_tcl_measure_many = (
+    "{f ss} {set ws {}; foreach s $ss {lappend ws [font measure $f $s]};"
+    " return $ws}"
+)
 
 activebackground_as = abg_s = "abg"  # unofficial alias
 activebackground_s = "activebackground"  # Widget option not in Frame
@@ -144,11 +206,13 @@ anchor_as = anc_s = "anc"
 anchor_s = "anchor"  # Widget option not in Frame
 background_as = bg_s = "bg"  # alias
 background_s = "background"
+backend_s = "backend"  # TTWidget option for how the children are drawn
 borderwidth_as = bd_s = "bd"  # alias
 borderwidth_s = "borderwidth"
 bitmap_as = bit_s = "bit"
 bitmap_s = "bitmap"  # Widget option not in Frame
 bold_as = b_s = "b"
+canvas_s = "canvas"  # backend drawing the children on a single Canvas
 capitalize_as = cap_s = "cap"
 capitalize_s = "capitalize"
 case_as = cas_s = "cas"
@@ -184,6 +248,7 @@ foverstrike_s = "foverstrike"
 frame_s = "frame"
 funderline_as = u_s = "u"
 funderline_s = "funderline"
+grid_s = "grid"  # backend of child Labels in a single grid
 height_as = h_s = "h"
 height_s = "height"
 highlightbackground_as = hlb_s = "hlb"  # unoffical alias
@@ -192,6 +257,7 @@ highlightcolor_as = hlc_s = "hlc"  # unoffical alias
 highlightcolor_s = "highlightcolor"
 highlightthickness_as = hlt_s = "hlt"  # unoffical alias
 highlightthickness_s = "highlightthickness"
+idle_s = "idle"  # lazy TTWidget procreated when mapped or idle
 image_as = img_s = "img"
 image_s = "image"  # Widget option not in Frame
 in_s = "in"  # pack option
@@ -202,6 +268,8 @@ ipady_s = "ipady"  # pack option
 italic_as = i_s = "i"
 justify_as = jus_s = "jus"
 justify_s = "justify"  # Widget option not in Frame
+labels_s = "labels"  # backend of child Labels in Frames
+lazy_s = "lazy"  # TTWidget creation option to defer procreation
 listvariable_as = lv_s = "lv"
 listvariable_s = "listvariable"  # Listbox only
 lower_as = lo_s = "lo"
@@ -240,16 +308,19 @@ swapcase_as = sw_s = "sw"
 swapcase_s = "swapcase"
 takefocus_as = tf_s = "tf"
 takefocus_s = "takefocus"
+template_s = "template"  # TTWidget option for a TTTemplate
 text_as = txt_s = "txt"
 text_s = "text"  # Widget option not in Frame
 textvariable_as = tv_s = "tv"
 textvariable_s = "textvariable"  # Widget option not in Frame
 title_as = ti_s = "ti"
 title_s = "title"
+toplevel_s = "toplevel"
 underline_as = ul_s = "ul"
 underline_s = "underline"  # Widget option not in Frame
 upper_as = up_s = "up"
 upper_s = "upper"
+values_s = "values"  # TTWidget option for the slot values of a TTTemplate
 visual_s = "visual"  # Frame option not in Button/Label
 weight_as = wt_s = "wt"
 weight_s = "weight"
@@ -385,11 +456,103 @@ def __init_widget_option_unaliases_d():
         _widget_option_unaliases_d.update(**update_d)
 
 
+def __init_tag_attr_handlers_d():
+    # index the tag attribute handlers by key prefix and by every known key
+    for handlers_d, rules in (
+            (_tag_attr_parsers_d, _tag_attr_parser_rules),
+            (_tag_attr_formatters_d, _tag_attr_formatter_rules),
+    ):
+        prefix_d, exact_d, alias_d = {}, {}, {}
+        for priority, (_, prefixes, aliases) in enumerate(rules):
+            for n, prefix in prefixes:
+                if len(prefix) == n:
+                    prefix_d.setdefault(prefix, priority)
+                else:  # shorter than its slice, so it only matches exactly
+                    exact_d.setdefault(prefix, priority)
+            for kalias in aliases:
+                alias_d.setdefault(kalias, priority)
+        handlers_d[None] = rules, prefix_d, exact_d, alias_d
+        for key in (
+                list(_widget_option_aliases_d)
+                + list(_widget_option_aliases_d.values())
+                + list(ttfont_dict_keys)
+                + list(font_dict_keys)
+                + list(case_dict_keys)
+        ):
+            _resolve_tag_attr(key.lower(), handlers_d)
+
+
+def _anchor_fractions(anchor):
+    # the fractions of the free width and height to the left of and above
+    # something placed at ANCHOR
+    anchor = str(anchor)
+    if anchor == tk.CENTER:
+        return 0.5, 0.5
+    fx = 0.0 if "w" in anchor else 1.0 if "e" in anchor else 0.5
+    fy = 0.0 if "n" in anchor else 1.0 if "s" in anchor else 0.5
+    return fx, fy
+
+
+def _bevel_coords(x0, y0, x1, y1, bd):
+    # the polygons of the top-left and the bottom-right of a bevel BD thick
+    # inside the rectangle from x0, y0 to x1, y1
+    return (
+        (x0, y0, x1, y0, x1 - bd, y0 + bd, x0 + bd, y0 + bd, x0 + bd,
+         y1 - bd, x0, y1),
+        (x1, y1, x0, y1, x0 + bd, y1 - bd, x1 - bd, y1 - bd, x1 - bd,
+         y0 + bd, x1, y0),
+    )
+
+
+def _find_tag_chunks(chunk):
+    """Return the tag chunks in CHUNK, as (tag, attrs, text) tuples, the same
+    as from the findall() of the pattern
+
+        <(t(?:ag)?)\\s*([^>]*)>([^>]*)</t(?:ag)?>
+
+    but in time linear in the length of CHUNK, however many openers it has.
+    A match must end at the second '>' after its opener, and each opener
+    between two '>'s shares the same two, so each is found only once.
+    """
+    opener, _ = _tag_patterns()
+    matches = []
+    pos = 0
+    head = tail = -1  # the first two '>'s after the last opener
+    for m_open in opener.finditer(chunk):
+        start = m_open.start()
+        if start < pos:
+            continue
+        if head < start + 2:
+            head = chunk.find(">", start + 2)
+            if head < 0:
+                break
+            tail = chunk.find(">", head + 1)
+        if tail < 0:
+            break
+        if chunk[tail - 5:tail + 1].lower() == "</tag>" and tail - 5 > head:
+            closer = 6
+        elif chunk[tail - 3:tail + 1].lower() == "</t>" and tail - 3 > head:
+            closer = 4
+        else:
+            continue
+        tag = chunk[start + 1:start + 4]
+        if tag.lower() != "tag":
+            tag = chunk[start + 1]
+        attrs = chunk[start + 1 + len(tag):head].lstrip()
+        matches.append((tag, attrs, chunk[head + 1:tail + 1 - closer]))
+        pos = tail + 1
+    return matches
+
+
 def _flesh_config(widget, cfg, **kw):
     # make sure all font, case, and aliases are rep
+    callbacks_d = kw.pop("callbacks", {})
     defaults_d = kw.pop("defaults", {})
     _ = kw.pop("pared", False)  # UNUSED pared_b
     d = cfg.copy()
+    for k, v in callbacks_d.items():
+        if k in d:
+            d[k] = d[k][:4] + (v,)  # the object, not its Tcl name
     od = {}
     if isinstance(widget, (TTButton, TTLabel)):
         def_font = widget._widget_config(font_s)[-2]
@@ -399,7 +562,7 @@ def _flesh_config(widget, cfg, **kw):
         def_font = "TkDefaultFont"
     else:
         return cfg
-    def_font_d = tk_font.Font(font=def_font)
+    def_font_d = get_font_dict(def_font)
     if text_s not in cfg:
         text = widget.text if hasattr(widget, text_s) else ""
         d[text_s] = (text_s, "", "", "", text)
@@ -423,6 +586,40 @@ def _flesh_config(widget, cfg, **kw):
     return od
 
 
+def _font_key(font_d):
+    # the (family, size, weight, slant, underline, overstrike) of FONT_D,
+    # normalized to index the registry of named fonts
+    return (
+        str(font_d.get(family_s, "")),
+        int(float(font_d.get(size_s, 0))),
+        str(font_d.get(weight_s, tk_font.NORMAL)).lower(),
+        str(font_d.get(slant_s, tk_font.ROMAN)).lower(),
+        0 if str(font_d.get(underline_s, 0)) in ("0", "False") else 1,
+        0 if str(font_d.get(overstrike_s, 0)) in ("0", "False") else 1,
+    )
+
+
+def _font_root(master):
+    # the Tk root whose interpreter measures fonts for MASTER
+    root = master._root() if master else tk._default_root
+    if root is None:
+        raise RuntimeError("Too early to use font: no default root window")
+    return root
+
+
+def _font_spec(font):
+    # FONT as given to Tcl: the name of a tk_font.Font, else the description
+    return str(font) if isinstance(font, tk_font.Font) else font
+
+
+def _forget_font(name):
+    # drop the cached attributes and metrics of the font NAME, after it is
+    # changed
+    for cache_d in (_font_dicts_d, _font_metrics_d):
+        for key in [key for key in cache_d if key[1] == name]:
+            del cache_d[key]
+
+
 def _func_name(levels=1):
     import inspect
 
@@ -449,10 +646,47 @@ def _get_pared_cfg(cfg, index=-1, **kw):
     return {k: v[index] for k, v in cfg.items() if len(v) == 5}
 
 
+def _hashable(val):
+    # VAL, or a hashable stand-in for it, such as for a tk_font.Font
+    try:
+        hash(val)
+    except TypeError:
+        return type(val), str(val)
+    return val
+
+
+def _index_named_fonts():
+    # rebuild the index of the registry of named fonts from the stored keys
+    _named_font_index_d.clear()
+    for name, keys in _named_font_keys_d.items():
+        for key in keys:
+            _named_font_index_d.setdefault(key, name)
+
+
+def _init_named_fonts():
+    # add the default Tkinter fonts to the registry of named fonts
+    if _named_fonts_d.get("TkDefaultFont") is None:
+        for name in tk_default_fonts_t:
+            _register_named_font(tk_font.nametofont(name))
+
+
+def _is_tagged_chunks(text, chunks):
+    return len(text) > sum(len(chunk.text) for chunk in chunks)
+
+
 def _is_tk_def_font(f):
     return str(f) in tk_default_fonts_t
 
 
+def _merge_chunk_style(style, options_d, font_d):
+    # same as parse_tag_attrs() of the chunk onto copies of the two dicts
+    options_d = options_d.copy()
+    options_d.update(style.options)
+    font_d = font_d.copy()
+    font_d.update(_scale_font_dict(style.font))
+    return options_d, font_d, style.case
+
+
 def _merge_dicts(d1, *dX):  # for Py2
     m_d = collections.OrderedDict(d1)
     for d in dX:
@@ -460,6 +694,13 @@ def _merge_dicts(d1, *dX):  # for Py2
     return m_d
 
 
+def _parse_chunk_style(attrs, **kw):
+    options_d, font_d, case = parse_tag_attrs(attrs, {}, {}, **kw)
+    return ChunkStyle(
+        types.MappingProxyType(options_d), types.MappingProxyType(font_d), case
+    )
+
+
 def _print_cfg(widget, **kwargs):
     for key, val in kwargs.items():
         setattr(widget, "_print_cfg_{key}_b".format(key=key), val)
@@ -496,6 +737,261 @@ def _print_out(widget, text_w, *args, **kwargs):
     return stringy
 
 
+def _register_named_font(font, key=None):
+    # add FONT to the registry of named fonts, indexed by its actual
+    # attributes and by any requested attributes KEY
+    name = str(font)
+    keys = (_font_key(font.actual()),)
+    if key and key != keys[0]:
+        keys += (key,)
+    known_b = name in _named_font_keys_d
+    _named_fonts_d[name] = font
+    _named_font_keys_d[name] = keys
+    if known_b:
+        _index_named_fonts()
+    else:
+        for key in keys:
+            _named_font_index_d.setdefault(key, name)
+
+
+def _rescale_named_fonts(old_scale, new_scale):
+    # resize the registry of named fonts in place, from OLD_SCALE to
+    # NEW_SCALE, re-keying the index without any Tcl queries
+    for name, keys in list(_named_font_keys_d.items()):
+        size = keys[0][1]
+        if not size:
+            continue
+        base = _named_font_sizes_d.setdefault(name, size / old_scale)
+        new_size = _scaled_size(base, new_scale)
+        if new_size != size:
+            _named_fonts_d[name].configure(size=new_size)
+            _named_font_keys_d[name] = tuple(
+                key[:1] + (new_size,) + key[2:] for key in keys
+            )
+    _index_named_fonts()
+
+
+def _resolve_tag_attr(key, handlers_d):
+    # find the handler for an unknown tag attribute KEY by its prefix
+    rules, prefix_d, exact_d, alias_d = handlers_d[None]
+    option = unalias(key)
+    parser_b = rules is _tag_attr_parser_rules
+    kalias = alias(option if parser_b else key)
+    priorities = [prefix_d.get(key[:n]) for n in (2, 3, 4, 7)]
+    priorities += [exact_d.get(key), alias_d.get(kalias)]
+    priorities = [p for p in priorities if p is not None]
+    handler = rules[min(priorities)][0] if priorities else rules[-1][0]
+    result = (handler, option) if parser_b else (handler, (kalias, option))
+    if len(handlers_d) < 4096:
+        handlers_d[key] = result
+    return result
+
+
+def _scale_font_dict(font_d):
+    # FONT_D, with a requested size scaled by scale_fonts()
+    if _font_scale == 1 or not font_d.get(size_s):
+        return font_d
+    font_d = dict(font_d)
+    font_d[size_s] = _scaled_size(float(font_d[size_s]), _font_scale)
+    return font_d
+
+
+def _scaled_size(size, scale):
+    # SIZE times SCALE as a Tk font size, keeping its sign (negative sizes
+    # are in pixels) and never rounding down to 0 (the default size)
+    scaled = int(round(size * scale))
+    return scaled or (1 if size > 0 else -1)
+
+
+def _shade_color(widget, color, factor):
+    # COLOR lightened (FACTOR > 1) or darkened (FACTOR < 1), like the light
+    # and dark shades of a Tk 3-D border
+    rgb = widget.winfo_rgb(color)
+    if factor > 1:
+        rgb = [max(min(int(c * factor), 65535), (c + 65535) // 2) for c in rgb]
+    else:
+        rgb = [int(c * factor) for c in rgb]
+    return "#%04x%04x%04x" % tuple(rgb)
+
+
+def _split_single_chunk(text):
+    # (style, text) of TEXT taken as a single chunk, as in split_chunk()
+    parsed = parse_tagged_text(text)
+    if len(parsed.chunks) == 1:
+        chunk = parsed.chunks[0]
+        return parsed.styles[0] if chunk.tokens else None, chunk.text
+    if not parsed.chunks:
+        return None, ""
+    _, attrs, text = split_chunk(text)
+    return _parse_chunk_style(attrs) if attrs else None, text
+
+
+def _split_single_chunk_attrs(text):
+    # (attributes, text) of TEXT taken as a single chunk, as in split_chunk()
+    chunks = tokenize_tagged_text(text)
+    if len(chunks) == 1:
+        return chunks[0].attrs if chunks[0].tokens else "", chunks[0].text
+    if not chunks:
+        return "", ""
+    return split_chunk(text)[ATTRS:]
+
+
+def _split_tag_chunk(chunk):
+    """Split a tag CHUNK, as delimited by tokenize_tagged_text(), into its
+    tag, attributes, and text.
+
+    Returns a tuple of tag, attributes, text, and a flag which is False if
+    the CHUNK is malformed and must be treated as plain text.
+
+    Only the text attribute of a self-closing tag is taken out here; its
+    other attributes are left as they are, to be parsed with its style.
+    """
+    if chunk.endswith("/>"):
+        chunk_split = chunk.split(None, 1)
+        if len(chunk_split) > 1:
+            tag, attrs = chunk_split[0][1:], chunk_split[1][:-2]
+        else:
+            tag, attrs = chunk[1:-2], ""
+        tokens, text = [], ""
+        for token in _tokenize_attrs(attrs):
+            key, eq, value = token.partition("=")
+            if eq and unalias(key.strip().lower()) == text_s:
+                text = unquote(value.strip())
+            else:
+                tokens.append(token)
+        return tag, " ".join(tokens), text, True
+    head = chunk.find(">")
+    tail = chunk[-6:].lower()
+    closer = 6 if tail == "</tag>" else 4 if tail[-4:] == "</t>" else 0
+    if closer and head < len(chunk) - closer:
+        text = chunk[head + 1:len(chunk) - closer]
+        if ">" not in text:
+            tag = chunk[1:4] if chunk[1:4].lower() == "tag" else chunk[1:2]
+            return tag, chunk[len(tag) + 1:head].lstrip(), text, True
+    # unusual shapes are left to the original chunk pattern
+    matches = _find_tag_chunks(chunk)
+    if len(matches) == 1:
+        return matches[0] + (True,)
+    return "", "", chunk, False
+
+
+def _style_key(d):
+    # hashable key of the items of D, whose order does not matter
+    return tuple(sorted((k, _hashable(v)) for k, v in d.items()))
+
+
+def _tag_patterns():
+    # the compiled patterns that open and close a tagged-text chunk
+    if not sentinel_d.get("repatt4"):
+        sentinel_d.update(
+            repatt4=re.compile(r"<t", flags=re.IGNORECASE),
+            repatt5=re.compile(r"/(?:t(?:ag)?)?>", flags=re.IGNORECASE),
+        )
+    return sentinel_d["repatt4"], sentinel_d["repatt5"]
+
+
+def _tokenize_attrs(s):
+    """Split an attributes string S into tokens in a single forward pass.
+
+    Returns a list of strings.  A quote that is never closed is taken as
+    plain text rather than swallowing the rest of S.
+    """
+    if not sentinel_d.get("repatt3"):
+        sentinel_d.update(repatt3=re.compile(r"(\s+)"))
+    fields = sentinel_d["repatt3"].split(s)
+    tokens = []
+    token = None
+    quote_q = ""
+    unclosed_d = {}  # quote: offset after which it never appears
+    end = 0
+    for x, word in enumerate(fields):
+        end += len(word)
+        if x % 2 or not word:
+            continue
+        if quote_q:  # inside a quoted value, so keep the white space
+            token += fields[x - 1] + word
+            if quote_q in word:
+                quote_q = ""
+            continue
+        if token is not None and (token.endswith("=") or word[0] == "="):
+            token += word
+        else:
+            if token is not None:
+                tokens.append(token)
+            token = word
+        eq = token.find("=")
+        vx = eq + 1 if eq >= 0 else 0  # where the value starts
+        if len(token) - len(word) <= vx < len(token) and token[vx] in "\"'":
+            q = token[vx]
+            if token.startswith(3 * q, vx):
+                q = 3 * q
+            if token.find(q, vx + len(q)) < 0:
+                if end < unclosed_d.get(q, end + 1) and s.find(q, end) >= 0:
+                    quote_q = q
+                else:
+                    unclosed_d[q] = min(end, unclosed_d.get(q, end))
+    if token is not None:
+        tokens.append(token)
+    return tokens
+
+
+def _unbind_func(widget, sequence, funcid):
+    # unbind only the function FUNCID from SEQUENCE of WIDGET, keeping any
+    # other bindings, which unbind() drops in older Pythons
+    script = widget.tk.call("bind", widget._w, sequence)
+    keep = "\n".join(
+        line for line in script.split("\n") if funcid not in line
+    )
+    widget.tk.call("bind", widget._w, sequence, keep)
+    widget.deletecommand(funcid)
+
+
+def _wrap_chunks(divs, count):
+    # the texts of the chunks DIVS wrapped at COUNT, or None if unchanged
+    if not divs:
+        return None
+    total_string = "".join([div.text for div in divs])
+    final_nl_b = total_string.endswith("\n")
+    total_lines = total_string.splitlines()
+    wrapped_s = "\n".join(
+        [textwrap.fill(s, count) for s in total_lines]
+    ) + ("\n" if final_nl_b else "")
+    # now have to map the wrapped_string to the divs!
+    insert_pts = []
+    divx = x = tl = wi = 0
+    div = divs[divx]
+    dl = len(div.text)
+    for tsc in total_string:
+        if wrapped_s[wi] != tsc:
+            insert_pts.append([wi, divx, x, tl + x, tsc.isspace()])
+            if not tsc.isspace():
+                wi += 1
+        wi += 1
+        x += 1
+        if x >= dl:
+            tl += dl
+            x = 0
+            divx += 1
+            try:
+                div = divs[divx]
+                if div:
+                    try:
+                        dl = len(div.text)
+                    except AttributeError:
+                        pass
+            except IndexError:
+                pass
+    if not insert_pts:
+        return None
+    texts = [div.text for div in divs]
+    for ipt in insert_pts[::-1]:
+        _, divx, x, _, sp = ipt
+        texts[divx] = "{0}\n{1}".format(
+            divs[divx].text[:x], divs[divx].text[x + 1 if sp else x:],
+        )
+    return texts
+
+
 def alias(option=None):
     """Get the alias of a particular TTWidgets OPTION.
 
@@ -608,6 +1104,89 @@ def alias(option=None):
     return result
 
 
+@contextlib.contextmanager
+def batch(*widgets):
+    """Return a context manager that queues the option changes of all the
+    WIDGETS, and applies them on exit, one merged config() per widget.
+
+    See the batch() method of TTWidget, TTListbox, and TTToolTip.
+    """
+    with contextlib.ExitStack() as stack:
+        for widget in widgets:
+            stack.enter_context(widget.batch())
+        yield widgets
+
+
+def clear_font_cache():
+    """Clear the caches of font attributes and metrics.
+
+    This is only needed after a font is changed other than through
+    update_named_font(), such as by configuring a tk_font.Font directly.
+    """
+    _font_dicts_d.clear()
+    _font_metrics_d.clear()
+
+
+def clear_parse_cache():
+    """Clear the process-wide cache of parsed tagged text.
+
+    The hit, miss, and eviction counters are reset as well.
+    """
+    _parse_cache.clear()
+
+
+def compile_bundle(texts):
+    """Compile the tagged TEXTS, such as the captions, help, and tooltips
+    of an application, into a bundle of their parse results for
+    load_bundle().  TEXTS may also be a dict, whose values are compiled.
+
+    Returns the bundle as bytes: zlib-compressed JSON of a table of the
+    distinct chunk styles and, for each distinct text, its table of chunks,
+    each with the id of its style.
+    """
+    if isinstance(texts, dict):
+        texts = texts.values()
+    styles, ids_d, texts_d = [], {}, {}
+    for text in texts:
+        if text in texts_d:
+            continue
+        parsed = parse_tagged_text(text)
+        rows = []
+        for chunk, style in zip(parsed.chunks, parsed.styles):
+            key = (
+                _style_key(style.options), _style_key(style.font), style.case
+            )
+            style_id = ids_d.get(key)
+            if style_id is None:
+                style_id = ids_d[key] = len(styles)
+                styles.append(
+                    (dict(style.options), dict(style.font), style.case)
+                )
+            rows.append(tuple(chunk) + (style_id,))
+        texts_d[text] = (parsed.tagged, rows)
+    bundle = dict(version=_bundle_version, styles=styles, texts=texts_d)
+    return zlib.compress(
+        json.dumps(bundle, separators=(",", ":")).encode("utf-8")
+    )
+
+
+def compile_template(text):
+    """Compile the tagged TEXT, with named {slots} in its chunk texts, into a
+    TTTemplate.
+
+    The tags are parsed once.  Slot values are substituted into the parsed
+    chunks, never into TEXT itself, so they are always taken literally and
+    cannot inject tags.  Use '{{' and '}}' for literal braces.
+
+    Example:
+
+        cpu_t = compile_template("<t b>CPU</t> <t fg=red>{cpu:.0f}%</t>")
+        label = TTLabel(root, template=cpu_t, values=dict(cpu=12.5))
+        label.config(values=dict(cpu=97))  # only the red label is updated
+    """
+    return TTTemplate(text)
+
+
 def convert_font_dict_to_ttoptions_dict(d):
     """
     Convert dict D keys 'underline' and 'overstrike' to 'funderline' and
@@ -653,6 +1232,56 @@ def dump(widget, *a, **kw):
         pass
 
 
+def font_info():
+    """Return the counters of the shared fonts of the child labels of
+    TTWidgets, as a FontInfo tuple of:
+        live:       the number of fonts in use
+        idle:       the number of unused fonts, awaiting deletion
+        evicted:    the number of unused fonts deleted so far
+        grace:      the seconds that a font is kept after its last use
+
+    See set_font_grace().
+    """
+    return _style_table.font_info()
+
+
+def font_metrics(font, master=None):
+    """Return the metrics of FONT, a font or its name or description, as
+    measured for the root of MASTER, from a cache keyed by the font.
+
+    Returns a FontMetrics tuple of:
+        ascent:     the ascent, in pixels
+        descent:    the descent, in pixels
+        linespace:  the height of a line, in pixels
+        fixed:      whether all characters have the same width
+        widths:     a dict of the cached widths of single characters, in
+                    pixels, always including "0"; see measure_many()
+
+    The metrics of a font not yet cached take a single Tcl evaluation.
+    update_named_font() drops the cached metrics of the font it changes.
+    """
+    root = _font_root(master)
+    spec = _font_spec(font)
+    key = (root, _hashable(spec))
+    metrics = _font_metrics_d.get(key)
+    if metrics is None:
+        metrics_s, zero_w = root.tk.splitlist(
+            root.tk.call("apply", _tcl_font_metrics, spec)
+        )
+        metrics_l = root.tk.splitlist(metrics_s)
+        metrics_d = dict(zip(metrics_l[::2], map(int, metrics_l[1::2])))
+        metrics = _font_metrics_d[key] = FontMetrics(
+            metrics_d["-ascent"],
+            metrics_d["-descent"],
+            metrics_d["-linespace"],
+            bool(metrics_d["-fixed"]),
+            {"0": int(zero_w)},
+        )
+        while len(_font_metrics_d) > _font_cache_maxsize:
+            _font_metrics_d.popitem(last=False)
+    return metrics
+
+
 def gen_tag_attrs(widget=None, options_d=None, font=None, case=None, **kwargs):
     """Generate a Tagged-Text ATTRibutes_STRing for use in a tagged-text
         segment/chunk:  <tag ATTRibutes_STRing>text</tag> .
@@ -711,9 +1340,7 @@ def gen_tag_attrs(widget=None, options_d=None, font=None, case=None, **kwargs):
     options_d = kwargs.pop("options", options_d or {})
     pare_b = kwargs.get("pare", True)
     widget = kwargs.pop("widget", widget)
-    text_w = kwargs.get(text_s, None)
     recurse_b = kwargs.pop("recurse", widget and isinstance(widget, TTWidget))
-    fmt_s = ""
     font_d = {}
     w_font_d, w_options_d = {}, {}
     if index_i is not None and widget is None:
@@ -736,15 +1363,8 @@ def gen_tag_attrs(widget=None, options_d=None, font=None, case=None, **kwargs):
             def_w_font_d = get_font_dict(def_w_font)
             w_font_d = pare_dict(w_font_d, def_w_font_d)
     if font:
-        if isinstance(font, str):
-            try:
-                font = tk_font.nametofont(font)
-            except tk.TclError:
-                pass
-        elif type(font) in (list, tuple):
-            font = tk_font.Font(font=font)
-        if isinstance(font, tk_font.Font):
-            font = font.actual()
+        if isinstance(font, (str, list, tuple, tk_font.Font)):
+            font = get_font_dict(font)
         if isinstance(font, dict):
             font_d = font
     if case:  # is not None:
@@ -756,129 +1376,32 @@ def gen_tag_attrs(widget=None, options_d=None, font=None, case=None, **kwargs):
         convert_font_dict_to_ttoptions_dict(font_d),
         kwargs,
     )
-    bad_opts = []
+    if kmode_s and kmode_s[0] == "a":  # alias
+        kfunc = alias
+        auto_cpd, auto_bd = compound_as, bd_s
+    elif kmode_s and kmode_s[0] == "o":  # option
+        kfunc = unalias
+        auto_cpd, auto_bd = compound_s, borderwidth_s  # bd_s #
+    else:
+        kfunc = str
+        auto_cpd, auto_bd = compound_s, borderwidth_s  # bd_s #
+    kmode_i = "ao".find(kmode_s[:1]) if kmode_s else -1
+    formatter = _TagAttrsFormatter(
+        kfunc, auto_cpd, auto_bd, auto_b, extend_b or bool(widget)
+    )
+    handlers_d = _tag_attr_formatters_d
     for key, val in d.items():
         key = key.lower()
         if key in ("auto", "extend", "kmode", "pare",):  # text_s, ): #
             continue
-        key2, key3, key4 = key[:2], key[:3], key[:4]
-        kalias = alias(key)
-        koption = unalias(key)
-        if kmode_s:
-            if kmode_s[0] == "a":  # alias
-                keyout = kalias
-                kfunc = alias
-                auto_cpd, auto_bd = compound_as, bd_s
-            elif kmode_s[0] == "o":  # option
-                keyout = koption
-                kfunc = unalias
-                auto_cpd, auto_bd = compound_s, borderwidth_s  # bd_s #
-        else:
-            keyout = key
-            kfunc = str
-            auto_cpd, auto_bd = compound_s, borderwidth_s  # bd_s #
+        try:
+            handler, keyouts = handlers_d[key]
+        except KeyError:
+            handler, keyouts = _resolve_tag_attr(key, handlers_d)
         if val:
             val = quote(val)
-        if (
-                key3 in (bg_s, background_s[:3], fg_s, foreground_s[:3])
-                or key2 == underline_s[:2]
-                or kalias in (bg_s, fg_s, underline_as)
-        ):
-            fmt_s += "%s=%s " % (keyout, val)
-        elif key2 in (bitmap_s[:2], image_s[:2],) or kalias in (
-                bitmap_as,
-                image_as,
-        ):
-            fmt_s += "%s=%s " % (keyout, val)
-            if auto_b and "%s=" % auto_cpd not in fmt_s:
-                fmt_s += "%s=%s " % (auto_cpd, tk.CENTER)
-        elif key3 in (bd_s, borderwidth_s[:3],):
-            if "%s=%s " % (auto_bd, 1) in fmt_s:
-                if val != 1:
-                    fmt_s = fmt_s.replace(
-                        "%s=%s " % (auto_bd, 1), "%s=%s " % (keyout, val)
-                    )
-            else:
-                fmt_s += "%s=%s " % (keyout, val)
-        elif key4 in (compound_s[:4],) or kalias == compound_as:
-            if "%s=%s " % (auto_cpd, tk.CENTER) in fmt_s:
-                if val != tk.CENTER:
-                    fmt_s = fmt_s.replace(
-                        "%s=%s " % (auto_cpd, tk.CENTER),
-                        "%s=%s " % (keyout, val),
-                    )
-            else:
-                fmt_s += "%s=%s " % (keyout, val)
-        elif key3 == cursor_s[:3]:
-            fmt_s += "%s=%s " % (keyout, val)
-        elif key3 == font_s[:3]:
-            fmt_s += "%s=%s " % (keyout, get_named_font(val))
-        elif key2 in (relief_s[:2],):
-            fmt_s += "%s=%s " % (keyout, val)
-            if auto_b and "%s=" % auto_bd not in fmt_s:
-                fmt_s += "%s=%s " % (auto_bd, 1)
-        # special for TTListbox
-        elif key[:7] in (
-                sbg_s,
-                selectbackground_s[:7],
-                sbd_s,
-                selectborderwidth_s[:7],
-                sfg_s,
-                selectforeground_s[:7],
-        ):
-            fmt_s += "%s=%s " % (keyout, val)
-        # special for fonts
-        elif key2 in (family_s[:2],):
-            fmt_s += "%s=%s " % (keyout, val)
-        elif key2 in (size_s[:2],):
-            fmt_s += "%s=%s " % (keyout, val)
-        elif key2 in (weight_s[:2],):
-            fmt_s += "%s=%d " % (
-                kfunc(tk_font.BOLD),
-                1
-                if isinstance(val, str) and val.lower() == tk_font.BOLD
-                else 0,
-            )
-        elif key2 == slant_s[:2]:
-            fmt_s += "%s=%d " % (
-                kfunc(tk_font.ITALIC),
-                1
-                if isinstance(val, str) and val.lower() == tk_font.ITALIC
-                else 0,
-            )
-        elif key3 in (funderline_as, funderline_s[:3]):
-            fmt_s += "%s=%d " % (
-                kfunc(funderline_s),
-                1 if str(val) in ("1", "True") else 0,
-            )
-        elif key3 in (foverstrike_as, foverstrike_s[:3]):
-            fmt_s += "%s=%d " % (
-                kfunc(foverstrike_s),
-                1 if str(val) in ("1", "True") else 0,
-            )
-        # special "case" implementation
-        elif key3 == case_s[:3]:
-            fmt_s += "%s=%s " % (kfunc(case_s), val)
-        elif key2 == upper_s[:2] or key3 == capitalize_s[:3]:
-            fmt_s += "%s=%s " % (kfunc(upper_s), val)
-        elif key2 in (lower_s[:2], title_s[:2], swapcase_s[:2]):
-            fmt_s += "%s=%s " % (keyout, val)
-        elif key in ():
-            bad_opts.append((key, val))
-        elif key in (text_s, text_as):
-            if extend_b or widget:
-                fmt_s += "%s=%s " % (keyout, val)
-        else:
-            # bad_opts.append((key, val))
-            fmt_s += "%s=%s " % (keyout, val)
-    if bad_opts:
-        _print_out(
-            widget,
-            text_w,
-            "EXCEPTION: UNEXPECTED TAG ATTRS: %r" % bad_opts,
-            Raise=True,
-        )
-    fmt = fmt_s.strip()
+        handler(formatter, key if kmode_i < 0 else keyouts[kmode_i], val)
+    fmt = " ".join(formatter.parts)
     if widget and isinstance(widget, TTWidget) and recurse_b:
         fmt = [
             fmt,
@@ -913,8 +1436,22 @@ def get_font_dict(f):
 
     Standard font attributes include: family, size, weight, slant, underline,
     overstrike.
+
+    F may be a font, or its name, or a tuple or string description.  The
+    attributes are cached by F, so a font is only created the first time;
+    update_named_font() drops the cached attributes of the font it changes.
+    See clear_font_cache().
     """
-    return tk_font.Font(font=f).actual()
+    root = _font_root(None)
+    spec = _font_spec(f)
+    key = (root, _hashable(spec))
+    font_d = _font_dicts_d.get(key)
+    if font_d is None:
+        font_d = tk_font.Font(root=root, font=f).actual()
+        _font_dicts_d[key] = font_d
+        while len(_font_dicts_d) > _font_cache_maxsize:
+            _font_dicts_d.popitem(last=False)
+    return dict(font_d)
 
 
 def get_named_font(f, **kw):
@@ -932,33 +1469,90 @@ def get_named_font(f, **kw):
         slant
         underline
         overstrike
+
+    The stored fonts are indexed by their normalized attributes, so finding
+    a match is a dict lookup, and needs no Tcl queries when F is a stored
+    font, or its name, or a font description seen before by
+    get_font_dict().  Stored fonts should be changed with
+    update_named_font(), which updates the index.
+
+    A size in 'kw' is scaled by the overall scale of scale_fonts().
     """
-    if _named_fonts_d.get("TkDefaultFont") is None:
-        for name in list(_named_fonts_d.keys()):
-            _named_fonts_d[name] = tk_font.nametofont(name)
-    #
+    _init_named_fonts()
     if f:
-        fo = tk_font.Font(font=f)
-        f_d = fo.actual()
+        keys = _named_font_keys_d.get(str(f))
+        key = keys[0] if keys else _font_key(get_font_dict(f))
         if kw:
-            fo.config(**kw)
+            kw = _scale_font_dict(kw)
+            f_d = dict(zip(font_dict_keys, key))
             f_d.update(**kw)
-        for nf in _named_fonts_d:
-            nf_d = tk_font.nametofont(nf).actual()
-            if f_d == nf_d:
-                return _named_fonts_d[nf]
+            key = _font_key(f_d)
+        name = _named_font_index_d.get(key)
+        if name is not None:
+            return _named_fonts_d[name]
         # didn't find it, so store created
-        _named_fonts_d[str(fo)] = fo
+        fo = tk_font.Font(font=f)
+        if kw:
+            fo.config(**kw)
+        _register_named_font(fo, key)
         return fo
     return None
 
 
+def get_style_table():
+    """Return the StyleTable shared by all TTWidgets."""
+    return _style_table
+
+
 def is_tagged_text(text):
     """Indicate whether TEXT is tagged text.
 
     Returns True if TEXT contains attribute tags, False if plain text.
     """
-    return len(text) > len(strip_tags(text))
+    return _is_tagged_chunks(text, tokenize_tagged_text(text))
+
+
+def load_bundle(bundle):
+    """Load a BUNDLE of parse results from compile_bundle(), given as bytes
+    or as the path of a file, and use it in parse_tagged_text().
+
+    Returns the TaggedTextBundle.  TTWidgets, TTListboxes, and TTToolTips
+    given any of the texts of the bundle take their parse results from it,
+    without parsing.  See unload_bundle().
+    """
+    if not isinstance(bundle, bytes):
+        with open(bundle, "rb") as bundle_file:
+            bundle = bundle_file.read()
+    bundle = TaggedTextBundle(bundle)
+    _bundles.append(bundle)
+    return bundle
+
+
+def measure_many(font, strings, master=None):
+    """Return a list of the widths in pixels of each of the STRINGS in
+    FONT, a font or its name or description, for the root of MASTER.
+
+    All the strings are measured in a single Tcl evaluation, except single
+    characters, whose widths are cached in the font_metrics() of FONT.
+    """
+    strings = list(strings)
+    widths_d = font_metrics(font, master).widths
+    todo = list(collections.OrderedDict.fromkeys(
+        s for s in strings if s not in widths_d
+    ))
+    measured_d = {}
+    if todo:
+        root = _font_root(master)
+        widths = root.tk.splitlist(
+            root.tk.call(
+                "apply", _tcl_measure_many, _font_spec(font), tuple(todo)
+            )
+        )
+        measured_d = dict(zip(todo, map(int, widths)))
+        widths_d.update((s, w) for s, w in measured_d.items() if len(s) == 1)
+    return [
+        widths_d[s] if s in widths_d else measured_d[s] for s in strings
+    ]
 
 
 def pare_dict(d, ref, strict_b=False, **kw):
@@ -980,10 +1574,66 @@ def pare_dict(d, ref, strict_b=False, **kw):
     return {k: v for k, v in d.items() if k not in ref or v != ref.get(k)}
 
 
+def parse_cache_info():
+    """Return the statistics of the process-wide parsed tagged-text cache.
+
+    Returns a CacheInfo tuple of hits, misses, evictions, maxsize, and
+    currsize.
+    """
+    return _parse_cache.info()
+
+
+def parse_many(texts, **kw):
+    """Parse many tagged-text TEXTS, each taken as a single chunk (as by
+    TTListbox.insert()), into columns.
+
+    Returns a ParsedMany tuple of:
+        texts:      a list of the text of each string, without its tags
+        style_ids:  an array('I') of the index of the style of each string
+        styles:     a list of the distinct ChunkStyles, where styles[0] is
+                    the empty style of untagged text
+
+    Each distinct attributes string is parsed only once, and equal styles
+    share one entry, so no dicts are built per string.  Only a string with
+    new attributes is looked up in the process-wide parse cache, for the
+    style of an earlier parse of it, unless keyword arguments are given,
+    which are passed on to parse_tag_attrs().
+    """
+    plain_texts = []
+    style_ids = array.array("I")
+    styles = [_plain_style]
+    attrs_d = {"": 0}
+    styles_d = {((), (), ""): 0}
+    for text in texts:
+        attrs, plain_text = _split_single_chunk_attrs(text)
+        style_id = attrs_d.get(attrs)
+        if style_id is None:
+            style = None
+            if not kw:
+                parsed = parse_tagged_text(text)
+                if len(parsed.chunks) == 1:
+                    style = parsed.styles[0]
+            if style is None:
+                style = _parse_chunk_style(attrs, **kw)
+            key = (
+                tuple(sorted(style.options.items())),
+                tuple(sorted(style.font.items())),
+                style.case,
+            )
+            style_id = styles_d.setdefault(key, len(styles))
+            if style_id == len(styles):
+                styles.append(style)
+            attrs_d[attrs] = style_id
+        plain_texts.append(plain_text)
+        style_ids.append(style_id)
+    return ParsedMany(plain_texts, style_ids, styles)
+
+
 def parse_tag_attrs(tag_str, options_d=None, font_d=None, case="", **kwargs):
     """
     Splits tagged-text tag attributes from TAG_STR into standard Tkinter and
-    custom TTWidgets widget options.
+    custom TTWidgets widget options.  TAG_STR may also be a list of attribute
+    tokens, as from split_attrs() or tokenize_tagged_text().
 
     Returns a tuple of three elements (by default):
         options dict:   contains Tkinter widget options
@@ -1008,143 +1658,26 @@ def parse_tag_attrs(tag_str, options_d=None, font_d=None, case="", **kwargs):
     case = kwargs.pop("case", case)
     widget = kwargs.pop("widget", None)
     text_w = kwargs.pop(text_s, None)
-    bad_opts = []
-    # INTs: height repeatdelay repeatinterval underline width; size fun fov
-    for keyval in split_attrs(tag_str):
+    parser = _TagAttrsParser(options_d, font_d, case, auto_b, widget, text_w)
+    handlers_d = _tag_attr_parsers_d
+    if isinstance(tag_str, str):
+        tag_str = split_attrs(tag_str)
+    for keyval in tag_str:
         if "=" in keyval:
-            key, val = keyval.split("=")
+            key, val = keyval.split("=", 1)
             val = unquote(val)
         elif keyval:
             key, val = keyval, None
         else:
             continue
         key = key.lower()
-        key2, key3, key4 = key[:2], key[:3], key[:4]
-        lowval = val.lower() if val else val
-        key = unalias(key)
-        kalias = alias(key)
-        if val == "None":  # in ('False', 'None') #
-            pass
-        elif key3 in (
-                bg_s,
-                background_s[:3],
-                fg_s,
-                foreground_s[:3],
-        ) or kalias in (bg_s, fg_s):
-            options_d.update(**{key: val})
-        elif key2 in (bitmap_s[:2], image_s[:2],) or kalias in (
-                bitmap_as,
-                image_as,
-        ):
-            options_d.update(**{key: val})
-            if auto_b and compound_s not in options_d:
-                options_d.update(compound=tk.CENTER)
-        elif key3 in (bd_s, borderwidth_s[:3],) or kalias == bd_s:
-            options_d.update(borderwidth=val)
-        elif key4 in (command_s[:4], compound_s[:4],) or kalias in (
-                command_as,
-                compound_as,
-        ):
-            options_d.update(**{key: val})
-        elif (
-                key2 in (height_s[:2], width_s[:2])
-                or key3 in (repeatdelay_s[:3], repeatinterval_s[:3])
-                or kalias
-                in (height_as, width_as, repeatdelay_as, repeatinterval_as)
-        ):
-            options_d.update(**{key: int(val)})
-        elif (
-                key2 in (cursor_s[:2],)
-                or key3 == font_s[:3]
-                or kalias in (cursor_as, font_as)
-        ):
-            options_d.update(**{key: val})
-        elif key2 in ("r", relief_s[:2],) or kalias == relief_as:
-            options_d.update(relief=val)
-            if auto_b and borderwidth_s not in options_d and val != tk.FLAT:
-                options_d.update(borderwidth=str(1))
-        elif key2 == underline_s[:2] or kalias == underline_as:
-            options_d.update(underline=-1 if val is None else int(val))
-        # special for TTListbox
-        elif key[:7] in (
-                sbg_s,
-                selectbackground_s[:7],
-                sfg_s,
-                selectforeground_s[:7],
-        ) or kalias in (selectbackground_as, selectforeground_as):
-            options_d.update(**{key: val})
-        # special for fonts
-        elif key2 in (family_s[:2],) or kalias == family_as:
-            font_d[family_s] = val
-        elif key2 in (size_s[:2],) or kalias == size_as:
-            try:
-                font_d[size_s] = int(val)
-            except ValueError:
-                _print_out(
-                    widget,
-                    text_w,
-                    "EXCEPTION: ERROR Setting Font Size to %r" % val,
-                    Raise=True,
-                )
-        elif key3 in (bold_as, tk_font.BOLD[:3]) or kalias == bold_as:
-            font_d[weight_s] = (
-                tk_font.BOLD
-                if str(val) not in ("0", "False",)
-                else tk_font.NORMAL
-            )
-        elif key2 in (weight_s[:2],) or kalias == weight_as:
-            font_d[weight_s] = val
-        elif key2 in (italic_as, tk_font.ITALIC[:2]) or kalias == italic_as:
-            font_d[slant_s] = (
-                tk_font.ITALIC
-                if str(val) not in ("0", "False",)
-                else tk_font.ROMAN
-            )
-        elif key2 in (slant_s[:2],) or kalias == slant_as:
-            font_d[slant_s] = val
-        elif (
-                key3 in (funderline_as, funderline_s[:3])
-                or kalias == funderline_as
-        ):
-            font_d[underline_s] = 1 if str(val) not in ("0", "False",) else 0
-        elif (
-                key3 in (foverstrike_as, foverstrike_s[:3])
-                or kalias == foverstrike_as
-        ):
-            font_d[overstrike_s] = 1 if str(val) not in ("0", "False",) else 0
-        # special "case" implementation
-        elif key3 in (case_s[:3],) or kalias == case_as:
-            for s in (upper_s, capitalize_s, lower_s, title_s, swapcase_s):
-                if s.startswith(lowval):
-                    case = s if s != capitalize_s else upper_s
-                    break
-        elif (
-                key2 == upper_s[:2]
-                or key3 in (capitalize_s[:3],)
-                or kalias in (upper_as, capitalize_as)
-        ):
-            if str(val) not in ("0", "False",):
-                case = upper_s
-        elif key2 in (lower_s[:2],) or kalias == lower_as:
-            if str(val) not in ("0", "False",):
-                case = lower_s
-        elif key2 == title_s[:2] or kalias == title_as:
-            if str(val) not in ("0", "False",):
-                case = title_s
-        elif key2 == swapcase_s[:2] or kalias == swapcase_as:
-            if str(val) not in ("0", "False",):
-                case = swapcase_s
-        elif key in ():
-            bad_opts.append((key, val))
-        else:
-            options_d.update(**{key: val})
-    if bad_opts:
-        _print_out(
-            widget,
-            text_w,
-            "EXCEPTION: UNEXPECTED TAG ATTRS: %r" % bad_opts,
-            Raise=True,
-        )
+        try:
+            handler, key = handlers_d[key]
+        except KeyError:
+            handler, key = _resolve_tag_attr(key, handlers_d)
+        if val != "None":
+            handler(parser, key, val)
+    case = parser.case
     if attr_b:
         return (
             case
@@ -1154,6 +1687,40 @@ def parse_tag_attrs(tag_str, options_d=None, font_d=None, case="", **kwargs):
     return options_d, font_d, case
 
 
+def parse_tagged_text(text):
+    """Parse the tagged TEXT, using the process-wide cache of parse results.
+
+    Returns a ParsedText tuple of:
+        text:       the tagged TEXT itself
+        chunks:     a tuple of ParsedChunk, as from tokenize_tagged_text()
+        styles:     a tuple of ChunkStyle, one per chunk, each holding the
+                    read-only options and font dicts and the case string
+                    from parse_tag_attrs()
+        tagged:     whether TEXT is tagged text, as from is_tagged_text()
+
+    The results are shared by every widget using the same TEXT, so they must
+    not be modified.  See parse_cache_info() and set_parse_cache_size().
+    The results of the texts of any bundles from load_bundle() are taken
+    from the bundles instead.
+    """
+    for bundle in _bundles:
+        parsed = bundle.get(text)
+        if parsed is not None:
+            return parsed
+    parsed = _parse_cache.get(text)
+    if parsed is None:
+        chunks = tuple(tokenize_tagged_text(text))
+        styles = tuple(
+            _parse_chunk_style(chunk.tokens) if chunk.tokens else _plain_style
+            for chunk in chunks
+        )
+        parsed = ParsedText(
+            text, chunks, styles, _is_tagged_chunks(text, chunks)
+        )
+        _parse_cache.put(text, parsed)
+    return parsed
+
+
 def quote(s):
     """Ensure that any string S with white space is enclosed in quotes."""
     if isinstance(s, str):
@@ -1172,6 +1739,69 @@ def quote(s):
     return s
 
 
+def scale_fonts(factor):
+    """Scale the sizes of all the fonts of TTWidgets by FACTOR, in place.
+
+    All fonts in the registry of named fonts, including the default Tkinter
+    fonts, and all shared fonts of the child labels are resized with one Tcl
+    call per font.  Tk then updates every widget that uses them, so no
+    TTWidget is procreated or configured.  The sizes are kept relative to a
+    scale of 1, so that scale_fonts(1.25) followed by scale_fonts(0.8)
+    restores them.  Sizes requested later, in tag attributes or through
+    get_named_font() or config(size=...), are scaled alike.  TTWidgets with
+    the canvas backend are laid out again when idle.
+
+    Returns the overall scale.
+    """
+    global _font_scale
+    factor = float(factor)
+    if factor <= 0:
+        raise ValueError("Font scale factor must be positive: %r" % factor)
+    old_scale, new_scale = _font_scale, _font_scale * factor
+    if new_scale != old_scale:
+        _init_named_fonts()
+        _rescale_named_fonts(old_scale, new_scale)
+        _style_table.rescale_fonts(old_scale, new_scale)
+        _font_scale = new_scale
+        clear_font_cache()
+        for widget in TTWidget._instances:
+            if widget.backend != labels_s and widget._kids:
+                try:
+                    widget._schedule_layout()
+                except tk.TclError:
+                    pass  # its root is already destroyed
+    return _font_scale
+
+
+def set_font_grace(seconds):
+    """Set the SECONDS that an unused shared font of the child labels of
+    TTWidgets is kept, in case it is used again, before it is deleted.
+
+    A grace of 0 deletes fonts as soon as they are unused.  See font_info().
+    """
+    _style_table.grace = max(float(seconds), 0.0)
+    _style_table.collect()
+
+
+def set_parse_cache_size(maxsize):
+    """Set the MAXSIZE of the process-wide parsed tagged-text cache.
+
+    Least recently used entries are evicted to fit.  A MAXSIZE of 0 disables
+    the cache.
+    """
+    _parse_cache.resize(maxsize)
+
+
+def set_widget_pool_size(maxsize):
+    """Set the MAXSIZE of the pool of unused child Labels and Frames of
+    the TTWidgets of each toplevel.
+
+    Pooled widgets beyond MAXSIZE are destroyed.  A MAXSIZE of 0 disables
+    the pool.  See widget_pool_info().
+    """
+    _widget_pool.resize(maxsize)
+
+
 def split_attrs(s):
     """Split (an attributes) string S into elements, preserving quoted fields.
 
@@ -1182,30 +1812,7 @@ def split_attrs(s):
             yields:
         ['family="Courier New"', 'size=16', 'bold']
     """
-    patt0 = r"\s*=\s*"
-    if not sentinel_d.get("repatt0"):
-        sentinel_d.update(repatt0=re.compile(patt0))
-    s = sentinel_d["repatt0"].sub("=", s)
-    outfields = []
-    quoted_b = ""
-    partial = []
-    for f in re.split(r"(\s+)", s)[::-1]:
-        if not quoted_b and f.endswith(('"', "'")):
-            quoted_b = f[-1]
-            partial.append(f)
-        elif not quoted_b:
-            if not f.isspace():
-                outfields.append(f)
-        else:  # quoted
-            partial.append(f)
-            if quoted_b in f:
-                complete = "".join(partial[::-1])
-                outfields.append(complete)
-                partial = []
-                quoted_b = ""
-    if quoted_b:
-        raise Exception("Imbalanced Quotes")
-    return outfields[::-1]
+    return _tokenize_attrs(s)
 
 
 def split_chunk(chunk):
@@ -1220,20 +1827,24 @@ def split_chunk(chunk):
     and
     - the 'text' string may be empty.
     """
-    if not sentinel_d.get("repatt2"):
-        patt2 = r"<(t(?:ag)?)\s*([^>]*)>([^>]*)</t(?:ag)?>"
-        sentinel_d.update(repatt2=re.compile(patt2, flags=re.IGNORECASE))
     # Chunk = collections.namedtuple('Chunk', 'tag attrs text')
     if chunk.lower().startswith("<t") and chunk.endswith("/>"):
         chunk_split = chunk.split(None, 1)  # [1][:-2]
-        tag, attrs = chunk_split[0][1:], chunk_split[1][:-2]
+        if len(chunk_split) > 1:
+            tag, attrs = chunk_split[0][1:], chunk_split[1][:-2]
+        else:
+            tag, attrs = chunk[1:-2], ""
         options_d, font_d, case = parse_tag_attrs(attrs)  # , attr=text_s) #
         text = options_d.pop(text_s, "")
         new_attrs = gen_tag_attrs(options=options_d, font=font_d, case=case)
         chunk = "<{tag} {new_attrs}>{text}</{tag}>".format(
             tag=tag, new_attrs=new_attrs, text=text
         )
-    matches = sentinel_d["repatt2"].findall(chunk)
+    chunks = tokenize_tagged_text(chunk)
+    if len(chunks) == 1:
+        return Chunk(*chunks[0][:TEXT + 1])
+    # several chunks: keep the original whole-string behavior
+    matches = _find_tag_chunks(chunk)
     result = (
         Chunk(*matches[0])
         if len(matches) == 1
@@ -1281,12 +1892,9 @@ def split_tagged_text_into_chunks(text):
     - optional attributes
     - optional text
     """
-    if not sentinel_d.get("repatt1"):
-        patt1 = r"(<t(?:ag)?.*?(?<=/)(?:t(?:ag)?)?>)"
-        sentinel_d.update(
-            repatt1=re.compile(patt1, flags=re.IGNORECASE | re.DOTALL)
-        )
-    return [chunk for chunk in sentinel_d["repatt1"].split(text) if chunk]
+    return [
+        text[chunk.start:chunk.end] for chunk in tokenize_tagged_text(text)
+    ]
 
 
 def strip_tags(text):
@@ -1294,12 +1902,54 @@ def strip_tags(text):
 
     Returns a string without any tagging information.
     """
-    return "".join(
-        [
-            split_chunk(chunk).text
-            for chunk in split_tagged_text_into_chunks(text)
-        ]
-    )
+    return "".join([chunk.text for chunk in tokenize_tagged_text(text)])
+
+
+def tokenize_tagged_text(text):
+    """Tokenize the tagged TEXT into chunks in a single, linear-time pass.
+
+    Returns a list of ParsedChunk tuples, where each chunk includes:
+    - the tag, attributes string, and text (as from split_chunk()),
+    - the start and end offsets of the chunk within TEXT,
+    - the attribute tokens (as from split_attrs()), and
+    - a 'tagged' flag, False for plain text.
+
+    The chunk boundaries are the same as from split_tagged_text_into_chunks(),
+    so the other tagged-text routines can all share this one scan.
+
+    The time taken is linear in the length of TEXT, for any input, such as
+    untrusted text with thousands of unclosed openers, stray quotes, or huge
+    attribute lists: each opener and closer is found by a forward search
+    that never backtracks over earlier chunks, and each chunk is split (see
+    _find_tag_chunks()) and its attributes tokenized in linear time.  So
+    parse_tagged_text(), split_chunk(), strip_tags(), and is_tagged_text()
+    share the same bound.  See bin/bench_adversarial.py.
+    """
+    opener, closer = _tag_patterns()
+    chunks = []
+    pos, length = 0, len(text)
+    while pos < length:
+        m_open = opener.search(text, pos)
+        if not m_open:
+            break
+        start = m_open.start()
+        m_close = closer.search(text, start + 2)
+        if not m_close:
+            break  # no later opener can be closed either
+        end = m_close.end()
+        if start > pos:
+            chunks.append(
+                ParsedChunk("", "", text[pos:start], pos, start, (), False)
+            )
+        tag, attrs, chunk_text, tagged_b = _split_tag_chunk(text[start:end])
+        tokens = _tokenize_attrs(attrs) if attrs else ()
+        chunks.append(
+            ParsedChunk(tag, attrs, chunk_text, start, end, tokens, tagged_b)
+        )
+        pos = end
+    if pos < length:
+        chunks.append(ParsedChunk("", "", text[pos:], pos, length, (), False))
+    return chunks
 
 
 def unalias(opt=None):
@@ -1317,6 +1967,12 @@ def unalias(opt=None):
     return TTWidget.widget_option_aliases_d if opt is None else opt
 
 
+def unload_bundle(bundle):
+    """Stop using the BUNDLE from load_bundle() in parse_tagged_text()."""
+    if bundle in _bundles:
+        _bundles.remove(bundle)
+
+
 def unmap(widget):
     """Unmap a mapped WIDGET."""
     result = False
@@ -1362,10 +2018,25 @@ def update_named_font(name, **options):
     if font:
         _, font_d, _ = split_dict_into_options_fontattrs_and_case(options)
         font.config(**font_d)
-        _named_fonts_d[str(font)] = font
+        _register_named_font(font)
+        _named_font_sizes_d.pop(str(font), None)
+        _forget_font(str(font))
     return font
 
 
+def widget_pool_info():
+    """Return the statistics of the pool of unused child Labels and Frames
+    of TTWidgets, as a PoolInfo tuple of:
+        hits:       the number of children reused from the pool
+        misses:     the number of children created for want of one
+        size:       the number of children in the pool
+        maxsize:    the most children pooled per toplevel
+
+    See set_widget_pool_size().
+    """
+    return _widget_pool.info()
+
+
 def wrap_tagged_text(text, count=0):
     """Wrap TEXT according to the given character COUNT.
 
@@ -1375,63 +2046,1197 @@ def wrap_tagged_text(text, count=0):
     wrapped_text = text
     if count <= 0:
         return text
-    divs = [
-        split_chunk(chunk) for chunk in split_tagged_text_into_chunks(text)
-    ]
-    # total_length = sum([len(div.text) for div in divs])  # UNUSED
-    total_string = "".join([div.text for div in divs])
-    final_nl_b = total_string.endswith("\n")
-    total_lines = total_string.splitlines()
-    wrapped_s = "\n".join(
-        [textwrap.fill(s, count) for s in total_lines]
-    ) + ("\n" if final_nl_b else "")
-    # now have to map the wrapped_string to the divs!
-    insert_pts = []
-    divx = x = tl = wi = 0
-    div = divs[divx]
-    dl = len(div.text)
-    for tsc in total_string:
-        if wrapped_s[wi] != tsc:
-            insert_pts.append([wi, divx, x, tl + x, tsc.isspace()])
-            if not tsc.isspace():
-                wi += 1
-        wi += 1
-        x += 1
-        if x >= dl:
-            tl += dl
-            x = 0
-            divx += 1
-            try:
-                div = divs[divx]
-                if div:
-                    try:
-                        dl = len(div.text)
-                    except AttributeError:
-                        pass
-            except IndexError:
-                pass
-    if insert_pts:
-        divs_l = [list(div) for div in divs]
-        for ipt in insert_pts[::-1]:
-            _, divx, x, _, sp = ipt
-            divs_l[divx][TEXT] = "{0}\n{1}".format(
-                divs[divx][TEXT][:x],
-                divs[divx][TEXT][x + 1 if sp else x:],
-            )
-        divs_t = [Chunk(*div) for div in divs_l]
+    divs = tokenize_tagged_text(text)
+    texts = _wrap_chunks(divs, count)
+    if texts is not None:
         chunks = [
             (
-                "<t {0}>{1}</t>".format(div.attrs, div.text)
+                "<t {0}>{1}</t>".format(div.attrs, div_text)
                 if div.attrs
-                else div.text
+                else div_text
             )
-            for div in divs_t
-            if div and div.text
+            for div, div_text in zip(divs, texts)
+            if div and div_text
         ]
         wrapped_text = "".join(chunks)
     return wrapped_text
 
 
+class _CanvasLabel:
+    """A child label of a TTWidget drawn as items on its canvas, for the
+    canvas backend.
+
+    It stands in for the tk.Label of the labels backend with the part of the
+    Label interface that TTWidget uses on its children: config(), cget(),
+    keys(), lift(), lower(), and winfo_exists().  The events of all the
+    labels are bound once, on the canvas, so bind() and unbind() do nothing.
+    """
+
+    geometry_keys = (
+        bitmap_s, borderwidth_s, font_s, image_s, padx_s, pady_s, text_s
+    )
+
+    def __init__(self, owner, canvas, **options):
+        self.owner = owner
+        self.canvas = canvas
+        self.font = None
+        self.options = dict(owner.label_def_options)
+        self.options.update(self._unalias(options))
+        self.x = self.y = self.width = self.height = 0
+        self.reqwidth = self.reqheight = 0
+        self.bg_item = canvas.create_rectangle(0, 0, 0, 0, outline="")
+        self.tag = "ttchunk%d" % self.bg_item
+        self.name = "%s.%s" % (canvas, self.tag)
+        tags = (self.tag,)
+        canvas.itemconfigure(self.bg_item, tags=tags)
+        if self.options.get(image_s):
+            self.kind = image_s
+            self.item = canvas.create_image(0, 0, tags=tags)
+        elif self.options.get(bitmap_s):
+            self.kind = bitmap_s
+            self.item = canvas.create_bitmap(0, 0, tags=tags)
+        else:
+            self.kind = text_s
+            self.item = canvas.create_text(0, 0, tags=tags)
+        self._draw()
+
+    def __str__(self):
+        return self.name
+
+    def _colors(self):
+        # the background and foreground colors for the state
+        options = self.options
+        state = str(options.get(state_s))
+        if state == tk.ACTIVE:
+            return options[activebackground_s], options[activeforeground_s]
+        if state == tk.DISABLED:
+            return options[background_s], options[disabledforeground_s]
+        return options[background_s], options[foreground_s]
+
+    def _draw(self):
+        # update the items to the options and to the area from place()
+        canvas, options = self.canvas, self.options
+        bg, fg = self._colors()
+        x0, y0 = self.x, self.y
+        x1, y1 = x0 + self.width, y0 + self.height
+        canvas.coords(self.bg_item, x0, y0, x1, y1)
+        canvas.itemconfigure(self.bg_item, fill=bg)
+        anchor = str(options.get(anchor_s) or tk.CENTER)
+        fx, fy = _anchor_fractions(anchor)
+        inset_x, inset_y = self._inset(padx_s), self._inset(pady_s)
+        canvas.coords(
+            self.item,
+            x0 + inset_x + fx * (self.width - 2 * inset_x),
+            y0 + inset_y + fy * (self.height - 2 * inset_y),
+        )
+        if self.kind == image_s:
+            canvas.itemconfigure(
+                self.item, image=options[image_s], anchor=anchor
+            )
+        elif self.kind == bitmap_s:
+            canvas.itemconfigure(
+                self.item,
+                bitmap=options[bitmap_s],
+                foreground=fg,
+                anchor=anchor,
+            )
+        else:
+            canvas.itemconfigure(
+                self.item,
+                text=options.get(text_s, ""),
+                font=str(options.get(font_s) or "TkDefaultFont"),
+                fill=fg,
+                underline=options.get(underline_s, -1),
+                anchor=anchor,
+            )
+        self._draw_relief(bg, x0, y0, x1, y1)
+
+    def _draw_relief(self, bg, x0, y0, x1, y1):
+        # draw the border of the relief as polygons, as Tk draws them
+        canvas = self.canvas
+        relief_tag = self.tag + "relief"
+        canvas.delete(relief_tag)
+        relief = str(self.options.get(relief_s, tk.FLAT))
+        bd = self._pixels(self.options.get(borderwidth_s, 0))
+        if bd <= 0 or relief == tk.FLAT:
+            return
+        tags = (self.tag, relief_tag)
+        if relief == tk.SOLID:
+            half = bd / 2
+            canvas.create_rectangle(
+                x0 + half, y0 + half, x1 - half, y1 - half,
+                width=bd, outline="black", tags=tags,
+            )
+            return
+        light = _shade_color(canvas, bg, 1.4)
+        dark = _shade_color(canvas, bg, 0.6)
+        half = bd // 2
+        bevels = {
+            tk.RAISED: ((0, bd, light, dark),),
+            tk.SUNKEN: ((0, bd, dark, light),),
+            tk.GROOVE: (
+                (0, half, dark, light), (half, bd - half, light, dark)
+            ),
+            tk.RIDGE: (
+                (0, half, light, dark), (half, bd - half, dark, light)
+            ),
+        }.get(relief, ())
+        for offset, width, top, bottom in bevels:
+            coords = _bevel_coords(
+                x0 + offset, y0 + offset, x1 - offset, y1 - offset, width
+            )
+            for polygon, color in zip(coords, (top, bottom)):
+                canvas.create_polygon(
+                    *polygon, fill=color, outline="", tags=tags
+                )
+
+    def _inset(self, pad_key):
+        # the pixels between the edge of the label and its content
+        return self._pixels(self.options.get(borderwidth_s, 0)) + self._pixels(
+            self.options.get(pad_key, 0)
+        )
+
+    def _pixels(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return self.canvas.winfo_pixels(value)
+
+    def _unalias(self, options):
+        aliases_d = self.owner.widget_option_aliases_d or {}
+        return {aliases_d.get(k, k): v for k, v in options.items()}
+
+    def bind(self, sequence=None, func=None, add=None):
+        """Do nothing, since the canvas gets the events of the label."""
+        return ""
+
+    def cget(self, key):
+        """Return the value of the option KEY."""
+        return self.options.get(self._unalias({key: None}).popitem()[0])
+
+    def config(self, cnf=None, **options):
+        """Configure the options of the label and redraw it.
+
+        The canvas is laid out again, when idle, for any change of its size.
+        """
+        if isinstance(cnf, str):
+            key = self._unalias({cnf: None}).popitem()[0]
+            return (key, key, key, self.owner.label_def_options.get(key),
+                    self.options.get(key))
+        options = self._unalias(_merge_dicts(cnf or {}, options))
+        if not options:
+            return {
+                k: (k, k, k, self.owner.label_def_options.get(k), v)
+                for k, v in self.options.items()
+            }
+        self.options.update(options)
+        if any(key in self.geometry_keys for key in options):
+            self.owner._schedule_layout()
+        self._draw()
+        return None
+
+    configure = config
+
+    def destroy(self):
+        """Delete the items of the label."""
+        if self.canvas.winfo_exists():
+            self.canvas.delete(self.tag)
+
+    def keys(self):
+        """Return the names of the options of the label."""
+        return sorted(self.options)
+
+    def lift(self, aboveThis=None):
+        """Raise the items of the label above those of label ABOVETHIS, or
+        of all the other labels."""
+        self.canvas.tag_raise(self.tag, aboveThis and aboveThis.tag)
+
+    def lower(self, belowThis=None):
+        """Lower the items of the label below those of label BELOWTHIS, or
+        of all the other labels."""
+        self.canvas.tag_lower(self.tag, belowThis and belowThis.tag)
+
+    def measure(self, width=None, height=None):
+        """Set the requested size of the label for a content WIDTH and
+        HEIGHT, by default the size of the image or bitmap."""
+        if width is None:
+            if self.kind == image_s:
+                image = self.options[image_s]
+                width = int(self.canvas.tk.call("image", "width", image))
+                height = int(self.canvas.tk.call("image", "height", image))
+            else:
+                x0, y0, x1, y1 = self.canvas.bbox(self.item) or (0, 0, 0, 0)
+                width, height = x1 - x0, y1 - y0
+        self.reqwidth = width + 2 * self._inset(padx_s)
+        self.reqheight = height + 2 * self._inset(pady_s)
+
+    def place(self, x, y, width, height):
+        """Draw the label in the area at X, Y of WIDTH and HEIGHT."""
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self._draw()
+
+    def unbind(self, sequence, funcid=None):
+        """Do nothing, since the canvas gets the events of the label."""
+
+    def winfo_exists(self):
+        """Return whether the canvas of the label exists."""
+        return self.canvas.winfo_exists()
+
+
+class _TagAttrsParser:
+    # parse_tag_attrs() state, updated by one handler call per attribute
+
+    def __init__(self, options_d, font_d, case, auto_b, widget, text_w):
+        self.options_d = options_d
+        self.font_d = font_d
+        self.case = case
+        self.auto_b = auto_b
+        self.widget = widget
+        self.text_w = text_w
+
+    def option(self, key, val):
+        self.options_d[key] = val
+
+    def image(self, key, val):
+        self.options_d[key] = val
+        if self.auto_b and compound_s not in self.options_d:
+            self.options_d[compound_s] = tk.CENTER
+
+    def borderwidth(self, key, val):
+        self.options_d[borderwidth_s] = val
+
+    def int_option(self, key, val):
+        self.options_d[key] = int(val)
+
+    def relief(self, key, val):
+        self.options_d[relief_s] = val
+        if (
+                self.auto_b
+                and borderwidth_s not in self.options_d
+                and val != tk.FLAT
+        ):
+            self.options_d[borderwidth_s] = str(1)
+
+    def underline(self, key, val):
+        self.options_d[underline_s] = -1 if val is None else int(val)
+
+    def family(self, key, val):
+        self.font_d[family_s] = val
+
+    def size(self, key, val):
+        try:
+            self.font_d[size_s] = int(val)
+        except ValueError:
+            _print_out(
+                self.widget,
+                self.text_w,
+                "EXCEPTION: ERROR Setting Font Size to %r" % val,
+                Raise=True,
+            )
+
+    def bold(self, key, val):
+        self.font_d[weight_s] = (
+            tk_font.BOLD if str(val) not in ("0", "False",) else tk_font.NORMAL
+        )
+
+    def weight(self, key, val):
+        self.font_d[weight_s] = val
+
+    def italic(self, key, val):
+        self.font_d[slant_s] = (
+            tk_font.ITALIC
+            if str(val) not in ("0", "False",)
+            else tk_font.ROMAN
+        )
+
+    def slant(self, key, val):
+        self.font_d[slant_s] = val
+
+    def funderline(self, key, val):
+        self.font_d[underline_s] = 1 if str(val) not in ("0", "False",) else 0
+
+    def foverstrike(self, key, val):
+        self.font_d[overstrike_s] = 1 if str(val) not in ("0", "False",) else 0
+
+    def case_option(self, key, val):
+        lowval = val.lower() if val else val
+        for s in (upper_s, capitalize_s, lower_s, title_s, swapcase_s):
+            if s.startswith(lowval):
+                self.case = s if s != capitalize_s else upper_s
+                break
+
+    def upper(self, key, val):
+        if str(val) not in ("0", "False",):
+            self.case = upper_s
+
+    def lower(self, key, val):
+        if str(val) not in ("0", "False",):
+            self.case = lower_s
+
+    def title(self, key, val):
+        if str(val) not in ("0", "False",):
+            self.case = title_s
+
+    def swapcase(self, key, val):
+        if str(val) not in ("0", "False",):
+            self.case = swapcase_s
+
+
+class _TagAttrsFormatter:
+    # gen_tag_attrs() output, appended to by one handler call per attribute
+
+    def __init__(self, kfunc, auto_cpd, auto_bd, auto_b, text_b):
+        self.kfunc = kfunc
+        self.auto_cpd = auto_cpd
+        self.auto_bd = auto_bd
+        self.auto_b = auto_b
+        self.text_b = text_b
+        self.parts = []
+        self.keys = set()
+        self.index_d = {}
+
+    def _add(self, key, val, fmt="%s=%s"):
+        part = fmt % (key, val)
+        self.index_d.setdefault(part, len(self.parts))
+        self.parts.append(part)
+        self.keys.add(key)
+
+    def _add_or_replace(self, auto_key, auto_val, key, val):
+        # replace any automatic AUTO_KEY=AUTO_VAL by the given KEY=VAL
+        index = self.index_d.get("%s=%s" % (auto_key, auto_val))
+        if index is None:
+            self._add(key, val)
+        elif val != auto_val:
+            part = self.parts[index] = "%s=%s" % (key, val)
+            del self.index_d["%s=%s" % (auto_key, auto_val)]
+            self.index_d.setdefault(part, index)
+            self.keys.add(key)
+
+    def option(self, key, val):
+        self._add(key, val)
+
+    def image(self, key, val):
+        self._add(key, val)
+        if self.auto_b and self.auto_cpd not in self.keys:
+            self._add(self.auto_cpd, tk.CENTER)
+
+    def borderwidth(self, key, val):
+        self._add_or_replace(self.auto_bd, 1, key, val)
+
+    def compound(self, key, val):
+        self._add_or_replace(self.auto_cpd, tk.CENTER, key, val)
+
+    def font(self, key, val):
+        self._add(key, get_named_font(val))
+
+    def relief(self, key, val):
+        self._add(key, val)
+        if self.auto_b and self.auto_bd not in self.keys:
+            self._add(self.auto_bd, 1)
+
+    def weight(self, key, val):
+        val = isinstance(val, str) and val.lower() == tk_font.BOLD
+        self._add(self.kfunc(tk_font.BOLD), val, "%s=%d")
+
+    def slant(self, key, val):
+        val = isinstance(val, str) and val.lower() == tk_font.ITALIC
+        self._add(self.kfunc(tk_font.ITALIC), val, "%s=%d")
+
+    def funderline(self, key, val):
+        val = str(val) in ("1", "True")
+        self._add(self.kfunc(funderline_s), val, "%s=%d")
+
+    def foverstrike(self, key, val):
+        val = str(val) in ("1", "True")
+        self._add(self.kfunc(foverstrike_s), val, "%s=%d")
+
+    def case_option(self, key, val):
+        self._add(self.kfunc(case_s), val)
+
+    def upper(self, key, val):
+        self._add(self.kfunc(upper_s), val)
+
+    def text(self, key, val):
+        if self.text_b:
+            self._add(key, val)
+
+
+_tag_attr_parser_rules = (
+    # (handler, (slice length, key prefix) pairs, aliases) in priority order
+    (
+        _TagAttrsParser.option,
+        ((3, bg_s), (3, background_s[:3]), (3, fg_s), (3, foreground_s[:3])),
+        (bg_s, fg_s),
+    ),
+    (
+        _TagAttrsParser.image,
+        ((2, bitmap_s[:2]), (2, image_s[:2])),
+        (bitmap_as, image_as),
+    ),
+    (
+        _TagAttrsParser.borderwidth,
+        ((3, bd_s), (3, borderwidth_s[:3])),
+        (bd_s,),
+    ),
+    (
+        _TagAttrsParser.option,
+        ((4, command_s[:4]), (4, compound_s[:4])),
+        (command_as, compound_as),
+    ),
+    (
+        _TagAttrsParser.int_option,
+        (
+            (2, height_s[:2]),
+            (2, width_s[:2]),
+            (3, repeatdelay_s[:3]),
+            (3, repeatinterval_s[:3]),
+        ),
+        (height_as, width_as, repeatdelay_as, repeatinterval_as),
+    ),
+    (
+        _TagAttrsParser.option,
+        ((2, cursor_s[:2]), (3, font_s[:3])),
+        (cursor_as, font_as),
+    ),
+    (_TagAttrsParser.relief, ((2, "r"), (2, relief_s[:2])), (relief_as,)),
+    (_TagAttrsParser.underline, ((2, underline_s[:2]),), (underline_as,)),
+    # special for TTListbox
+    (
+        _TagAttrsParser.option,
+        (
+            (7, sbg_s),
+            (7, selectbackground_s[:7]),
+            (7, sfg_s),
+            (7, selectforeground_s[:7]),
+        ),
+        (selectbackground_as, selectforeground_as),
+    ),
+    # special for fonts
+    (_TagAttrsParser.family, ((2, family_s[:2]),), (family_as,)),
+    (_TagAttrsParser.size, ((2, size_s[:2]),), (size_as,)),
+    (
+        _TagAttrsParser.bold,
+        ((3, bold_as), (3, tk_font.BOLD[:3])),
+        (bold_as,),
+    ),
+    (_TagAttrsParser.weight, ((2, weight_s[:2]),), (weight_as,)),
+    (
+        _TagAttrsParser.italic,
+        ((2, italic_as), (2, tk_font.ITALIC[:2])),
+        (italic_as,),
+    ),
+    (_TagAttrsParser.slant, ((2, slant_s[:2]),), (slant_as,)),
+    (
+        _TagAttrsParser.funderline,
+        ((3, funderline_as), (3, funderline_s[:3])),
+        (funderline_as,),
+    ),
+    (
+        _TagAttrsParser.foverstrike,
+        ((3, foverstrike_as), (3, foverstrike_s[:3])),
+        (foverstrike_as,),
+    ),
+    # special "case" implementation
+    (_TagAttrsParser.case_option, ((3, case_s[:3]),), (case_as,)),
+    (
+        _TagAttrsParser.upper,
+        ((2, upper_s[:2]), (3, capitalize_s[:3])),
+        (upper_as, capitalize_as),
+    ),
+    (_TagAttrsParser.lower, ((2, lower_s[:2]),), (lower_as,)),
+    (_TagAttrsParser.title, ((2, title_s[:2]),), (title_as,)),
+    (_TagAttrsParser.swapcase, ((2, swapcase_s[:2]),), (swapcase_as,)),
+    (_TagAttrsParser.option, (), ()),
+)
+
+_tag_attr_formatter_rules = (
+    (
+        _TagAttrsFormatter.option,
+        (
+            (3, bg_s),
+            (3, background_s[:3]),
+            (3, fg_s),
+            (3, foreground_s[:3]),
+            (2, underline_s[:2]),
+        ),
+        (bg_s, fg_s, underline_as),
+    ),
+    (
+        _TagAttrsFormatter.image,
+        ((2, bitmap_s[:2]), (2, image_s[:2])),
+        (bitmap_as, image_as),
+    ),
+    (
+        _TagAttrsFormatter.borderwidth,
+        ((3, bd_s), (3, borderwidth_s[:3])),
+        (),
+    ),
+    (_TagAttrsFormatter.compound, ((4, compound_s[:4]),), (compound_as,)),
+    (_TagAttrsFormatter.option, ((3, cursor_s[:3]),), ()),
+    (_TagAttrsFormatter.font, ((3, font_s[:3]),), ()),
+    (_TagAttrsFormatter.relief, ((2, relief_s[:2]),), ()),
+    # special for TTListbox
+    (
+        _TagAttrsFormatter.option,
+        (
+            (7, sbg_s),
+            (7, selectbackground_s[:7]),
+            (7, sbd_s),
+            (7, selectborderwidth_s[:7]),
+            (7, sfg_s),
+            (7, selectforeground_s[:7]),
+        ),
+        (),
+    ),
+    # special for fonts
+    (
+        _TagAttrsFormatter.option,
+        ((2, family_s[:2]), (2, size_s[:2])),
+        (),
+    ),
+    (_TagAttrsFormatter.weight, ((2, weight_s[:2]),), ()),
+    (_TagAttrsFormatter.slant, ((2, slant_s[:2]),), ()),
+    (
+        _TagAttrsFormatter.funderline,
+        ((3, funderline_as), (3, funderline_s[:3])),
+        (),
+    ),
+    (
+        _TagAttrsFormatter.foverstrike,
+        ((3, foverstrike_as), (3, foverstrike_s[:3])),
+        (),
+    ),
+    # special "case" implementation
+    (_TagAttrsFormatter.case_option, ((3, case_s[:3]),), ()),
+    (
+        _TagAttrsFormatter.upper,
+        ((2, upper_s[:2]), (3, capitalize_s[:3])),
+        (),
+    ),
+    (
+        _TagAttrsFormatter.option,
+        ((2, lower_s[:2]), (2, title_s[:2]), (2, swapcase_s[:2])),
+        (),
+    ),
+    (
+        _TagAttrsFormatter.text,
+        ((len(text_s) + 1, text_s), (len(text_as) + 1, text_as)),  # exact
+        (),
+    ),
+    (_TagAttrsFormatter.option, (), ()),
+)
+
+_tag_attr_parsers_d = {}
+_tag_attr_formatters_d = {}
+
+
+class _TemplateFormatter(string.Formatter):
+    # str.format_map() of the chunk texts of a template, rendering a missing
+    # slot as blank, whatever its attributes, index, conversion, or spec
+
+    def convert_field(self, value, conversion):
+        if value is sentinel:
+            return value
+        return super().convert_field(value, conversion)
+
+    def format_field(self, value, format_spec):
+        if value is sentinel:
+            return ""
+        return super().format_field(value, format_spec)
+
+    def get_field(self, field_name, args, kwargs):
+        name = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+        if name not in kwargs:
+            return sentinel, name
+        return super().get_field(field_name, args, kwargs)
+
+
+class TTTemplate:
+    """A tagged-text template with named slots, as from compile_template().
+
+    Attributes:
+        text:       the source tagged text
+        parsed:     the ParsedText of the source, from parse_tagged_text()
+        slots:      a tuple of the slot names, in order of appearance
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.parsed = parse_tagged_text(text)
+        slots = collections.OrderedDict()
+        chunk_slots = []
+        for chunk in self.parsed.chunks:
+            names = set()
+            for _, field, _, _ in string.Formatter().parse(chunk.text):
+                if field is None:
+                    continue
+                name = re.split(r"[.\[]", field, maxsplit=1)[0]
+                if not name or name.isdigit():
+                    raise ValueError(
+                        "Template slots must be named: {0!r}".format(text)
+                    )
+                names.add(name)
+                slots[name] = None
+            chunk_slots.append(frozenset(names))
+        self.slots = tuple(slots)
+        self._chunk_slots = tuple(chunk_slots)
+        self._static_texts = tuple(
+            None if names else chunk.text.format_map({})
+            for chunk, names in zip(self.parsed.chunks, chunk_slots)
+        )
+
+    def __repr__(self):
+        return "TTTemplate({0!r})".format(self.text)
+
+    def chunks_using(self, names):
+        """Return the indexes of the chunks that use any of the slot NAMES."""
+        names = set(names)
+        return [
+            index
+            for index, chunk_slots in enumerate(self._chunk_slots)
+            if chunk_slots & names
+        ]
+
+    def format_chunk(self, index, values):
+        """Return the text of chunk INDEX with the slot VALUES substituted."""
+        text = self._static_texts[index]
+        if text is None:
+            text = self.parsed.chunks[index].text
+            if self._chunk_slots[index].issubset(values):
+                text = text.format_map(values)
+            else:
+                text = _template_formatter.vformat(text, (), values)
+        return text
+
+    def substitute(self, values=None, **kw):
+        """Return the ParsedText of the template with the slot VALUES (or
+        keyword values) substituted into the chunk texts.
+
+        Its 'text' is the untagged text of the substituted chunks.
+        """
+        values = _merge_dicts(values or {}, kw)
+        chunks = tuple(
+            chunk._replace(text=self.format_chunk(index, values))
+            for index, chunk in enumerate(self.parsed.chunks)
+        )
+        return ParsedText(
+            "".join([chunk.text for chunk in chunks]),
+            chunks,
+            self.parsed.styles,
+            self.parsed.tagged,
+        )
+
+
+class TaggedTextParser:
+    """An incremental tokenizer for tagged text that arrives in pieces.
+
+    feed() returns the chunks completed by each new piece of text, and
+    close() returns whatever remains, as ParsedChunk tuples with offsets into
+    the whole stream of text.  A tag split across feeds is returned once its
+    closing tag arrives.  Plain text is returned as soon as it cannot be the
+    start of a tag, so a run of plain text may come back in several chunks.
+    Otherwise, the chunks are the same as from tokenize_tagged_text() of the
+    whole stream.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    @property
+    def pending(self):
+        """The text fed but not yet returned in a chunk."""
+        return self._buffer
+
+    def close(self):
+        """Return the pending text as a final, plain chunk, and reset."""
+        chunks = []
+        if self._buffer:
+            end = self._offset + len(self._buffer)
+            chunks.append(
+                ParsedChunk("", "", self._buffer, self._offset, end, (), False)
+            )
+        self.reset()
+        return chunks
+
+    def feed(self, text):
+        """Add TEXT to the stream. Returns a list of the completed chunks."""
+        opener, closer = _tag_patterns()
+        buffer = self._buffer + text
+        offset = self._offset
+        chunks = []
+        pos = 0
+        while True:
+            if self._scan is None:
+                m_open = opener.search(buffer, pos)
+                if not m_open:
+                    # hold back a final '<' that may yet open a tag
+                    end = len(buffer) - buffer.endswith("<")
+                    if end > pos:
+                        chunks.append(
+                            ParsedChunk(
+                                "", "", buffer[pos:end],
+                                offset + pos, offset + end, (), False,
+                            )
+                        )
+                        pos = end
+                    break
+                start = m_open.start()
+                if start > pos:
+                    chunks.append(
+                        ParsedChunk(
+                            "", "", buffer[pos:start],
+                            offset + pos, offset + start, (), False,
+                        )
+                    )
+                pos = start
+                self._scan = start + 2
+            m_close = closer.search(buffer, self._scan)
+            if not m_close:
+                # a closer may be split, so rescan the last 4 characters
+                self._scan = max(pos + 2, len(buffer) - 4)
+                break
+            end = m_close.end()
+            tag, attrs, chunk_text, tagged_b = _split_tag_chunk(
+                buffer[pos:end]
+            )
+            tokens = _tokenize_attrs(attrs) if attrs else ()
+            chunks.append(
+                ParsedChunk(
+                    tag, attrs, chunk_text,
+                    offset + pos, offset + end, tokens, tagged_b,
+                )
+            )
+            pos = end
+            self._scan = None
+        self._buffer = buffer[pos:]
+        self._offset = offset + pos
+        if self._scan is not None:
+            self._scan -= pos
+        return chunks
+
+    def reset(self):
+        """Discard any pending text and restart the stream at offset 0."""
+        self._buffer = ""
+        self._offset = 0
+        self._scan = None  # where to resume looking for a pending closer
+
+
+class TaggedTextBundle:
+    """The parse results of a catalog of tagged texts, from the bytes of a
+    bundle from compile_bundle(); see load_bundle().
+
+    The ParsedText of each text is built on its first use, from the tables
+    of the bundle.
+    """
+
+    def __init__(self, data):
+        bundle = json.loads(zlib.decompress(data).decode("utf-8"))
+        if bundle.get("version") != _bundle_version:
+            raise ValueError(
+                "Unsupported bundle version %r" % bundle.get("version")
+            )
+        self.styles = tuple(
+            ChunkStyle(
+                types.MappingProxyType(options_d),
+                types.MappingProxyType(font_d),
+                case,
+            )
+            for options_d, font_d, case in bundle["styles"]
+        )
+        self._texts_d = bundle["texts"]
+        self._parsed_d = {}
+
+    def __contains__(self, text):
+        return text in self._texts_d
+
+    def __iter__(self):
+        return iter(self._texts_d)
+
+    def __len__(self):
+        return len(self._texts_d)
+
+    def get(self, text):
+        """Return the ParsedText of TEXT, or None if it is not bundled."""
+        parsed = self._parsed_d.get(text)
+        if parsed is None:
+            entry = self._texts_d.get(text)
+            if entry is None:
+                return None
+            tagged_b, rows = entry
+            parsed = self._parsed_d[text] = ParsedText(
+                text,
+                tuple(
+                    ParsedChunk(
+                        tag, attrs, chunk_text, start, end, tokens or (), t_b
+                    )
+                    for tag, attrs, chunk_text, start, end, tokens, t_b, _ in (
+                        rows
+                    )
+                ),
+                tuple(self.styles[row[-1]] for row in rows),
+                tagged_b,
+            )
+        return parsed
+
+
+class TaggedTextCache:
+    """A bounded, least-recently-used cache of parsed tagged text.
+
+    A single instance is shared by all TTWidgets, TTListboxes, and
+    TTToolTips; see parse_tagged_text().
+    """
+
+    def __init__(self, maxsize=1024, maxtextlen=8192):
+        self._d = collections.OrderedDict()
+        self.maxsize = maxsize
+        self.maxtextlen = maxtextlen
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self._d.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Return the entry for KEY, or None if it is not cached."""
+        value = self._d.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._d.move_to_end(key)
+        return value
+
+    def info(self):
+        """Return the cache statistics as a CacheInfo tuple."""
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._d)
+        )
+
+    def put(self, key, value):
+        """Store VALUE for KEY, evicting the least recently used entries.
+
+        Keys longer than MAXTEXTLEN, such as an ever-growing log, are not
+        stored.
+        """
+        if self.maxsize > 0 and len(key) <= self.maxtextlen:
+            self._d[key] = value
+            self._d.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        """Change the MAXSIZE of the cache, evicting entries to fit."""
+        self.maxsize = max(int(maxsize), 0)
+        self._evict()
+
+    def _evict(self):
+        while len(self._d) > self.maxsize:
+            self._d.popitem(last=False)
+            self.evictions += 1
+
+
+class StyleTable:
+    """A table of the styles of the child labels of TTWidgets.
+
+    Equal (options, font, case) triples are interned into a single, immutable
+    Style with an integer id, and each distinct font into a single Tk font
+    per Tk root, so that all chunks and widgets with equal styling share one
+    Style, one dict of label options, and one Tcl font.  A single instance is
+    shared by all TTWidgets; see get_style_table().
+
+    The fonts are reference counted: each child label that uses one acquires
+    it, and releases it when it is destroyed or procreated again.  A font
+    that is unused for GRACE seconds is deleted, on a later acquire or
+    release, or on collect().  A new font is only deleted by collect()
+    until it is first acquired, so the labels of a procreation can take
+    the fonts it creates, even with a GRACE of 0.  See font_info().  The
+    fonts are resized in place by rescale_fonts(); see scale_fonts().
+    """
+
+    def __init__(self, grace=60.0):
+        self.styles = []
+        self.grace = grace
+        self.evicted = 0
+        self._ids_d = {}
+        self._fonts_d = {}  # key: font with those attributes
+        self._font_keys_d = {}  # font name: key of the font
+        self._font_objs_d = {}  # font name: font
+        self._font_sizes_d = {}  # font name: size at a scale of 1
+        self._label_options_d = {}
+        self._label_keys_d = collections.defaultdict(list)  # by font name
+        self._refs_d = collections.Counter()  # by font name
+        self._idle_d = collections.OrderedDict()  # font name: unused since
+        self._new_d = collections.OrderedDict()  # font name: never acquired
+
+    def __getitem__(self, style_id):
+        return self.styles[style_id]
+
+    def __len__(self):
+        return len(self.styles)
+
+    def acquire_font(self, font):
+        """Count one more user of the shared FONT, from font()."""
+        name = str(font)
+        if name in self._font_objs_d:
+            self._refs_d[name] += 1
+            self._idle_d.pop(name, None)
+            self._new_d.pop(name, None)
+            self._sweep()
+
+    def clear(self):
+        """Remove all styles, and release the shared fonts."""
+        self.styles = []
+        self._ids_d.clear()
+        self._fonts_d.clear()
+        self._font_keys_d.clear()
+        self._font_objs_d.clear()
+        self._font_sizes_d.clear()
+        self._label_options_d.clear()
+        self._label_keys_d.clear()
+        self._refs_d.clear()
+        self._idle_d.clear()
+        self._new_d.clear()
+
+    def collect(self, grace=None):
+        """Delete the fonts that have been unused for GRACE seconds, by
+        default the GRACE of the table.
+
+        The new fonts that were never acquired count as unused since they
+        were created.  Returns the number of fonts deleted.
+        """
+        if self._new_d:
+            self._idle_d.update(self._new_d)
+            self._new_d.clear()
+            self._idle_d = collections.OrderedDict(
+                sorted(self._idle_d.items(), key=lambda item: item[1])
+            )
+        evicted = self.evicted
+        self._sweep(self.grace if grace is None else grace)
+        return self.evicted - evicted
+
+    def font(self, font_d, master=None):
+        """Return the shared Tk font with the attributes in FONT_D for the
+        root of MASTER, creating it if needed.
+
+        A new font is unused until acquired, but only deleted by collect()
+        until then; see acquire_font().
+        """
+        root = master._root() if master else None
+        key = (root, _style_key(font_d))
+        font = self._fonts_d.get(key)
+        if font is None:
+            font = self._fonts_d[key] = tk_font.Font(root=root, **font_d)
+            name = str(font)
+            self._font_keys_d[name] = key
+            self._font_objs_d[name] = font
+            self._new_d[name] = time.monotonic()
+        return font
+
+    def font_info(self):
+        """Return the font counters as a FontInfo tuple."""
+        return FontInfo(
+            len(self._refs_d),
+            len(self._idle_d) + len(self._new_d),
+            self.evicted,
+            self.grace,
+        )
+
+    def intern(self, options=None, font=None, case=""):
+        """Return the Style with the OPTIONS, FONT attributes, and CASE,
+        adding it to the table if it is new.
+        """
+        options, font, case = options or {}, font or {}, case or ""
+        key = (_style_key(options), _style_key(font), case)
+        style_id = self._ids_d.get(key)
+        if style_id is None:
+            style_id = self._ids_d[key] = len(self.styles)
+            self.styles.append(
+                Style(
+                    style_id,
+                    types.MappingProxyType(dict(options)),
+                    types.MappingProxyType(dict(font)),
+                    case,
+                )
+            )
+        return self.styles[style_id]
+
+    def is_shared_font(self, font):
+        """Return whether FONT, a font or its name, is a shared font of the
+        table, from font().
+        """
+        return str(font) in self._font_objs_d
+
+    def label_options(self, style, master=None):
+        """Return the shared, read-only options of a label of STYLE for the
+        root of MASTER, with the shared font of the style, if any.
+        """
+        root = master._root() if master else None
+        key = (root, style.id)
+        options = self._label_options_d.get(key)
+        if options is None:
+            options = dict(style.options)
+            if style.font:
+                font = options[font_s] = self.font(style.font, master)
+                self._label_keys_d[str(font)].append(key)
+            options = types.MappingProxyType(options)
+            self._label_options_d[key] = options
+        return options
+
+    def release_font(self, font):
+        """Count one less user of the shared FONT, from acquire_font()."""
+        name = str(font)
+        if self._refs_d[name] > 0:
+            self._refs_d[name] -= 1
+            if not self._refs_d[name]:
+                del self._refs_d[name]
+                self._idle_d[name] = time.monotonic()
+            self._sweep()
+
+    def rescale_fonts(self, old_scale, new_scale):
+        """Resize the shared fonts in place, from OLD_SCALE to NEW_SCALE,
+        re-keying them by their new sizes.
+
+        Tk updates the labels that use the fonts, so the labels keep their
+        options, but the cached label options are dropped, since they are
+        keyed by the styles of the old sizes.
+        """
+        for name, key in list(self._font_keys_d.items()):
+            font_d = dict(key[1])
+            size = font_d.get(size_s)
+            if not size:
+                continue
+            base = self._font_sizes_d.setdefault(name, size / old_scale)
+            font_d[size_s] = _scaled_size(base, new_scale)
+            if font_d[size_s] == size:
+                continue
+            font = self._font_objs_d[name]
+            font.configure(size=font_d[size_s])
+            if self._fonts_d.get(key) is font:
+                del self._fonts_d[key]
+            key = self._font_keys_d[name] = (key[0], _style_key(font_d))
+            self._fonts_d.setdefault(key, font)
+        self._label_options_d.clear()
+        self._label_keys_d.clear()
+
+    def _sweep(self, grace=None):
+        # delete the fonts unused for GRACE seconds, oldest first
+        deadline = time.monotonic() - (self.grace if grace is None else grace)
+        while self._idle_d:
+            name, since = next(iter(self._idle_d.items()))
+            if since > deadline:
+                break
+            del self._idle_d[name]
+            font = self._font_objs_d.pop(name)
+            key = self._font_keys_d.pop(name)
+            if self._fonts_d.get(key) is font:
+                del self._fonts_d[key]
+            self._font_sizes_d.pop(name, None)
+            _forget_font(name)
+            for label_key in self._label_keys_d.pop(name, ()):
+                self._label_options_d.pop(label_key, None)
+            try:
+                font.tk.call("font", "delete", font.name)
+            except tk.TclError:
+                pass  # its root is already destroyed
+            font.delete_font = False
+            self.evicted += 1
+
+
+class WidgetPool:
+    """A pool of the unused child Labels and Frames of TTWidgets, which
+    are reused instead of creating new ones when TTWidgets procreate.
+
+    Tk cannot move a widget to another master, so a pooled widget is only
+    reused by the TTWidget whose child it is, but the pooled widgets are
+    counted per toplevel, and the pool of each toplevel holds at most
+    MAXSIZE widgets; any more are destroyed.  A single instance is shared
+    by all TTWidgets; see widget_pool_info().
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._d = {}  # toplevel name: {(master name, class): [widgets]}
+        self._sizes_d = collections.Counter()  # toplevel name: widgets
+
+    def acquire(self, master, cls):
+        """Return an unused widget of class CLS that is a child of MASTER,
+        removing it from the pool, or None if there is none.
+        """
+        top = self._toplevel(master)
+        widgets = self._d.get(top, {}).get((str(master), cls))
+        if not widgets:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._sizes_d[top] -= 1
+        return widgets.pop()
+
+    def clear(self):
+        """Destroy all the pooled widgets and reset the counters."""
+        for pools_d in self._d.values():
+            for widgets in pools_d.values():
+                for widget in widgets:
+                    widget.destroy()
+        self._d.clear()
+        self._sizes_d.clear()
+        self.hits = self.misses = 0
+
+    def discard(self, master):
+        """Forget the pooled children of MASTER, which is being destroyed."""
+        top = self._toplevel(master)
+        pools_d = self._d.get(top, {})
+        for key in [key for key in pools_d if key[0] == str(master)]:
+            self._sizes_d[top] -= len(pools_d.pop(key))
+
+    def info(self):
+        """Return the pool statistics as a PoolInfo tuple."""
+        return PoolInfo(
+            self.hits, self.misses, sum(self._sizes_d.values()), self.maxsize
+        )
+
+    def release(self, master, widget):
+        """Add the unused, unmapped WIDGET, a child of MASTER, to the pool,
+        or destroy it if the pool of its toplevel is full.
+        """
+        top = self._toplevel(master)
+        if self._sizes_d[top] >= self.maxsize:
+            widget.destroy()
+            return
+        pools_d = self._d.setdefault(top, {})
+        pools_d.setdefault((str(master), type(widget)), []).append(widget)
+        self._sizes_d[top] += 1
+
+    def resize(self, maxsize):
+        """Change the MAXSIZE of the pool of each toplevel, destroying the
+        pooled widgets beyond it.
+        """
+        self.maxsize = max(int(maxsize), 0)
+        for top, pools_d in self._d.items():
+            for widgets in pools_d.values():
+                while widgets and self._sizes_d[top] > self.maxsize:
+                    widgets.pop().destroy()
+                    self._sizes_d[top] -= 1
+
+    @staticmethod
+    def _toplevel(widget):
+        # the name of the toplevel of WIDGET, without asking Tk
+        while widget.master and not isinstance(widget, tk.Toplevel):
+            widget = widget.master
+        return str(widget)
+
+
+_bundle_version = 1
+_bundles = []
+_parse_cache = TaggedTextCache()
+_plain_style = ChunkStyle(
+    types.MappingProxyType({}), types.MappingProxyType({}), ""
+)
+_style_table = StyleTable()
+_template_formatter = _TemplateFormatter()
+_widget_pool = WidgetPool()
+
+
 class TTWidget(tk.Frame):
     """
     Implement a Compound Widget accepting Tagged Text used to generate
@@ -1551,6 +3356,25 @@ class TTWidget(tk.Frame):
     Notes:
         + Through the config() method, the user has strong control over all the
           underlying child widgets.
+        + With the option backend='canvas', instead of the default 'labels',
+          the children are drawn as items on a single Canvas, rather than as
+          a Label per line of each chunk inside Frames per line, for far
+          fewer Tk widgets.  With backend='grid', the child Labels of all
+          the lines are laid out in a single grid, rather than in a Frame per
+          line, by measured columns.  The default for new widgets is the
+          class attribute 'default_backend'.
+        + With the creation option lazy=True, the text is not parsed, nor
+          the children created, until the widget is first mapped, so that
+          widgets that are never shown, as in hidden notebook tabs, cost
+          little.  With lazy='idle', they are also created when the
+          application is next idle.  Until then, cget() and config() work
+          from the stored options.  The default is the class attribute
+          'default_lazy'.
+        + Inside "with widget.batch():", or ttwidgets.batch() for several
+          widgets, the options passed to config() are queued, and applied
+          on exit as one config(), so that a dozen changes of the text,
+          colors, font, and state cost one procreation and one pass over
+          the children.
 
     Known Issues:
         - Windows function is better than Darwin and Linux
@@ -1705,7 +3529,23 @@ class TTWidget(tk.Frame):
         "Motion",
     )
 
+    default_backend = labels_s
     default_debug = False
+    default_lazy = False
+
+    _batch_d = None  # lookups shared by the widgets of create_many()
+    _batch_options = None  # options queued by batch(), by option name
+    _config_flags = (
+        "abstain",
+        "debug",
+        "default_debug",
+        "init",
+        "pared",
+        "propagate",
+        "store",
+    )  # config() keywords that are not queued by batch()
+    _sorted_keys_d = {}  # state widget class: keys() of its TTWidgets
+    _widget_keys_d = {}  # state widget class: its Tk option names
 
     @classmethod
     def __delete__(cls, self):
@@ -1718,6 +3558,8 @@ class TTWidget(tk.Frame):
         # store_b = not (widget)  # UNUSED
         super().__init__(master)
         self._kids = collections.OrderedDict()
+        self._callbacks_d = {}  # command and textvariable, as configured
+        self._kid_fonts_d = {}  # child name: shared font from _style_table
         if widget and widget_class is None:
             self.widget_class = type(widget)
         if widget_class is None:
@@ -1752,22 +3594,38 @@ class TTWidget(tk.Frame):
                 **{background_s: bg_s, foreground_s: fg_s, borderwidth_s: bd_s}
             )
         #
-        frame_options = {
-            k: v[-1]
-            for k, v in self._widget_config().items()
-            if len(v) == 5 and k in self.frame_def_options
-        }
-        super().config(**frame_options)
+        # mirror of the config entries of the state widget, for all reads
+        if widget:
+            self._config_d = self.widget.config()
+        else:
+            self._config_d = dict(
+                self._batch_get(
+                    (frame_s, self.widget_class, str(self.master)),
+                    self.widget.config,
+                )
+            )
+        super().config(**self._get_frame_opts_of_widget())
         self._base_cfg = {}
         self._base_pack = {}
-        self.command = None
+        self._layout_after_id = None
+        self._canvas_pad = (0, 0)
+        self._grid_columns = 0  # the columns given a minsize by _layout_grid()
+        self._kid_funcids_d = {}  # child name: (sequence, funcid) of a Button
+        self._last_row = 0  # the row of the last line without line frames
+        self._lazy_ids = None  # <Map> funcid and after id while lazy
+        self._procreate_after_id = None  # after id of a pending procreation
+        self._procreated = None  # the inputs of the last _procreate()
+        self.backend = self.default_backend
         self.emulation_b = True
         self.font_d = {}
         # w_font = self._widget_cget(font_s)
         # self.font = get_named_font(w_font, create=True, modify=False)
         self.observer = None
-        self.textvariable = None
+        self.template = None
+        self.template_values = {}
+        self._stream_parser = self._stream_text = None
         self.debug_text = options.pop("debug_text", None)
+        lazy = options.pop(lazy_s, self.default_lazy)
         #
         self.options, self.font_d = options, {}
         for opt, val in list(self._reorder_dict(self.options).items()) + list(
@@ -1776,9 +3634,18 @@ class TTWidget(tk.Frame):
             self.config(**{opt: val, "init": True, "abstain": True})
         procreate_options = {}
         #
+        if lazy:
+            self._lazy_ids = (
+                tk.Frame.bind(self, "<Map>", self._procreate_lazily, "+"),
+                self.after_idle(self._procreate_lazily)
+                if lazy == idle_s
+                else None,
+            )
         self._kids = self._procreate(**procreate_options)
-        self.font_d = tk_font.Font(font=self._widget_cget(font_s)).actual()
-        toplevel = self.winfo_toplevel()
+        self.font_d = get_font_dict(self._widget_cget(font_s))
+        toplevel = self._batch_get(
+            (toplevel_s, str(self.master)), self.winfo_toplevel
+        )
         if not hasattr(toplevel, "__TTWidget_d"):
             toplevel.__TTWidget_d = {}
         self._toplevelstorage = toplevel.__TTWidget_d[str(self)] = {}
@@ -1819,14 +3686,25 @@ class TTWidget(tk.Frame):
 
     def _activate(self, **kwargs):
         store_b = kwargs.get("store", True)
-        for kid in self._get_kids():
-            kid.config(state=tk.ACTIVE)
+        self._configure_kids(
+            [(kid, {state_s: tk.ACTIVE}) for kid in self._get_kids()]
+        )
         bg = self._widget_cget(activebackground_s)
         self._base_config(bg=bg)
         if store_b:
             self._widget_config(state=tk.ACTIVE)
         return bg
 
+    def _batch_get(self, key, func):
+        # the value of FUNC() for KEY, computed once for all the widgets
+        # created together by create_many()
+        batch_d = TTWidget._batch_d
+        if batch_d is None:
+            return func()
+        if key not in batch_d:
+            batch_d[key] = func()
+        return batch_d[key]
+
     def _base_config(self, **options):
         debug_b = options.get("debug", False)
         if debug_b:
@@ -1858,40 +3736,82 @@ class TTWidget(tk.Frame):
             if not hasattr(self, attr):
                 setattr(self, attr, default)
 
-    def _child_config(self, child, **options):
-        debug_b = options.get("debug", False)
-        if debug_b:
-            self._print(
-                "\n_CHILD_CONFIG(self={self}, child={child}\n  **{options})"
-                "".format(
-                    child=child, self=self, options=options
+    def _chunk_lines(self, chunk_i, chunk, style, options, base_font_d):
+        """Return the records of the child labels of one CHUNK of the text,
+        one per line, as in the children but without the labels.
+
+        Each record has the id of the interned STYLE of the line, the
+        CHUNK_STYLE of the chunk alone, and whether a NEWLINE follows it.
+        """
+        chunk_style = style
+        style = _style_table.intern(
+            *_merge_chunk_style(style, options, base_font_d)
+        )
+        label_options = _style_table.label_options(style, self)
+        temp_font = label_options[font_s] if style.font else None
+        case_func = self._get_case_func(style.case)
+        chunk_lines = chunk.text.splitlines(1) or [
+            "",
+        ]
+        line_cnt = len(chunk_lines)
+        records = []
+        for i, orig_line in enumerate(chunk_lines):
+            line = case_func(orig_line)
+            end_nl_f = line.endswith("\n")
+            if end_nl_f:
+                line = line[:-1]
+            records.append(
+                dict(
+                    type=text_s,
+                    chunk=chunk_i,
+                    column=0,
+                    text1=orig_line,
+                    text2=line,
+                    attrs=chunk.attrs,
+                    font_d=style.font,
+                    font=temp_font,
+                    options=label_options,
+                    case=style.case,
+                    style=style.id,
+                    chunk_style=chunk_style,
+                    newline=i < line_cnt - 1 or end_nl_f,
                 )
             )
-        _ = options.pop("caller", "")  # UNUSED caller
-        debug_b = options.pop("debug", False)
-        kids_d = options.pop("kids", self._kids)
-        vals_d = kids_d.get(str(child))
-        if vals_d:
-            if "options" not in vals_d:
-                vals_d["options"] = {}
-            if font_s in options:
-                font = options.pop("font")
-                font_d = tk_font.Font(font=font).actual()
-            else:
-                font_d = {}
-            attrs = vals_d.get("attrs")
-            l_font_d = vals_d.get("font_d", {})
-            font_d = _merge_dicts(l_font_d, font_d)
-            if attrs:
-                options, font_d, _ = self.parse_tag_attrs(
-                    attrs, options, font_d
-                )
-            if font_d:
-                font = child.font = tk_font.Font(**font_d)
-                options["font"] = str(font)
-                vals_d["font_d"] = font_d
-            vals_d["options"].update(**options)
-        return child and child.winfo_exists() and child.config(**options)
+        return records
+
+    def _config_kids(self, options, each=None, kids=None):
+        # configure the children in KIDS, by default all, with OPTIONS under
+        # the styling of their chunks, and each with its own options in
+        # EACH, by child name, from their records and in one Tcl evaluation
+        kids_d = self._kids if kids is None else kids
+        options = dict(options)
+        font_d = {}
+        if font_s in options:
+            font_d = get_font_dict(options.pop(font_s))
+        configs = []
+        for name, vals in kids_d.items():
+            kid_options = _merge_dicts(options, (each or {}).get(name, {}))
+            configs.append(
+                (vals["label"], self._kid_options(vals, kid_options, font_d))
+            )
+        self._configure_kids(configs)
+        if self.backend == grid_s:
+            self._schedule_layout()
+
+    def _configure_kids(self, configs):
+        # configure each child in CONFIGS, a list of (child, options), with
+        # a single Tcl evaluation for those that are Tk widgets
+        names, cfgs = [], []
+        for kid, options in configs:
+            if isinstance(kid, tk.Widget):
+                names.append(kid._w)
+                cfgs.append(kid._options(options))
+            elif kid is not None:
+                kid.config(**options)
+        if names:
+            self.tk.call(
+                "apply", _tcl_configure_many, tuple(names), tuple(cfgs)
+            )
 
     @staticmethod
     def _config_pared(widget):
@@ -1901,12 +3821,30 @@ class TTWidget(tk.Frame):
             if len(v) == 5 and str(v[-2]) != str(v[-1])
         }
 
+    def _destroy_kids(self):
+        # release the children but the state widget to the widget pool,
+        # and their fonts
+        kids = [
+            vals["label"]
+            for vals in self._kids.values()
+            if isinstance(vals["label"], tk.Widget)
+        ]
+        frames = [
+            getattr(self, "_compoundframe", None),
+            getattr(self, "_textframe", None),
+        ] + getattr(self, "_subframes", [])
+        self._release_kids(kids + [frame for frame in frames if frame])
+        self._compoundframe = self._textframe = None
+        self._subframes = []
+        self._release_fonts()
+
     def _disable(self, **kw):
         store_b = kw.get("store", True)
         bg = self._widget_cget(background_s)
         self._base_config(bg=bg)
-        for kid in self._get_kids():
-            kid.config(state=tk.DISABLED)
+        self._configure_kids(
+            [(kid, {state_s: tk.DISABLED}) for kid in self._get_kids()]
+        )
         if store_b:
             self._widget_config(state=tk.DISABLED)
         return bg
@@ -1931,8 +3869,9 @@ class TTWidget(tk.Frame):
 
     def _enable(self, **kw):
         store_b = kw.get("store", True)
-        for kid in self._get_kids():
-            kid.config(state=tk.NORMAL)
+        self._configure_kids(
+            [(kid, {state_s: tk.NORMAL}) for kid in self._get_kids()]
+        )
         bg = self._widget_cget(background_s)
         self._base_config(bg=bg)
         if store_b:
@@ -1997,6 +3936,23 @@ class TTWidget(tk.Frame):
     def _get_case_func(case):
         return lambda s: getattr(s, case)() if case else s
 
+    def _get_base_font_dict(self):
+        font = self._get_base_font_spec()
+        if font:
+            try:  # if type(font) in (tuple, str):
+                return get_font_dict(font)
+            except tk.TclError:
+                pass
+            except NameError:
+                pass
+        return {}
+
+    def _get_base_font_spec(self):
+        font = self.options.get(font_s, {})
+        if not font:
+            font = self._widget_cget(font_s)
+        return font
+
     def _get_current_widget_from_event(self, event, **kw):
         resolve_b = kw.get("resolve", False)
         # caller = kw.get("caller", "")  # UNUSED
@@ -2025,6 +3981,13 @@ class TTWidget(tk.Frame):
             if k not in self.opts_in_frame_not_in_widget
         }
 
+    def _get_frame_opts_of_widget(self):
+        return {
+            k: v[-1]
+            for k, v in self._widget_config().items()
+            if len(v) == 5 and k in self.frame_def_options
+        }
+
     def _get_opts_for_base(self):
         return {
             k: v
@@ -2056,6 +4019,16 @@ class TTWidget(tk.Frame):
         widget.destroy()
         return options
 
+    def _hold_font(self, kid, font=None):
+        # make the shared FONT the one held for child KID, releasing any
+        # font that it held before
+        old_font = self._kid_fonts_d.pop(str(kid), None)
+        if font is not None:
+            _style_table.acquire_font(font)
+            self._kid_fonts_d[str(kid)] = font
+        if old_font is not None:
+            _style_table.release_font(old_font)
+
     def _indicate_default(self, on_b=None, bd=None, color=None, **kwargs):
         if isinstance(self, TTLabel):
             return False
@@ -2090,6 +4063,30 @@ class TTWidget(tk.Frame):
             ] + getattr(self, "_subframes", [])
         return result
 
+    def _kid_options(self, vals, options, font_d):
+        # the OPTIONS and FONT_D for the child of record VALS under the
+        # style of its chunk, updating the record; the chunk is parsed only
+        # for records without a pre-resolved chunk style
+        chunk_style = vals.get("chunk_style")
+        if chunk_style is None:
+            attrs = vals.get("attrs")
+            chunk_style = _parse_chunk_style(attrs) if attrs else _plain_style
+            vals["chunk_style"] = chunk_style
+        options.update(chunk_style.options)
+        if font_d:
+            font_d = _merge_dicts(
+                vals.get("font_d", {}),
+                font_d,
+                _scale_font_dict(chunk_style.font),
+            )
+            kid = vals["label"]
+            font = kid.font = _style_table.font(font_d, kid)
+            self._hold_font(kid, font)
+            options[font_s] = str(font)
+            vals["font_d"] = font_d
+        vals["options"] = _merge_dicts(vals.get("options", {}), options)
+        return options
+
     def _leave(self, event=None, **kw):
         bx_state = kw.get(
             "bx_state",
@@ -2139,6 +4136,16 @@ class TTWidget(tk.Frame):
                 self._enable()
         return
 
+    def _mirror_entry(self, option):
+        # the config entry of OPTION in the mirror of the state widget, or
+        # None; text is read back from Tk while a textvariable drives it
+        entry = self._config_d.get(option)
+        if entry is not None and len(entry) == 2:
+            entry = self._config_d.get(entry[1].lstrip("-"))
+        if entry and entry[0] == text_s and self.textvariable:
+            entry = self._config_d[text_s] = self.widget.configure(text_s)
+        return entry
+
     def _motion(self, event=None, **kw):
         """Simulate an Enter/Leave event when a mouse button is down."""
         debug_b = kw.get("debug", self.default_debug)
@@ -2177,6 +4184,253 @@ class TTWidget(tk.Frame):
                 self._enter(bx_state=bx_state)
         self._prev_widget = current_widget
 
+    def _layout_canvas(self, gathering=None):
+        """Lay out the canvas labels in GATHERING, by default the children,
+        as the grid and pack geometry of the labels backend would, and size
+        the canvas to fit them and its padding.
+
+        The texts are measured with a single Tcl evaluation per font.
+        """
+        self._layout_after_id = None
+        canvas = self._compoundframe
+        if not (isinstance(canvas, tk.Canvas) and canvas.winfo_exists()):
+            return
+        if gathering is None:
+            gathering = self._kids
+        lines_d = collections.OrderedDict()
+        fonts_d = collections.defaultdict(list)
+        graphic = None
+        for vals in gathering.values():
+            label = vals["label"]
+            if vals["type"] == text_s:
+                lines_d.setdefault(vals["row"], []).append(label)
+                fonts_d[str(label.cget(font_s))].append(label)
+            else:
+                graphic = label
+                graphic.measure()
+        for font, labels in fonts_d.items():
+            widths = measure_many(
+                font, [label.cget(text_s) for label in labels], canvas
+            )
+            linespace = font_metrics(font, canvas).linespace
+            for label, width in zip(labels, widths):
+                label.measure(width, linespace)
+        lines = [
+            (
+                labels,
+                sum(label.reqwidth for label in labels),
+                max(label.reqheight for label in labels),
+            )
+            for labels in lines_d.values()
+        ]
+        compound = self._widget_cget(compound_s)
+        cells_d = {}
+        if lines:
+            cells_d[text_s] = (
+                1 if compound == tk.TOP else 0,
+                1 if compound == tk.LEFT else 0,
+                max(width for _, width, _ in lines),
+                sum(height for _, _, height in lines),
+            )
+        if graphic:
+            cells_d["graphic"] = (
+                1 if compound == tk.BOTTOM else 0,
+                1 if compound == tk.RIGHT else 0,
+                graphic.reqwidth,
+                graphic.reqheight,
+            )
+        row_heights, column_widths = [0, 0], [0, 0]
+        for row, column, width, height in cells_d.values():
+            row_heights[row] = max(row_heights[row], height)
+            column_widths[column] = max(column_widths[column], width)
+        padx, pady = self._canvas_pad
+
+        def cell_origin(cell, anchor=tk.CENTER):
+            row, column, width, height = cells_d[cell]
+            fx, fy = _anchor_fractions(anchor)
+            return (
+                padx
+                + sum(column_widths[:column])
+                + fx * (column_widths[column] - width),
+                pady
+                + sum(row_heights[:row])
+                + fy * (row_heights[row] - height),
+            )
+
+        if graphic:
+            x, y = cell_origin("graphic", self._widget_cget(anchor_s))
+            graphic.place(x, y, graphic.reqwidth, graphic.reqheight)
+        if lines:
+            x0, y = cell_origin(text_s)
+            text_width = cells_d[text_s][2]
+            fx, _ = _anchor_fractions(
+                {tk.LEFT: tk.W, tk.RIGHT: tk.E}.get(
+                    self._widget_cget(justify_s), tk.CENTER
+                )
+            )
+            for labels, width, height in lines:
+                x = x0 + fx * (text_width - width)
+                for label in labels:
+                    label.place(x, y, label.reqwidth, height)
+                    x += label.reqwidth
+                y += height
+        canvas.config(
+            width=sum(column_widths) + 2 * padx,
+            height=sum(row_heights) + 2 * pady,
+        )
+
+    def _layout_grid(self, gathering=None):
+        """Lay out the child labels in GATHERING, by default the children,
+        in the single grid of the grid backend, as the line frames of the
+        labels backend would.
+
+        The labels of all lines share the columns of the grid, so each line
+        is cut into columns at the edges of its labels, measured with a
+        single Tcl evaluation, and each column is given its width as its
+        minsize.  Each line is then gridded with a single grid command,
+        each label spanning its columns.
+        """
+        self._layout_after_id = None
+        frame = self._compoundframe
+        if (
+                self.backend != grid_s
+                or isinstance(frame, tk.Canvas)
+                or not (frame and frame.winfo_exists())
+        ):
+            return
+        if gathering is None:
+            gathering = self._kids
+        lines_d = collections.OrderedDict()
+        graphic = None
+        for vals in gathering.values():
+            if vals["type"] == text_s:
+                lines_d.setdefault(vals["row"], []).append(str(vals["label"]))
+            else:
+                graphic = vals["label"]
+        names = [name for names in lines_d.values() for name in names]
+        widths = iter(())
+        padx = pady = 0
+        if names:
+            script = " ".join("[winfo reqwidth %s]" % name for name in names)
+            widths = iter(
+                int(w)
+                for w in self.tk.splitlist(self.tk.eval("list " + script))
+            )
+            padx = frame.winfo_pixels(self._widget_cget(padx_s))
+            pady = frame.winfo_pixels(self._widget_cget(pady_s))
+        lines = []
+        for names in lines_d.values():
+            line_widths = [next(widths) for _ in names]
+            lines.append((names, line_widths, sum(line_widths) + 2 * padx))
+        width = max([line_width for _, _, line_width in lines] or [0])
+        fx = {tk.LEFT: 0.0, tk.RIGHT: 1.0}.get(
+            self._widget_cget(justify_s), 0.5
+        )
+        edges = {0, width}
+        starts = []
+        for names, line_widths, line_width in lines:
+            x = int(fx * (width - line_width)) + padx
+            starts.append(x)
+            for label_width in line_widths:
+                edges.update((x, x + label_width))
+                x += label_width
+        edges = sorted(edges)
+        columns_d = {x: i for i, x in enumerate(edges)}
+        compound = self._widget_cget(compound_s)
+        row0 = 1 if graphic and compound == tk.TOP else 0
+        col0 = 1 if graphic and compound == tk.LEFT else 0
+        for row, ((names, line_widths, _), x) in enumerate(zip(lines, starts)):
+            slaves = ["x"] * columns_d[x]
+            for name, label_width in zip(names, line_widths):
+                slaves.append(name)
+                span = columns_d[x + label_width] - columns_d[x]
+                slaves.extend(["-"] * (span - 1))
+                x += label_width
+            self.tk.call(
+                "grid", *slaves, "-in", frame, "-row", row0 + row,
+                "-column", col0, "-sticky", "ns"
+            )
+        columns = len(edges) - 1
+        minsizes_d = collections.defaultdict(list)
+        for i in range(columns):
+            minsizes_d[edges[i + 1] - edges[i]].append(col0 + i)
+        for i in range(col0 + columns, self._grid_columns):
+            minsizes_d[0].append(i)
+        self._grid_columns = col0 + columns
+        for minsize, indexes in minsizes_d.items():
+            frame.grid_columnconfigure(tuple(indexes), minsize=minsize)
+        if lines:
+            frame.grid_rowconfigure(
+                tuple(range(row0, row0 + len(lines))), pad=2 * pady
+            )
+        if graphic:
+            rows, columns = max(len(lines), 1), max(columns, 1)
+            layout_options = dict(in_=frame, row=0, column=0)
+            if compound in (tk.LEFT, tk.RIGHT, tk.CENTER, tk.NONE):
+                layout_options.update(rowspan=rows)
+            if compound in (tk.TOP, tk.BOTTOM, tk.CENTER, tk.NONE):
+                layout_options.update(columnspan=columns)
+            if compound == tk.RIGHT:
+                layout_options.update(column=columns)
+            elif compound == tk.BOTTOM:
+                layout_options.update(row=rows)
+            anchor = self._widget_cget(anchor_s)
+            if anchor != tk.CENTER:
+                layout_options.update(sticky=anchor)
+            graphic.grid(**layout_options)
+
+    def _layout_subframes(self, frame_options, first=0):
+        # grid the line frames of the text, starting with line FIRST
+        compound = self._widget_cget(compound_s)
+        layout_options = dict(
+            in_=self._textframe,
+            row=(1 if compound == tk.TOP else 0) + first,
+            column=1 if compound == tk.LEFT else 0,
+        )
+        justify = self._widget_cget(justify_s)
+        if justify != tk.CENTER:
+            sticky = tk.E if justify == tk.RIGHT else tk.W
+            layout_options.update(**{"sticky": sticky})
+        for f in self._subframes[first:]:
+            f.grid(**layout_options)
+            f.config(**frame_options)
+            if debug_mode_b:
+                f.config(
+                    highlightthickness=2,
+                    highlightcolor="magenta",
+                    highlightbackground="magenta",
+                )
+            layout_options["row"] += 1
+
+    def _new_kid(self, vals, canvas=None):
+        # create the child label of the line record VALS, on the CANVAS of
+        # the canvas backend if given, holding its font
+        if canvas:
+            lab = _CanvasLabel(
+                self, canvas, text=vals["text2"], **vals["options"]
+            )
+        else:
+            lab = self._new_widget(
+                tk.Label, text=vals["text2"], **vals["options"]
+            )
+        if vals["font"]:
+            self._hold_font(lab, vals["font"])
+        return lab
+
+    def _new_widget(self, cls, **options):
+        # create a child of class CLS with OPTIONS, or reuse an unused one
+        # from the widget pool, reset to the default options
+        widget = _widget_pool.acquire(self, cls)
+        if widget is None:
+            return cls(self, **options)
+        if cls is tk.Label:
+            defaults = self.label_def_options
+        else:
+            defaults = self._get_frame_def_opts()
+        widget.config(**_merge_dicts(defaults, options))
+        widget.lift()
+        return widget
+
     def _pack_anchored_frame(self, frame, **kwargs):
         def __pad_frame(self, frame, **kwargs):
             debug_b = kwargs.pop("debug", False)
@@ -2191,8 +4445,9 @@ class TTWidget(tk.Frame):
                 padx = str(self._widget_cget(padx_s))
                 pady = str(self._widget_cget(pady_s))
                 if text_b:
-                    font = tk_font.Font(font=self._widget_cget(font_s))
-                    w, h = font.measure("0"), font.metrics("linespace")
+                    font = self._widget_cget(font_s)
+                    metrics = font_metrics(font, self)
+                    w, h = metrics.widths["0"], metrics.linespace
                     padx = 10 * w // 20  # 20 #
                     pady = 10 * h // 60  # 50 #
                     if debug_b:
@@ -2201,8 +4456,13 @@ class TTWidget(tk.Frame):
                     pass
                 ipadx = bd
                 ipady = bd
-            if frame:
+            if isinstance(frame, tk.Canvas):
+                self._canvas_pad = (
+                    frame.winfo_pixels(padx), frame.winfo_pixels(pady)
+                )
+            elif frame:
                 frame.config(padx=padx, pady=pady)
+            if frame:
                 if self.winfo_ismapped():
                     self.pack_configure(ipadx=bd, ipady=bd)
             if debug_b:
@@ -2216,6 +4476,21 @@ class TTWidget(tk.Frame):
         self.grid_columnconfigure(0, weight=1)
         __pad_frame(self, frame, **kwargs)
 
+    def _pack_lines(self, gathering, rows=None):
+        # pack the child labels of GATHERING, of only the lines ROWS if
+        # given, into their line frames, with a single pack command per line
+        lines_d = collections.defaultdict(list)
+        for vals in gathering.values():
+            if vals["type"] != text_s:
+                continue
+            if rows is None or vals["row"] in rows:
+                lines_d[vals["row"]].append(str(vals["label"]))
+        for row, names in sorted(lines_d.items()):
+            self.tk.call(
+                "pack", *names, "-in", self._subframes[row], "-side", tk.LEFT,
+                "-fill", tk.BOTH, "-expand", 1
+            )
+
     def _press(self, event=None, **kw):
         debug_b = kw.get("debug", self.default_debug)
         num = kw.get("num", getattr(event, "num", -1))
@@ -2277,6 +4552,8 @@ class TTWidget(tk.Frame):
         creation of the child widget is skipped and the internal state widget
         is mapped instead.
         """
+        if self._lazy_ids is not None:
+            return self._kids  # until _procreate_lazily()
         bind_b = options.pop("bind", False)
         debug_b = options.pop("debug", self.default_debug)
         if debug_b:
@@ -2286,46 +4563,46 @@ class TTWidget(tk.Frame):
         if text is not None:
             self._update_text(text)
             return {}
-        for child in self.winfo_children():
-            if child != self.widget:
-                child.destroy()
-        font = self.options.get(font_s, {})
-        if not font:
-            font = self._widget_cget(font_s)
-        if font:
-            try:  # if type(font) in (tuple, str):
-                font = tk_font.Font(font=font)
-            except tk.TclError:
-                font = None
-            except NameError:
-                font = None
-            base_font_d = font.actual() if font else {}
+        update_b = not (bind_b or suppress_f or options)
+        base_font_d = self._get_base_font_dict()
+        template = self.template
+        if template:
+            parsed = template.substitute(self.template_values)
+            text = parsed.text
         else:
-            base_font_d = {}
-        if self._widget_cget(textvariable_s):
-            textvariable = self._widget_cget(textvariable_s)
-            text = textvariable.get()
-        else:
-            text = self._widget_cget(text_s)
+            if self._widget_cget(textvariable_s):
+                textvariable = self._widget_cget(textvariable_s)
+                text = textvariable.get()
+            else:
+                text = self._widget_cget(text_s)
+            parsed = parse_tagged_text(text)
+        procreated = (text, self.backend) + tuple(
+            str(self._widget_cget(key))
+            for key in (bitmap_s, compound_s, image_s, wraplength_s)
+        )
+        if update_b and procreated == self._procreated:
+            return self._kids
+        self._procreated = procreated
         text_b = text
-        text_chunks = [
-            tc for tc in split_tagged_text_into_chunks(text_b) if tc
-        ]
-        self.emulation_b = is_tagged_text(text_b) and len(text_chunks) > 1
+        text_chunks, tagged_b = parsed.chunks, parsed.tagged
+        emulated_b = self.emulation_b
+        self.emulation_b = tagged_b and len(text_chunks) > 1
         self.native_b = not self.emulation_b
         if not self.emulation_b:
             # use the widget instead of procreating
+            self._destroy_kids()
             self._kids = {}
             font_d = {}
             temp_font = None
             case = ""
-            if text_b and is_tagged_text(text_b):
-                _tag, chunk_tags, chunk_text = split_chunk(text_b)
-                options, font_d, case = self.parse_tag_attrs(
-                    chunk_tags, self.options.copy(), base_font_d.copy()
+            if text_b and tagged_b:
+                chunk = text_chunks[0]
+                chunk_tags, chunk_text = chunk.attrs, chunk.text
+                options, font_d, case = _merge_chunk_style(
+                    parsed.styles[0], self.options, base_font_d
                 )
                 if font_d:
-                    temp_font = tk_font.Font(**font_d)
+                    temp_font = _style_table.font(font_d, self)
                     options[font_s] = temp_font
                 case_func = self._get_case_func(case)
                 chunk_text = case_func(chunk_text)
@@ -2334,7 +4611,8 @@ class TTWidget(tk.Frame):
             options[text_s] = chunk_text
             #
             super().config(**self._get_frame_def_opts())
-            self.widget.config(**options)
+            self._widget_config(**options)
+            self._hold_font(self.widget, temp_font)
             self.widget.tagged = text_b
             self.widget.text = chunk_text
             self.widget.case = case
@@ -2343,7 +4621,7 @@ class TTWidget(tk.Frame):
             self.widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             self.widget.lift()
             if debug_mode_b:
-                self.widget.config(bg="magenta")
+                self._widget_config(bg="magenta")
             self._widget_rebind_externals()
             return {}
         # create the emulated widget
@@ -2378,92 +4656,74 @@ class TTWidget(tk.Frame):
         gcol = 1 if compound == tk.RIGHT else 0
         trow = 1 if compound == tk.TOP else 0
         tcol = 1 if compound == tk.LEFT else 0
-        gathering = collections.OrderedDict()
-        self._textframe = None
-        self._subframes = []
-        self._compoundframe = tk.Frame(self)
-        if text_b and is_tagged_text(text_b) and len(text_chunks) > 1:
+        if text_b and tagged_b and len(text_chunks) > 1:
             text = text_b
             wraplength = self.winfo_fpixels(self._widget_cget(wraplength_s))
             if wraplength > 0:
                 # w_font = tk_font.Font(font=self._widget_cget(font_s))#UNUSED
-                wfont_W = font.measure("0")
+                wfont_W = font_metrics(
+                    self._get_base_font_spec(), self
+                ).widths["0"]
                 # wfont_H = font.metrics("linespace")  # UNUSED
                 wrapchars = max(wraplength // wfont_W, 1)
-                text = wrap_tagged_text(text_b, wrapchars)
-            #
+                if template:
+                    texts = _wrap_chunks(parsed.chunks, wrapchars) or [
+                        chunk.text for chunk in parsed.chunks
+                    ]
+                    parsed = parsed._replace(
+                        chunks=tuple(
+                            chunk._replace(text=chunk_text)
+                            for chunk, chunk_text in zip(parsed.chunks, texts)
+                        )
+                    )
+                else:
+                    text = wrap_tagged_text(text_b, wrapchars)
+                    parsed = parse_tagged_text(text)
+            if (
+                    update_b
+                    and emulated_b
+                    and not graphic_b
+                    and self._update_kids(parsed, options, base_font_d)
+            ):
+                return self._kids
+        self._destroy_kids()
+        gathering = collections.OrderedDict()
+        self._textframe = None
+        self._subframes = []
+        canvas_b = self.backend == canvas_s
+        lined_b = self.backend == labels_s
+        self._last_row = 0
+        if canvas_b:
+            self._compoundframe = tk.Canvas(self, bd=0, highlightthickness=0)
+            frame_options = {
+                k: v
+                for k, v in frame_options.items()
+                if k in (background_s, cursor_s)
+            }
+        else:
+            self._compoundframe = self._new_widget(tk.Frame)
+        if text_b and tagged_b and len(text_chunks) > 1:
             if debug_b:
                 self._print("TEXT is {0!r}".format(text))
-            chunks = split_tagged_text_into_chunks(text)
             if debug_b:
-                self._print("CHUNKS are %r" % chunks)
-            row = column = 0
-            self._textframe = tk.Frame(self._compoundframe)
-            self._subframes = [tk.Frame(self._textframe)]
-            for chunk in chunks:
-                if debug_b:
-                    self._print("CHUNK is %r" % chunk)
-                if not chunk:
-                    continue
-                _tag, chunk_tags, chunk_text = split_chunk(chunk)
-                label_options, font_d, case = self.parse_tag_attrs(
-                    chunk_tags, options.copy(), base_font_d.copy()
+                self._print("CHUNKS are %r" % (parsed.chunks,))
+            if lined_b:
+                self._textframe = self._new_widget(tk.Frame)
+                self._subframes = [self._new_widget(tk.Frame)]
+            for chunk_i, (chunk, style) in enumerate(
+                    zip(parsed.chunks, parsed.styles)
+            ):
+                self._procreate_chunk(
+                    gathering,
+                    chunk_i,
+                    chunk,
+                    style,
+                    options,
+                    base_font_d,
+                    bind=bind_b,
+                    debug=debug_b,
+                    suppress=suppress_f,
                 )
-                if font_d:
-                    temp_font = tk_font.Font(**font_d)
-                    label_options[font_s] = temp_font
-                else:
-                    temp_font = None
-                case_func = self._get_case_func(case)
-                chunk_lines = chunk_text.splitlines(1) or [
-                    "",
-                ]
-                if debug_b:
-                    self._print("CHUNK_LINES is %r" % chunk_lines)
-                line_cnt = len(chunk_lines)
-                for i, line in enumerate(chunk_lines):
-                    orig_line = line
-                    line = case_func(line)
-                    end_nl_f = line.endswith("\n")
-                    if end_nl_f:
-                        line = line[:-1]
-                    lab = tk.Label(self, text=line, **label_options)
-                    gathering[str(lab)] = dict(
-                        label=lab,
-                        index=len(gathering),
-                        type=text_s,
-                        row=row,
-                        column=column,
-                        text1=orig_line,
-                        text2=line,
-                        attrs=chunk_tags,
-                        font_d=font_d,
-                        font=temp_font,
-                        options=label_options,
-                        case=case,
-                    )
-                    if not suppress_f:
-                        lab.pack(
-                            in_=self._subframes[-1],
-                            side=tk.LEFT,
-                            fill=tk.BOTH,
-                            expand=True,
-                        )
-                    if debug_b:
-                        self._print(
-                            "PUTTING %r at %d,%d" % (line, row, column)
-                        )
-                    if bind_b and self.widget_class == tk.Button:
-                        lab.bind("<Button-1>", self._press)
-                        lab.bind("<ButtonRelease-1>", self._release)
-                    if i < line_cnt - 1 or end_nl_f:
-                        self._subframes.append(tk.Frame(self._textframe))
-            layout_options = dict(row=trow, column=tcol,)
-            anchor = self._widget_cget(anchor_s)
-            justify = self._widget_cget(justify_s)
-            if justify != tk.CENTER:
-                sticky = tk.E if justify == tk.RIGHT else tk.W
-                layout_options.update(**{"sticky": sticky})
             if debug_mode_b:
                 super().config(
                     highlightthickness=2,
@@ -2471,26 +4731,20 @@ class TTWidget(tk.Frame):
                     highlightbackground="magenta",
                     bg="cyan",
                 )
-            if debug_mode_b:
+            if debug_mode_b and lined_b:
                 self._textframe.config(
                     highlightthickness=2,
                     highlightcolor="teal",
                     highlightbackground="teal",
                 )
-            self._textframe.grid(
-                in_=self._compoundframe, row=trow, column=tcol
-            )
-            self._textframe.config(**frame_options)
-            for f in self._subframes:
-                f.grid(**layout_options)
-                f.config(**frame_options)
-                if debug_mode_b:
-                    f.config(
-                        highlightthickness=2,
-                        highlightcolor="magenta",
-                        highlightbackground="magenta",
-                    )
-                layout_options["row"] += 1
+            if lined_b:
+                if not suppress_f:
+                    self._pack_lines(gathering)
+                self._textframe.grid(
+                    in_=self._compoundframe, row=trow, column=tcol
+                )
+                self._textframe.config(**frame_options)
+                self._layout_subframes(frame_options)
             underline = self._widget_cget(underline_s)
             if underline >= 0:
                 self._underline(underline, gathering)
@@ -2499,7 +4753,7 @@ class TTWidget(tk.Frame):
                 or not self.emulation_b
                 and (
                     not text_b
-                    or not is_tagged_text(text_b)
+                    or not tagged_b
                     or len(text_chunks) == 1
                 )
         ):
@@ -2514,13 +4768,14 @@ class TTWidget(tk.Frame):
             if not self.emulation_b:
                 if not text_b:
                     chunk_tags, chunk_text = "", ""
-                elif is_tagged_text(text_b):
-                    _tag, chunk_tags, chunk_text = split_chunk(text_b)
-                    options, font_d, case = self.parse_tag_attrs(
-                        chunk_tags, options, base_font_d.copy()
+                elif tagged_b:
+                    chunk = text_chunks[0]
+                    chunk_tags, chunk_text = chunk.attrs, chunk.text
+                    options, font_d, case = _merge_chunk_style(
+                        parsed.styles[0], options, base_font_d
                     )
                     if font_d:
-                        temp_font = tk_font.Font(**font_d)
+                        temp_font = _style_table.font(font_d, self)
                         options[font_s] = temp_font
                     case_func = self._get_case_func(case)
                     chunk_text = case_func(chunk_text)
@@ -2537,7 +4792,11 @@ class TTWidget(tk.Frame):
                     font=temp_font,
                 )
                 key = text_s if key is None else compound_s
-            gl = tk.Label(self, **options)
+            if canvas_b:
+                gl = _CanvasLabel(self, self._compoundframe, **options)
+            else:
+                gl = self._new_widget(tk.Label, **options)
+            self._hold_font(gl, temp_font)
             text_rows = (
                 len(self._subframes) if hasattr(self, "_subframes") else 1
             )
@@ -2552,7 +4811,8 @@ class TTWidget(tk.Frame):
             anchor = self._widget_cget(anchor_s)
             if anchor != tk.CENTER:
                 layout_options.update(**{"sticky": anchor})
-            gl.grid(**layout_options)
+            if lined_b:
+                gl.grid(**layout_options)
             gathered.update(label=gl, index=len(gathering), type=key)
             gathering[str(gl)] = gathered
             for kid in self._get_kids(kids=gathering):
@@ -2563,12 +4823,71 @@ class TTWidget(tk.Frame):
         self._pack_anchored_frame(
             self._compoundframe, anchor=anchor, text=text_b, graphic=graphic_b
         )
+        if canvas_b:
+            self._layout_canvas(gathering)
+        elif not lined_b:
+            self._layout_grid(gathering)
         self._indicate_default()
         if debug_b:
             self._print("GATHERING is %r" % gathering)
         self._discipline_family(kids=gathering)
         return gathering
 
+    def _procreate_lazily(self, event=None):
+        # procreate a lazy widget, on its first <Map> or when idle
+        if self._lazy_ids is None:
+            return
+        funcid, after_id = self._lazy_ids
+        self._lazy_ids = None
+        _unbind_func(self, "<Map>", funcid)
+        if after_id:
+            self.after_cancel(after_id)
+        self._kids = self._procreate()
+
+    def _procreate_chunk(
+            self, gathering, chunk_i, chunk, style, options, base_font_d, **kw
+    ):
+        """Create the child labels for one CHUNK of the text, one per line,
+        adding a line frame after each newline, for _pack_lines() to pack
+        the labels into.  For the canvas backend, the labels are drawn on
+        the canvas instead, and laid out by _layout_canvas(), and for the
+        grid backend, laid out by _layout_grid(), without line frames.
+
+        The labels are added to GATHERING, with the ROW of their line.
+        """
+        bind_b = kw.get("bind", False)
+        debug_b = kw.get("debug", False)
+        canvas = self._compoundframe
+        if not isinstance(canvas, tk.Canvas):
+            canvas = None
+        lined_b = self.backend == labels_s
+        row = len(self._subframes) - 1 if lined_b else self._last_row
+        if debug_b:
+            self._print("CHUNK is %r" % (chunk,))
+        lines = self._chunk_lines(chunk_i, chunk, style, options, base_font_d)
+        if debug_b:
+            self._print("CHUNK_LINES is %r" % [v["text1"] for v in lines])
+        for vals in lines:
+            lab = self._new_kid(vals, canvas)
+            vals.update(label=lab, index=len(gathering), row=row)
+            gathering[str(lab)] = vals
+            if debug_b:
+                self._print("PUTTING %r at %d,%d" % (vals["text2"], row, 0))
+            if bind_b and self.widget_class == tk.Button:
+                self._kid_funcids_d[str(lab)] = [
+                    (sequence, lab.bind(sequence, func))
+                    for sequence, func in (
+                        (Button_1_s, self._press),
+                        (ButtonRelease_1_s, self._release),
+                    )
+                ]
+            if vals["newline"]:
+                row += 1
+                if lined_b:
+                    self._subframes.append(self._new_widget(tk.Frame))
+                else:
+                    self._last_row = row
+
     def _release(self, event=None, **kw):
         debug_b = kw.get("debug", self.default_debug)
         num = kw.get("num", getattr(event, "num", -1))
@@ -2625,6 +4944,44 @@ class TTWidget(tk.Frame):
         od.update({k: v for k, v in sorted(d.items()) if k not in od})
         return od
 
+    def _release_fonts(self):
+        # release the shared fonts held for all the children
+        fonts = list(self._kid_fonts_d.values())
+        self._kid_fonts_d.clear()
+        for font in fonts:
+            _style_table.release_font(font)
+
+    def _release_kids(self, kids):
+        # unbind and unmap the child labels and frames KIDS, returning them
+        # to the widget pool; other children, such as a canvas, are destroyed
+        funcids = [
+            vals
+            for seq_funcids_d in getattr(self, "_funcids_d", {}).values()
+            for vals in seq_funcids_d.values()
+        ]
+        pooled = []
+        for kid in kids:
+            name = str(kid)
+            for sequence, fid in self._kid_funcids_d.pop(name, ()):
+                kid.unbind(sequence, fid)
+            for vals in funcids:
+                fid = vals["kids"].pop(name, None)
+                fid = vals["frames"].pop(name, None) or fid
+                if fid:
+                    kid.unbind(vals["sequence"], fid)
+            if type(kid) in (tk.Frame, tk.Label):
+                for sequence in kid.bind():
+                    kid.unbind(sequence)
+                pooled.append(kid)
+            else:
+                kid.destroy()
+        if pooled:
+            names = [str(kid) for kid in pooled]
+            self.tk.call("pack", "forget", *names)
+            self.tk.call("grid", "forget", *names)
+            for kid in pooled:
+                _widget_pool.release(self, kid)
+
     def _repeat_click(self):
         self._check_attributes("_depressed_w", "after_id")
         if self._depressed_w:
@@ -2644,15 +5001,68 @@ class TTWidget(tk.Frame):
     def _resolve_widget(cls, widget):
         # debug_b = kw.get("debug", cls.default_debug)  # UNUSED
         while widget and not isinstance(widget, cls):
-            if type(widget) in (tk.Frame, tk.Button, tk.Label):
+            if type(widget) in (tk.Frame, tk.Button, tk.Label, tk.Canvas):
                 widget = widget.master
             else:
                 break
         return widget
 
+    def _procreate_pending(self):
+        # procreate as scheduled by _schedule_procreate()
+        self._procreate_after_id = None
+        self._kids = self._procreate()
+
+    def _schedule_layout(self):
+        # lay out the canvas again when idle, once for any number of changes
+        if self._layout_after_id is None and self.winfo_exists():
+            self._layout_after_id = self.after_idle(
+                self._layout_canvas
+                if self.backend == canvas_s
+                else self._layout_grid
+            )
+
+    def _schedule_procreate(self):
+        # procreate when idle, once for any number of changes that need it;
+        # a lazy widget procreates with its latest options anyway
+        if (
+                self._procreate_after_id is None
+                and self._lazy_ids is None
+                and self.winfo_exists()
+        ):
+            self._procreate_after_id = self.after_idle(
+                self._procreate_pending
+            )
+
     def _set_default_debug(self, val):
         self.default_debug = val
 
+    def _template_config(self, **kw):
+        abstain_b = kw.pop("abstain", False)
+        changed = None
+        if template_s in kw:
+            template = kw[template_s]
+            if isinstance(template, str):
+                template = compile_template(template)
+            self.template = template
+        if values_s in kw:
+            old_values = self.template_values
+            self.template_values = dict(old_values)
+            self.template_values.update(kw[values_s] or {})
+            if template_s not in kw:
+                changed = [
+                    k
+                    for k, v in self.template_values.items()
+                    if k not in old_values or old_values[k] != v
+                ]
+        if abstain_b:
+            return
+        if (
+                changed is None
+                or self._procreate_after_id is not None
+                or not self._update_template_kids(changed)
+        ):
+            self._schedule_procreate()
+
     @classmethod
     def _top_widget(cls, widget):
         while hasattr(widget, "master"):
@@ -2667,7 +5077,7 @@ class TTWidget(tk.Frame):
     def _trace_callback(self, varname=None, varindex=None, varmode=None):
         if varmode == "w":
             # value = self.getvar(varname)  # UNUSED
-            self._kids = self._procreate()
+            self._schedule_procreate()
 
     def _underline(self, pos=-1, gathering=None, **kw):
         store_b = kw.get("store", True)
@@ -2694,6 +5104,165 @@ class TTWidget(tk.Frame):
     def _unmap(self, widget):
         return unmap(widget)
 
+    def _update_kids(self, parsed, options, base_font_d):
+        """Update the child labels to show the PARSED text by a diff of
+        their lines with the lines of the text, instead of procreating them.
+
+        Only the lines between the lines that are unchanged at the start
+        and at the end are reconfigured, or else created or destroyed, and
+        only the lines of the text that gain labels are packed again.  The
+        kept labels keep their bindings and fonts.
+
+        Returns False, having changed nothing, if the children are not just
+        the lines of a text, as with a graphic, or not of the backend.
+        """
+        old = list(self._kids.values())
+        canvas = getattr(self, "_compoundframe", None)
+        lined_b = getattr(self, "_textframe", None) is not None
+        if (
+                not old
+                or not (canvas and canvas.winfo_exists())
+                or isinstance(canvas, tk.Canvas) != (self.backend == canvas_s)
+                or lined_b != (self.backend == labels_s)
+                or any("newline" not in vals for vals in old)
+        ):
+            return False
+        if not isinstance(canvas, tk.Canvas):
+            canvas = None
+        new = []
+        for chunk_i, (chunk, style) in enumerate(
+                zip(parsed.chunks, parsed.styles)
+        ):
+            new.extend(
+                self._chunk_lines(chunk_i, chunk, style, options, base_font_d)
+            )
+        row = 0
+        for vals in new:
+            vals["row"] = row
+            row += vals["newline"]
+        rows = row + 1
+
+        def key(vals):
+            return vals["text2"], vals["style"], vals["newline"]
+
+        count = min(len(old), len(new))
+        head = 0
+        while head < count and key(old[head]) == key(new[head]):
+            head += 1
+        tail = 0
+        while (
+                tail < count - head
+                and key(old[-1 - tail]) == key(new[-1 - tail])
+        ):
+            tail += 1
+        old_mid = old[head:len(old) - tail]
+        new_mid = new[head:len(new) - tail]
+        removed = [vals["label"] for vals in old_mid[len(new_mid):]]
+        for lab in removed:
+            self._hold_font(lab, None)
+        self._release_kids(removed)
+        gathering = collections.OrderedDict()
+        created = collections.OrderedDict()
+        moved_rows = set()
+        for i, vals in enumerate(new):
+            if i < head:
+                old_vals = old[i]
+            elif i >= len(new) - tail:
+                old_vals = old[i - len(new) + len(old)]
+            elif i - head < len(old_mid):
+                old_vals = old_mid[i - head]
+                reset = {
+                    k: self.label_def_options[k]
+                    for k in old_vals["options"]
+                    if k not in vals["options"] and k in self.label_def_options
+                }
+                old_vals["label"].config(
+                    text=vals["text2"], **_merge_dicts(reset, vals["options"])
+                )
+                self._hold_font(old_vals["label"], vals["font"])
+            else:
+                old_vals = None
+            if old_vals is None:
+                lab = self._new_kid(vals, canvas)
+                created[str(lab)] = vals
+                moved_rows.add(vals["row"])
+            else:
+                lab = old_vals["label"]
+                if old_vals["row"] != vals["row"]:
+                    moved_rows.add(vals["row"])
+            vals.update(label=lab, index=len(gathering))
+            gathering[str(lab)] = vals
+        new_frames = []
+        if self.backend == labels_s:
+            first = len(self._subframes)
+            while len(self._subframes) < rows:
+                self._subframes.append(self._new_widget(tk.Frame))
+            new_frames = self._subframes[first:]
+            self._pack_lines(gathering, moved_rows)
+            self._release_kids(self._subframes[rows:])
+            del self._subframes[rows:]
+            if new_frames:
+                frame_options = {
+                    k: v
+                    for k, v in options.items()
+                    if k in self.frame_def_options
+                }
+                self._layout_subframes(frame_options, first)
+        self._kids = gathering
+        self._widget_bind_kids(created, new_frames)
+        self._last_row = rows - 1
+        if canvas:
+            self._layout_canvas(gathering)
+        elif self.backend == grid_s:
+            self._layout_grid(gathering)
+        underline = self._widget_cget(underline_s)
+        if underline >= 0:
+            self._underline(underline, gathering, store=False)
+        return True
+
+    def _update_template_kids(self, names):
+        """Update the text of only the child labels that use the template
+        slot NAMES.
+
+        Returns False if the children must be procreated instead, as when a
+        value adds or removes lines or the text is wrapped.
+        """
+        template = self.template
+        indexes = template.chunks_using(names) if template else []
+        if not indexes:
+            return True
+        values = self.template_values
+        if not self.emulation_b:
+            text = template.format_chunk(0, values)
+            case_func = self._get_case_func(getattr(self.widget, case_s, ""))
+            self._widget_config(text=case_func(text))
+            self.widget.tagged = self.widget.text = text
+            return True
+        if self.winfo_fpixels(self._widget_cget(wraplength_s)) > 0:
+            return False
+        kids_d = collections.defaultdict(list)
+        for vals in self._kids.values():
+            if "chunk" in vals:
+                kids_d[vals["chunk"]].append(vals)
+        updates = []
+        for index in indexes:
+            text = template.format_chunk(index, values)
+            kids = kids_d.get(index, [])
+            if len(kids) != 1 or "\n" in text or "\n" in kids[0]["text1"]:
+                return False
+            updates.append((kids[0], text))
+        for vals, text in updates:
+            line = self._get_case_func(vals[case_s])(text)
+            vals.update(text1=text, text2=line)
+            vals["label"].config(text=line)
+        self._procreated = None
+        if self.backend == grid_s:
+            self._schedule_layout()
+        underline = self._widget_cget(underline_s)
+        if underline >= 0:
+            self._underline(underline, store=False)
+        return True
+
     def _update_text(self, text):
         textvariable = self._widget_cget(textvariable_s)
         if textvariable:
@@ -2828,19 +5397,37 @@ class TTWidget(tk.Frame):
             )
         return result
 
+    def _widget_bind_kids(self, kids_d, frames):
+        # give new child labels and line FRAMES the existing bindings
+        for seq_funcids_d in getattr(self, "_funcids_d", {}).values():
+            for vals in seq_funcids_d.values():
+                sequence, func = vals["sequence"], vals["func"]
+                for frame in frames:
+                    fid = frame.bind(sequence, func, "+")
+                    vals["frames"][str(frame)] = fid
+                if not vals["kids"]:
+                    continue
+                for child_str, kid_vals in kids_d.items():
+                    vals["kids"][child_str] = kid_vals["label"].bind(
+                        sequence, func, "+"
+                    )
+
     def _widget_cget(self, option, **kwargs):
         """Get config option info from the internal widget used to keep
         state.
         """
         cook_b = kwargs.get("cook", True)
         default_b = kwargs.get(default_s, False)
+        if option == backend_s:
+            return self.backend
+        if option == template_s:
+            return self.template
+        if option == values_s:
+            return self.template_values
+        entry = self._mirror_entry(option)
         if default_b:
-            value = self.widget.config(option)[-2]
-            return value
-        try:  # if True: #
-            value = self.widget.cget(option)
-        except tk.TclError:  # else: #
-            value = None
+            return entry[-2] if entry else None
+        value = entry[-1] if entry else None
         if cook_b:
             # <border object: >
             if option in (
@@ -2900,21 +5487,8 @@ class TTWidget(tk.Frame):
                     text_s,
                     textvariable_s,
             ):
-                if option == command_s:
-                    if self.command:
-                        value = self.command
-                    elif "<lambda>" not in value:
-                        value = eval(value.lstrip(string.digits))
-                    else:
-                        value = "<lambda>"  # NotImplemented #
-                elif option == textvariable_s:
-                    if self.textvariable:
-                        value = self.textvariable
-                    elif value:
-                        try:
-                            value = eval(str(value))
-                        except NameError:
-                            pass
+                if option in self._callbacks_d:
+                    value = self._callbacks_d[option]
                 else:
                     value = str(value)
             else:
@@ -2929,11 +5503,18 @@ class TTWidget(tk.Frame):
         if option and value != sentinel:
             kwargs[option] = value
         count_i = len(kwargs)
+        keys = self._widget_keys()
+        tk_options = {}
         for opt, val in kwargs.items():
-            if opt in self.widget.keys():
-                self.widget.config(**{opt: val})
+            if opt in keys:
+                tk_options[opt] = val
             else:
                 setattr(self.widget, opt, val)
+        if tk_options:
+            self.widget.config(**tk_options)
+            for opt in tk_options:
+                entry = self.widget.configure(opt)
+                self._config_d[entry[0]] = entry
             # try:  # if True: #
                 # self.widget.config(**{opt: val})
                 # success_i += 1
@@ -2953,9 +5534,11 @@ class TTWidget(tk.Frame):
                     # Raise=True,
                 # )
         if value == sentinel:
-            config_d = self.widget.config()
+            config_d = self._config_d
+            if text_s in config_d:
+                self._mirror_entry(text_s)  # refresh from any textvariable
             if not option:
-                results = config_d
+                results = dict(config_d)
             elif option in config_d:
                 results = config_d[option][-1] if cget_b else config_d[option]
             else:
@@ -2968,6 +5551,16 @@ class TTWidget(tk.Frame):
             return results
         return success_i == count_i
 
+    def _widget_keys(self):
+        # the Tk option names of the state widget, fetched once per class
+        widget_class = type(self.widget)
+        keys = TTWidget._widget_keys_d.get(widget_class)
+        if keys is None:
+            keys = TTWidget._widget_keys_d[widget_class] = frozenset(
+                self.widget.keys()
+            )
+        return keys
+
     def _widget_rebind_externals(self, **kw):
         """Rebind any bindings that existed before the child widgets were
         created.
@@ -3077,6 +5670,111 @@ class TTWidget(tk.Frame):
         """See help on module method alias() for more info"""
         return alias(option)
 
+    def append_text(self, text):
+        """Append the tagged TEXT to the text of the widget.
+
+        Only the chunks completed by TEXT get new child labels, which are
+        added to the last line of the widget, or to new lines after any
+        newlines.  A tag split across calls is shown once its closing tag
+        has been appended.
+
+        The whole text is procreated instead, as by config(text=...), when
+        the widget does not already show multiple chunks, or when it wraps
+        its text, uses a graphic, template, or textvariable, or uses the
+        canvas or grid backend.
+        """
+        old_text = self._widget_cget(text_s)
+        new_text = old_text + text
+        parser = self._stream_parser
+        if parser is None or self._stream_text != old_text:
+            # a text shown by procreation shows any pending text as plain
+            parser = TaggedTextParser()
+            parser.feed(old_text)
+            resync_b = bool(parser.pending)
+        else:
+            resync_b = False
+        if (
+                not self.emulation_b
+                or not self._kids
+                or self._procreate_after_id is not None
+                or resync_b
+                or self.backend != labels_s
+                or self.template
+                or self._widget_cget(textvariable_s)
+                or self._widget_cget(image_s)
+                or self._widget_cget(bitmap_s)
+                or self.winfo_fpixels(self._widget_cget(wraplength_s)) > 0
+        ):
+            self._stream_parser = self._stream_text = None
+            self.config(**{text_s: new_text})
+            return
+        chunks = parser.feed(text)
+        self._widget_config(**{text_s: new_text})
+        self._stream_parser, self._stream_text = parser, new_text
+        self._procreated = None
+        if not chunks:
+            return
+        base_font_d = self._get_base_font_dict()
+        options = _merge_dicts(
+            self._get_opts_for_kids(),
+            label_override_d,
+            {compound_s: self._widget_cget(compound_s)},
+        )
+        frame_options = {
+            k: v for k, v in options.items() if k in self.frame_def_options
+        }
+        first = len(self._subframes)
+        gathering = collections.OrderedDict()
+        kids_count = len(self._kids)
+        chunk_i = self._kids[next(reversed(self._kids))].get("chunk", -1)
+        for chunk in chunks:
+            chunk_i += 1
+            style = (
+                _parse_chunk_style(chunk.tokens)
+                if chunk.tokens
+                else _plain_style
+            )
+            self._procreate_chunk(
+                gathering, chunk_i, chunk, style, options, base_font_d
+            )
+        for vals in gathering.values():
+            vals["index"] += kids_count
+        self._kids.update(gathering)
+        self._pack_lines(gathering)
+        self._layout_subframes(frame_options, first)
+        self._widget_bind_kids(gathering, self._subframes[first:])
+        underline = self._widget_cget(underline_s)
+        if underline >= 0:
+            self._underline(underline, store=False)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Return a context manager that queues the options passed to
+        config() by keyword, and applies them on exit in one merged
+        config(), with at most one procreation of the children, done at
+        once, and one pass over the children for their options.
+
+        Later values of an option replace earlier ones.  cget() returns the
+        options in effect before the batch.  Calls with other arguments or
+        with flags, such as store=False, are applied at once.  The queued
+        options are dropped if the block raises.  Batches may be nested;
+        the outermost one applies the options.
+        """
+        if self._batch_options is not None:
+            yield self
+            return
+        self._batch_options = collections.OrderedDict()
+        try:
+            yield self
+            options = self._batch_options
+        finally:
+            self._batch_options = None
+        if options:
+            self.config(**options)
+            if self._procreate_after_id is not None:
+                self.after_cancel(self._procreate_after_id)
+                self._procreate_pending()
+
     def bind(self, sequence=None, func=None, add=None):
         """Bind to this widget at event SEQUENCE a call to function FUNC.
 
@@ -3150,6 +5848,53 @@ class TTWidget(tk.Frame):
         kw.update(cook=True)
         return self._widget_cget(key, **kw)
 
+    def clone(self, n=1, master=None, **options):
+        """Create N copies of this widget in MASTER, by default its master,
+        with the OPTIONS changed, and return them in a list.
+
+        The copies have the options of this widget that differ from the
+        defaults, including its template and values, backend, and case,
+        and are created together by create_many().
+        """
+        clone_options = {
+            k: v[-1]
+            for k, v in self._widget_config().items()
+            if len(v) == 5 and str(v[-1]) != str(v[-2])
+        }
+        for key in (command_s, textvariable_s):
+            clone_options.pop(key, None)
+            if getattr(self, key):
+                clone_options[key] = getattr(self, key)
+        if _style_table.is_shared_font(clone_options.get(font_s, "")):
+            # the font of the tags of a single chunk, which each copy takes
+            # from its own text, holding its own reference
+            del clone_options[font_s]
+        if not self.emulation_b and getattr(self.widget, "tagged", None):
+            clone_options[text_s] = self.widget.tagged  # not its chunk text
+        case = getattr(self.widget, case_s, "")
+        if case:
+            clone_options[case_s] = case
+        if self.template:
+            clone_options.pop(text_s, None)
+            clone_options[template_s] = self.template
+            clone_options[values_s] = dict(self.template_values)
+        if self.backend != self.default_backend:
+            clone_options[backend_s] = self.backend
+        clone_options.update(options)
+        return type(self).create_many(
+            master or self.master, [clone_options] * n
+        )
+
+    @property
+    def command(self):
+        """The command passed to config(), or None."""
+        return self._callbacks_d.get(command_s)
+
+    @staticmethod
+    def compile_template(text):
+        """See help on module method compile_template() for more info"""
+        return compile_template(text)
+
     def config(self, *args, cnf=None, **kwargs):  # cnf=None,
         """Configure resources of a widget.
 
@@ -3162,6 +5907,16 @@ class TTWidget(tk.Frame):
             kwargs.update(cnf)
         elif cnf is not None:
             args = (cnf,) + args
+        if (
+                self._batch_options is not None
+                and kwargs
+                and not args
+                and not any(key in kwargs for key in self._config_flags)
+        ):
+            for key, val in kwargs.items():
+                key = self.widget_option_aliases_d.get(key, key)
+                self._batch_options[key] = val
+            return None
         if args:
             arg0 = args[0]  # .lower()
             arg0lower = arg0.lower() if type(arg0) is str else arg0
@@ -3250,6 +6005,7 @@ class TTWidget(tk.Frame):
         propagate_b = kwargs.pop("propagate", True)
         store_b = kwargs.pop("store", True)
         procreate_b = False
+        kid_options, kid_texts = {}, {}
         if not args and kwargs:
             for (key, val) in kwargs.items():
                 if key in self.widget_option_aliases_d:
@@ -3257,6 +6013,18 @@ class TTWidget(tk.Frame):
                 if key == "default_debug":
                     self._set_default_debug(val)
                     continue
+                if key in (template_s, values_s):
+                    self._template_config(**{key: val, "abstain": abstain_b})
+                    continue
+                if key == backend_s:
+                    if val not in (canvas_s, grid_s, labels_s):
+                        raise ValueError(
+                            "Unknown backend {0!r}: expected {1!r}, {2!r}, or"
+                            " {3!r}".format(val, labels_s, grid_s, canvas_s)
+                        )
+                    procreate_b = procreate_b or val != self.backend
+                    self.backend = val
+                    continue
                 if key in ttfont_dict_keys:
                     fkey = (
                         key[1:]
@@ -3288,25 +6056,21 @@ class TTWidget(tk.Frame):
                     if not self.emulation_b:
                         text = self.widget.text
                         self._widget_config(text=case_func(text))
-                    for _name, gathering in self._get_kids(items=True):
-                        child = gathering["label"]
+                    for name, gathering in self._get_kids(items=True):
                         text = gathering.get("text1", "")
                         if text.endswith("\n"):
                             text = text[:-1]
                         text = case_func(text)
                         gathering.update(case=val, text2=text)
-                        self._child_config(
-                            child, caller="config", **{text_s: text}
-                        )
+                        kid_texts[name] = {text_s: text}
                 elif key in self.widget_opts_req_procreation:
                     if key == compound_s:
                         pass
                     elif key in (bitmap_s, image_s):
                         pass
                     elif key == text_s:
-                        pass
-                    if not abstain_b:
-                        self._kids = self._procreate()
+                        self.template = None
+                    procreate_b = True
                 elif key in self.widget_opts_for_custom_impl:
                     if key == state_s:
                         if val == tk.NORMAL:
@@ -3321,7 +6085,8 @@ class TTWidget(tk.Frame):
                             pass
                         self.__state = val
                     elif key == textvariable_s:
-                        self.textvariable = textvariable = val
+                        textvariable = self.textvariable
+                        self._callbacks_d[key] = val
                         if self.observer and textvariable:
                             textvariable.trace_delete("w", self.observer)
                         if val:
@@ -3338,7 +6103,7 @@ class TTWidget(tk.Frame):
                             "SELF ", self, ", KEY=", key, ", VAL=", val
                         )
                     if key == command_s:
-                        self.command = val
+                        self._callbacks_d[key] = val
                     elif key == default_s:
                         # capture keybd focus and bind <Return> and <Space>
                         # to invoke()?"
@@ -3365,11 +6130,8 @@ class TTWidget(tk.Frame):
                     self._base_pack[key] = val
                 elif key in self.widget_opts_to_kids_cfg:
                     if key == font_s:
-                        self.font_d = tk_font.Font(font=val).actual()
-                    for child in self._get_kids():
-                        self._child_config(
-                            child, caller="config", **{key: val}
-                        )
+                        self.font_d = get_font_dict(val)
+                    kid_options[key] = val
                 elif key in self.widget_opts_to_kids_pack:
                     pass
                 elif key in self.widget_opts_to_base_and_kids:
@@ -3380,24 +6142,68 @@ class TTWidget(tk.Frame):
                     else:
                         pass
                     if propagate_b:
-                        for child in self._get_kids():
-                            self._child_config(
-                                child, caller="config", **{key: val}
-                            )
+                        kid_options[key] = val
                 else:
                     self._print(
                         "EXCEPTION: Unexpected Option {0}!".format(key),
                         Raise=True,
                     )
                 # store_b and self._widget_config(**{key:val})
-            if abstain_b and procreate_b:
-                self._kids = self._procreate()
+            if kid_options or kid_texts:
+                self._config_kids(kid_options, each=kid_texts)
+            if procreate_b and not abstain_b:
+                self._schedule_procreate()
             return None
-        return _flesh_config(self, self._widget_config(), pared=pared_b)
+        return _flesh_config(
+            self,
+            self._widget_config(),
+            callbacks=self._callbacks_d,
+            pared=pared_b,
+        )
 
     def configure(self, *a, cnf=None, **kw):
         return self.config(*a, cnf, **kw)
 
+    @classmethod
+    def create_many(cls, master, specs, **options):
+        """Create a widget of this class in MASTER for each of SPECS, a
+        tagged text or a dict of options, with the common OPTIONS, and
+        return them in a list.
+
+        The widgets share the lookups that __init__() would make for each
+        of them, of the options of a new state widget, its option names,
+        and the toplevel of MASTER.  As for any widgets, equal texts share
+        one parse, and equal styles share one Style and one font.
+        """
+        outer_batch_d = TTWidget._batch_d
+        if outer_batch_d is None:
+            TTWidget._batch_d = {}
+        try:
+            return [
+                cls(
+                    master,
+                    **_merge_dicts(
+                        options,
+                        {text_s: spec} if isinstance(spec, str) else spec,
+                    )
+                )
+                for spec in specs
+            ]
+        finally:
+            TTWidget._batch_d = outer_batch_d
+
+    def destroy(self):
+        """Destroy this and all descendants widgets, releasing the shared
+        fonts of its child labels."""
+        if self._lazy_ids and self._lazy_ids[1]:
+            self.after_cancel(self._lazy_ids[1])
+        for after_id in (self._procreate_after_id, self._layout_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._release_fonts()
+        _widget_pool.discard(self)
+        super().destroy()
+
     def dump(self, stringy="", **kwargs):
         """Dump the internal state of the compound widget, including parent
         Frame and child Labels.
@@ -3562,12 +6368,28 @@ class TTWidget(tk.Frame):
                     lower
                     title
                     swapcase
+
+            For TEMPLATES (see compile_template()):
+
+                template
+                values
+
+            For drawing the children:
+
+                backend=[one of the below]
+                    labels
+                    grid
+                    canvas
         """
-        if self.widget:
-            w_keys = self.widget.keys()
-        else:
-            w_keys = []
-        return sorted(w_keys + list(ttfont_dict_keys) + [case_s])
+        widget_class = type(self.widget) if self.widget else None
+        keys = TTWidget._sorted_keys_d.get(widget_class)
+        if keys is None:
+            keys = TTWidget._sorted_keys_d[widget_class] = sorted(
+                (list(self._widget_keys()) if self.widget else [])
+                + list(ttfont_dict_keys)
+                + [backend_s, case_s, template_s, values_s]
+            )
+        return list(keys)
 
     @staticmethod
     def pare_dict(*a, **kw):
@@ -3578,6 +6400,16 @@ class TTWidget(tk.Frame):
         """See help on module method parse_tag_attrs() for more info"""
         return parse_tag_attrs(*a, **kw)
 
+    @staticmethod
+    def parse_many(texts, *a, **kw):
+        """See help on module method parse_many() for more info"""
+        return parse_many(texts, *a, **kw)
+
+    @staticmethod
+    def parse_tagged_text(text, *a, **kw):
+        """See help on module method parse_tagged_text() for more info"""
+        return parse_tagged_text(text, *a, **kw)
+
     @staticmethod
     def convert_font_dict_to_ttoptions_dict(*a, **kw):
         """See help on module method convert_font_dict_to_ttoptions_dict() for
@@ -3649,6 +6481,16 @@ class TTWidget(tk.Frame):
         """
         return strip_tags(self._widget_cget(text_s), *a, **kw)
 
+    @property
+    def textvariable(self):
+        """The textvariable passed to config(), or None."""
+        return self._callbacks_d.get(textvariable_s)
+
+    @staticmethod
+    def tokenize_tagged_text(text, *a, **kw):
+        """See help on module method tokenize_tagged_text() for more info"""
+        return tokenize_tagged_text(text, *a, **kw)
+
     @staticmethod
     def unalias(*a, **kw):
         """See help on module method unalias() for more info"""
@@ -3682,6 +6524,26 @@ class TTWidget(tk.Frame):
         """See help on module method update_named_font() for more info"""
         return update_named_font(*a, **kw)
 
+    def update_now(self):
+        """Procreate the children now, instead of when idle.
+
+        Changes of the text, graphic, compound, or backend only procreate
+        the children once the application is idle, once for any number of
+        changes.  Call this, such as before reading the geometry of the
+        widget, to apply them at once.  It also procreates a lazy widget,
+        and lays out the children of the canvas and grid backends.
+        """
+        if self._procreate_after_id is not None:
+            self.after_cancel(self._procreate_after_id)
+            self._procreate_pending()
+        self._procreate_lazily()
+        if self._layout_after_id is not None:
+            self.after_cancel(self._layout_after_id)
+            if self.backend == canvas_s:
+                self._layout_canvas()
+            else:
+                self._layout_grid()
+
 
 class TTButton(TTWidget):
     """TTButton Class - inherits from TTWidget except for __init__().
@@ -3711,6 +6573,8 @@ class TTListbox(tk.Listbox):
     Additionally, the extended Font and Case widget options are supported.
     """
 
+    _batch_options = None  # options queued by batch(), by option name
+
     def __init__(self, *a, **kw):
         self.text = kw.pop(text_s, "")
         (
@@ -3719,7 +6583,7 @@ class TTListbox(tk.Listbox):
             self.case,
         ) = split_dict_into_options_fontattrs_and_case(kw)
         super().__init__(*a, **self.options)
-        font_d = tk_font.Font(font=super().cget(font_s)).actual()
+        font_d = get_font_dict(super().cget(font_s))
         self.font_d = _merge_dicts(font_d, self.font_d)
         ttoptions_d = convert_font_dict_to_ttoptions_dict(self.font_d)
         if self.case:
@@ -3741,6 +6605,25 @@ class TTListbox(tk.Listbox):
         """See help on module method alias() for more info"""
         return alias(option)
 
+    @contextlib.contextmanager
+    def batch(self):
+        """Return a context manager that queues the options passed to
+        config() by keyword, and applies them on exit in one merged
+        config(), with one configure of the Listbox and at most one refill
+        of its items.  See the batch() method of TTWidget.
+        """
+        if self._batch_options is not None:
+            yield self
+            return
+        self._batch_options = collections.OrderedDict()
+        try:
+            yield self
+            options = self._batch_options
+        finally:
+            self._batch_options = None
+        if options:
+            self.config(**options)
+
     def cget(self, key):
         """Return the resource value for a KEY given as string."""
         if key in (text_s, text_as):
@@ -3762,34 +6645,44 @@ class TTListbox(tk.Listbox):
             cnf = None
         elif cnf:
             return super().config(cnf)
+        if self._batch_options is not None and kw and "store" not in kw:
+            self._batch_options.update(kw)
+            return None
         store_b = kw.pop("store", True)
+        options, font_d = {}, {}  # for the Listbox, and its font attributes
+        text_b = case_b = False
         for k, v in kw.items():
             if k in (text_s, text_as):
                 self.text = v
-                if store_b:
-                    self._insert_new_elements()
+                text_b = True
             elif k in (font_s, font_as):
-                self.font_d = tk_font.Font(font=v).actual()
-                super().config(**{k: v})
+                self.font_d = get_font_dict(v)
+                options[font_s] = v
             elif k in ttfont_dict_keys:
                 fkey = k[1:] if k in (funderline_s, foverstrike_s) else k
                 self.font_d[fkey] = v
-                if store_b:
-                    fontnm = super().cget(font_s)
-                    newfontnm = get_named_font(fontnm, **{fkey: v})
-                    if fontnm != newfontnm:
-                        super().config(font=newfontnm)
+                font_d[fkey] = v
             elif k in (case_s, case_as):
                 self.case = v
-                if store_b:
-                    case_func = _get_case_func(self.case)
-                    for index in range(self.index(tk.END)):
-                        txt = self.get(index)
-                        mod_txt = case_func(txt)
-                        if txt != mod_txt:
-                            self.update_line_text(index, mod_txt)
+                case_b = True
             else:
-                super().config(**{k: v})
+                options[k] = v
+        if store_b and font_d:
+            fontnm = options.get(font_s) or super().cget(font_s)
+            newfontnm = get_named_font(fontnm, **font_d)
+            if fontnm != newfontnm:
+                options[font_s] = newfontnm
+        if options:
+            super().config(**options)
+        if store_b and text_b:
+            self._insert_new_elements()
+        if store_b and case_b:
+            case_func = _get_case_func(self.case)
+            for index in range(self.index(tk.END)):
+                txt = self.get(index)
+                mod_txt = case_func(txt)
+                if txt != mod_txt:
+                    self.update_line_text(index, mod_txt)
         if kw:
             return None
         return _flesh_config(self, super().config())
@@ -3815,17 +6708,22 @@ class TTListbox(tk.Listbox):
         # add support for tagged_text on input!
         if PyVers_f >= 3.4:
             index_i = super().index(index)
+            last_i = index_i + len(elements) - 1
             super().insert(index, *elements)
-            lb_elements = super().get(index_i, index_i + len(elements) - 1)
-            for x, elem in enumerate(lb_elements, index_i):
-                _, attrs, text = split_chunk(elem)
-                if attrs:
-                    opts, _, case = parse_tag_attrs(attrs, {}, {}, **kw)
-                    if case:
-                        text = getattr(text, case)()
-                    super().insert(x, text)
-                    super().itemconfig(x, **opts)
-                    super().delete(x + 1)
+            lb_elements = super().get(index_i, last_i)
+            parsed = parse_many(lb_elements, **kw)
+            rows = list(lb_elements)
+            for x, text in enumerate(parsed.texts):
+                style = parsed.styles[parsed.style_ids[x]]
+                if style.case:
+                    text = getattr(text, style.case)()
+                rows[x] = text
+            if rows != list(lb_elements):
+                super().delete(index_i, last_i)
+                super().insert(index_i, *rows)
+            for x, style_id in enumerate(parsed.style_ids, index_i):
+                if style_id:
+                    super().itemconfig(x, **parsed.styles[style_id].options)
         else:
             # bug in earlier Py versions causes above to fail on 1st elem
             elems_to_process = elements[:: 1 if index == tk.END else -1]
@@ -3836,9 +6734,14 @@ class TTListbox(tk.Listbox):
                     ]
                     elem2 = ["{%s}" % e if " " in e else e for e in elem1]
                     elem = " ".join(elem2)
-                _, attrs, text = split_chunk(elem)
-                if attrs:
-                    opts, _, case = parse_tag_attrs(attrs, {}, {}, **kw)
+                style, text = _split_single_chunk(elem)
+                if style:
+                    if kw:
+                        opts, _, case = parse_tag_attrs(
+                            split_chunk(elem).attrs, {}, {}, **kw
+                        )
+                    else:
+                        opts, case = dict(style.options), style.case
                     if case:
                         text = getattr(text, case)()
                     super().insert(index, text)
@@ -4014,11 +6917,20 @@ class TTToolTip:
         """See help on method alias()"""
         return alias(option)
 
+    def batch(self):
+        """Return a context manager that queues the options of the label of
+        the tooltip, as the batch() method of TTWidget does.  The options of
+        the tooltip itself, such as delay, are set at once.
+        """
+        return self.ttlabel.batch()
+
     def cget(self, key):
         """Return the resource value for a KEY given as string."""
         result = None
         if key:
-            if key in self.ttlabel.keys():
+            if key in (command_s, textvariable_s):
+                result = self.ttlabel._callbacks_d.get(key)
+            elif key in self.ttlabel.keys():
                 result = self.ttlabel.cget(key)
             elif key in self.custom_defs:
                 result = getattr(self, key, None)
@@ -4048,6 +6960,7 @@ class TTToolTip:
             return _flesh_config(
                 self,
                 self.ttlabel.config(),
+                callbacks=self.ttlabel._callbacks_d,
                 defaults=self.defaults_d,
                 base=("", self.base),
                 delay=(500, self.delay),
@@ -4124,8 +7037,10 @@ class TTToolTip:
 Button = TTButton
 Label = TTLabel
 Listbox = TTListbox
+Template = TTTemplate
 ToolTip = TTToolTip
 __init_widget_option_unaliases_d()
+__init_tag_attr_handlers_d()
 ####
 get_font_fmt = gen_tag_attrs
 